@@ -7,22 +7,115 @@
 #     --max_review_pages=5 --max_reviews=300 --max_foreign_pages=3 --max_foreign_reviews=200
 #
 # Results saved to: ./Products/<sanitized_query>_<YYYYmmdd_HHMMSS>.csv
-
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
+#
+# Startup: selenium, pandas and pyperclip are imported inside the functions that use them,
+# so `--help`, argument validation and `--out_format jsonl` runs never pay for them
+# (see benchmarks/bench_startup.py).
 
 import time
 import re
 import argparse
+import json
 from pathlib import Path
 from datetime import datetime
 import sys
-import pyperclip
-import pandas as pd
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from cli_options import (add_archive_args, add_backend_args, add_image_args, add_metrics_args, add_session_args,
+                         build_image_pipeline, build_page_archive, session_settings)
+from review_capture import ReviewNetworkCapture, enable_performance_logging
+from session_supervisor import SupervisedDriver
+from run_metrics import METRICS, MeteredDriver, start_exporter
+from structured_data import amazon_product_fields, read_structured_data
+from review_dedup import ReviewDeduper
+from review_stream import PREVIEW, Review, ReviewStats, review_key, review_row
+from selector_compiler import SelectorChains
+
+class By:
+    """Selenium locator strategies (same values as selenium.webdriver.common.by.By), without importing selenium."""
+    ID = "id"
+    XPATH = "xpath"
+    CSS_SELECTOR = "css selector"
+
+# -------------------- selectors (also used offline by page_parser.py) --------------------
+# Strings starting with '//' or './/' are XPath, the rest CSS. Fixing one here fixes both the
+# live scrape and re-parsing of archived pages.
+TILE_SELECTORS = [
+    '[data-component-type="s-search-result"]',
+    '.s-result-item[data-component-type="s-search-result"]',
+    '[data-asin]:not([data-asin=""])',
+    '.s-result-item',
+    '//div[@data-component-type="s-search-result"]',
+    '//div[contains(@class, "s-result-item") and @data-asin]',
+]
+TILE_TITLE_SELECTORS = [
+    'h2 a span','h2 span','.a-size-mini .a-color-base','.s-size-mini',
+    'h2 .a-link-normal span','[data-cy="title-recipe-title"]','.a-size-base-plus',
+    'a span.a-text-normal','.a-size-base','.a-color-base','span.a-text-normal',
+    '.s-color-base','.s-size-mini.s-spacing-none.s-color-base','h2.a-size-mini span',
+    '.a-link-normal .a-text-normal','.//h2//span[string-length(text()) > 10]',
+    './/a[contains(@href, "/dp/")]//span[string-length(text()) > 10]'
+]
+TILE_URL_SELECTORS = [
+    'h2 a','.a-link-normal[href*="/dp/"]','a[href*="/dp/"]','.s-link-style a',
+    'a.a-text-normal','a[href*="/gp/"]','.a-link-normal',
+    'a[href*="{asin}"]','.//a[contains(@href, "/dp/")]','.//h2//a'
+]
+TILE_PRICE_SELECTORS = [
+    '.a-price .a-offscreen','.a-price-whole',
+    './/span[contains(@class, "a-price")]//span[@class="a-offscreen"]',
+    './/span[contains(text(), "$")]'
+]
+TILE_IMAGE_SELECTORS = ['img.s-image', '.s-product-image-container img', './/img']
+
+REVIEW_BLOCK_XPATHS = [
+    '//div[@data-hook="review"]',
+    '//div[contains(@class,"a-section review aok-relative")]'
+]
+REVIEW_FIELD_XPATHS = {
+    "review_title": ['.//a[@data-hook="review-title"]//span', './/span[@data-hook="review-title"]'],
+    "review_text": ['.//span[@data-hook="review-body"]//span', './/span[@data-hook="review-body"]'],
+    "review_rating": ['.//i[@data-hook="review-star-rating"]//span', './/i[contains(@class,"a-icon-star")]//span'],
+    "review_date": ['.//span[@data-hook="review-date"]', './/span[contains(@class,"review-date")]'],
+}
+# Review blocks embedded in the product page (the "Top reviews" sections)
+INLINE_DOMESTIC_BLOCK_XPATH = '//div[starts-with(@id,"customer_review-") and not(starts-with(@id,"customer_review_foreign-"))]'
+INLINE_FOREIGN_BLOCK_XPATH = '//div[starts-with(@id,"customer_review_foreign-")]'
+INLINE_DOMESTIC_FIELD_XPATHS = {
+    "review_title": ['./div[2]/h5/a/span[2]', './div[1]/a/div[2]/span',
+                     './/a[@data-hook="review-title"]//span', './/span[@data-hook="review-title"]'],
+    "review_text": ['./div[4]/span/div/div[1]/span', './/span[@data-hook="review-body"]//span',
+                    './/span[@data-hook="review-body"]'],
+    "review_rating": ['.//i[@data-hook="review-star-rating"]//span', './/span[contains(@class,"a-icon-alt")]'],
+    "review_date": ['.//span[@data-hook="review-date"]', './/span[contains(@class,"review-date")]'],
+}
+INLINE_FOREIGN_FIELD_XPATHS = {
+    "review_title": ['.//a[@data-hook="review-title"]//span', './/span[@data-hook="review-title"]'],
+    "review_text": ['.//span[@data-hook="review-body"]//span', './/div[4]//span'],
+    "review_rating": ['.//i[@data-hook="review-star-rating"]//span', './/span[contains(@class,"a-icon-alt")]'],
+    "review_date": ['.//span[@data-hook="review-date"]', './/span[contains(@class,"review-date")]'],
+}
+
+WARRANTY_HEADING_XPATHS = [
+    '//*[@id="productSpecifications_dp_warranty_and_support"]/div/h1',
+    '//div[@id="productSpecifications_dp_warranty_and_support"]//h1',
+    '//*[@id="productSupportAndWarranty"]//h1',
+    '//h1[contains(., "Warranty") or contains(., "Support")]',
+    '//h2[contains(., "Warranty") or contains(., "Support")]'
+]
+WARRANTY_BODY_XPATHS = [
+    '//*[@id="productSpecifications_dp_warranty_and_support"]/div/div[1]/span[3]',
+    '//*[@id="productSpecifications_dp_warranty_and_support"]//div[contains(@class,"a-section")]',
+    '//*[@id="productSupportAndWarranty"]//div[contains(@class,"a-section")]',
+    '//*[contains(text(), "Warranty")]/ancestor::div[1]',
+]
+
+# Each chain list compiled into one in-page resolver call per page (selector_compiler.py)
+REVIEW_CHAINS = SelectorChains(REVIEW_FIELD_XPATHS, blocks=REVIEW_BLOCK_XPATHS)
+INLINE_DOMESTIC_CHAINS = SelectorChains(INLINE_DOMESTIC_FIELD_XPATHS, blocks=[INLINE_DOMESTIC_BLOCK_XPATH])
+INLINE_FOREIGN_CHAINS = SelectorChains(INLINE_FOREIGN_FIELD_XPATHS, blocks=[INLINE_FOREIGN_BLOCK_XPATH])
+WARRANTY_CHAINS = SelectorChains({"warranty_heading": WARRANTY_HEADING_XPATHS, "warranty_text": WARRANTY_BODY_XPATHS},
+                                 min_len={"warranty_text": 6}, content_fallback=True)
 
 # -------------------- utilities --------------------
 def sanitize_name(s: str) -> str:
@@ -46,11 +139,15 @@ def get_asin_from_url(url: str) -> str | None:
     return None
 
 def wait_for_page_load(driver, timeout=10):
+    from selenium.webdriver.support.ui import WebDriverWait
     try:
         WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
         time.sleep(2)
     except:
         time.sleep(5)
+    archive_page = getattr(driver, "archive_page", None)  # page_archive.ArchivingDriver (--archive_pages)
+    if archive_page:
+        archive_page()
 
 def scroll_to_element(driver, element):
     try:
@@ -60,6 +157,8 @@ def scroll_to_element(driver, element):
         pass
 
 def try_click(driver, by, selector, timeout=6):
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
     try:
         el = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((by, selector)))
         scroll_to_element(driver, el)
@@ -70,13 +169,13 @@ def try_click(driver, by, selector, timeout=6):
         return False
 
 def top_k_review_texts(reviews, k=5):
-    """Return exactly k review texts (strings), trimming and padding with ''. Handles dict or str."""
+    """Return exactly k review texts (strings), trimming and padding with ''. Handles dict, Review or str."""
     out = []
     for rv in (reviews or []):
-        if isinstance(rv, dict):
-            t = (rv.get("review_text") or "").strip()
+        if isinstance(rv, str):
+            t = rv.strip()
         else:
-            t = (rv or "").strip()
+            t = (rv.get("review_text") or "").strip() if rv else ""
         if t:
             out.append(t)
         if len(out) >= k:
@@ -85,27 +184,12 @@ def top_k_review_texts(reviews, k=5):
         out.append("")
     return out[:k]
 
+def review_rows(reviews, asin, product_number, source) -> list[dict]:
+    """Flatten review dicts / Review records into rows for the per-review output table."""
+    return [review_row(rv, asin, product_number, source) for rv in (reviews or []) if rv and not isinstance(rv, str)]
+
 # -------------------- warranty & support --------------------
 def scrape_warranty_support(driver) -> dict:
-    heading_text, body_text = "", ""
-
-    x_heading = '//*[@id="productSpecifications_dp_warranty_and_support"]/div/h1'
-    x_span3  = '//*[@id="productSpecifications_dp_warranty_and_support"]/div/div[1]/span[3]'
-
-    fallback_headings = [
-        x_heading,
-        '//div[@id="productSpecifications_dp_warranty_and_support"]//h1',
-        '//*[@id="productSupportAndWarranty"]//h1',
-        '//h1[contains(., "Warranty") or contains(., "Support")]',
-        '//h2[contains(., "Warranty") or contains(., "Support")]'
-    ]
-    fallback_bodies = [
-        x_span3,
-        '//*[@id="productSpecifications_dp_warranty_and_support"]//div[contains(@class,"a-section")]',
-        '//*[@id="productSupportAndWarranty"]//div[contains(@class,"a-section")]',
-        '//*[contains(text(), "Warranty")]/ancestor::div[1]',
-    ]
-
     for expander in [
         '//*[@id="productSpecifications_dp_warranty_and_support"]//a[contains(@class,"a-expander-header")]',
         '//*[@id="productSupportAndWarranty"]//a[contains(@class,"a-expander-header")]',
@@ -113,28 +197,18 @@ def scrape_warranty_support(driver) -> dict:
         if try_click(driver, By.XPATH, expander, timeout=2):
             time.sleep(1)
 
-    for xp in fallback_headings:
-        try:
-            el = driver.find_element(By.XPATH, xp)
-            heading_text = (el.text or el.get_attribute("textContent") or "").strip()
-            if heading_text: break
-        except:
-            continue
-
-    for xp in fallback_bodies:
-        try:
-            el = driver.find_element(By.XPATH, xp)
-            body_text = (el.text or el.get_attribute("textContent") or "").strip()
-            if body_text and len(body_text) > 5: break
-        except:
-            continue
+    found = WARRANTY_CHAINS.resolve(driver)[0]
+    heading_text, body_text = found["warranty_heading"], found["warranty_text"]
 
     heading_text = re.sub(r"\s+", " ", heading_text or "").strip()
     body_text = re.sub(r"\s+", " ", body_text or "").strip()
+    if not heading_text: METRICS.selector_miss("amazon", "warranty_heading")
+    if not body_text: METRICS.selector_miss("amazon", "warranty_text")
     return {"warranty_heading": heading_text or "Not found", "warranty_text": body_text or "Not found"}
 
 # -------------------- product link helper (Share → Copy link; else fallback) --------------------
 def get_product_link(driver, product_number):
+    import pyperclip
     try:
         print(f"    → Getting product link for product {product_number}...")
         pyperclip.copy("")
@@ -212,12 +286,21 @@ def open_reviews_page_from_product(driver, product_url: str) -> str | None:
     return None
 
 # -------------------- reviews: domestic (/product-reviews) --------------------
-def scrape_full_reviews_from_reviews_page(driver, reviews_page_url: str, max_pages=5, max_reviews=300) -> list[dict]:
-    results = []
+def iter_reviews_from_reviews_page(driver, reviews_page_url: str, max_pages=5, max_reviews=300,
+                                   capture=None, known_keys=None, dedupe=None):
+    """
+    Page through /product-reviews, yielding Review records as each page is read. With a
+    ReviewNetworkCapture, each page's reviews are parsed in bulk from the captured document/XHR
+    bodies; DOM scraping is the fallback.
+    known_keys: review_key()s already stored (delta mode, newest-first URL); stops at the first one.
+    dedupe: a review_dedup.ReviewDeduper shared by all sources of the product; duplicates are skipped.
+    """
+    n = 0
     if not reviews_page_url:
-        return results
+        return
 
     print(f"  → Navigating to reviews page: {reviews_page_url}")
+    if capture: capture.reset()
     driver.get(reviews_page_url)
     wait_for_page_load(driver, 10)
 
@@ -225,62 +308,50 @@ def scrape_full_reviews_from_reviews_page(driver, reviews_page_url: str, max_pag
         print(f"    • On reviews page {page}")
         time.sleep(1.2)
 
-        blocks = []
-        for selector in [
-            '//div[@data-hook="review"]',
-            '//div[contains(@class,"a-section review aok-relative")]'
-        ]:
-            try:
-                blocks = driver.find_elements(By.XPATH, selector)
-                if blocks: break
-            except:
+        captured = capture.collect() if capture else []
+        if captured:
+            print(f"      Captured {len(captured)} reviews from network payloads")
+            fresh, reached_known = captured, False
+            if known_keys is not None:
+                for i, rv in enumerate(captured):
+                    if review_key(rv) in known_keys:
+                        fresh, reached_known = captured[:i], True
+                        break
+            if dedupe:
+                fresh = dedupe.filter(fresh)
+            for rv in fresh[: max_reviews - n]:
+                n += 1
+                yield Review.from_dict(rv)
+            if reached_known:
+                print(f"      Reached a known review; {n} new")
+                return
+            if n >= max_reviews:
+                print("      Reached max_reviews limit")
+                return
+
+        records = []
+        if not captured:
+            # every block, every field chain: one call (block ids only needed to match known reviews)
+            records = REVIEW_CHAINS.resolve(driver, attrs=["id"] if known_keys is not None else [])
+            print(f"      Found {len(records)} review blocks")
+
+        for rec in records:
+            if not rec["review_text"]:
                 continue
-
-        print(f"      Found {len(blocks)} review blocks")
-        for b in blocks:
-            try:
-                title = ""
-                text = ""
-                rating = ""
-                date = ""
-
-                for xp in ['.//a[@data-hook="review-title"]//span', './/span[@data-hook="review-title"]']:
-                    try:
-                        title = b.find_element(By.XPATH, xp).text.strip()
-                        if title: break
-                    except: continue
-
-                for xp in ['.//span[@data-hook="review-body"]//span', './/span[@data-hook="review-body"]']:
-                    try:
-                        text = b.find_element(By.XPATH, xp).text.strip()
-                        if text: break
-                    except: continue
-
-                for xp in ['.//i[@data-hook="review-star-rating"]//span', './/i[contains(@class,"a-icon-star")]//span']:
-                    try:
-                        rating = b.find_element(By.XPATH, xp).text.strip()
-                        if rating: break
-                    except: continue
-
-                for xp in ['.//span[@data-hook="review-date"]', './/span[contains(@class,"review-date")]']:
-                    try:
-                        date = b.find_element(By.XPATH, xp).text.strip()
-                        if date: break
-                    except: continue
-
-                if text:
-                    results.append({
-                        "review_title": title,
-                        "review_text": text,
-                        "review_rating": rating,
-                        "review_date": date,
-                        "origin_country": ""  # domestic
-                    })
-                    if len(results) >= max_reviews:
-                        print("      Reached max_reviews limit")
-                        return results
-            except:
+            rv = Review(rec["review_title"], rec["review_text"], rec["review_rating"], rec["review_date"],
+                        "")  # domestic: no origin country
+            if known_keys is not None:
+                rv.review_id = rec["@id"]
+                if review_key(rv) in known_keys:
+                    print(f"      Reached a known review; {n} new")
+                    return
+            if dedupe and not dedupe.add(rv):
                 continue
+            n += 1
+            yield rv
+            if n >= max_reviews:
+                print("      Reached max_reviews limit")
+                return
 
         # Next page
         next_clicked = False
@@ -293,11 +364,50 @@ def scrape_full_reviews_from_reviews_page(driver, reviews_page_url: str, max_pag
         if not next_clicked:
             break
 
-    return results
+def scrape_full_reviews_from_reviews_page(driver, reviews_page_url: str, max_pages=5, max_reviews=300,
+                                          capture=None, known_keys=None, dedupe=None) -> list:
+    """List form of iter_reviews_from_reviews_page()."""
+    return list(iter_reviews_from_reviews_page(driver, reviews_page_url, max_pages, max_reviews,
+                                               capture, known_keys, dedupe))
+
+# -------------------- reviews: stratified sample (filterByStar) --------------------
+STAR_FILTERS = {5: "five_star", 4: "four_star", 3: "three_star", 2: "two_star", 1: "one_star"}
+
+def star_filtered_reviews_url(reviews_page_url: str, stars: int) -> str:
+    """The same /product-reviews URL restricted to one star bucket, from page 1."""
+    parts = urlsplit(reviews_page_url)
+    q = dict(parse_qsl(parts.query))
+    q.setdefault("reviewerType", "all_reviews")
+    q["filterByStar"] = STAR_FILTERS[stars]
+    q["pageNumber"] = "1"
+    return urlunsplit(parts._replace(query=urlencode(q)))
+
+def iter_reviews_by_star(driver, reviews_page_url: str, per_star=20, max_pages_per_star=5,
+                         capture=None, dedupe=None):
+    """
+    Stratified sample: up to per_star reviews from each star bucket (5★ … 1★) via filterByStar.
+    A bucket stops at its quota or when it runs out of pages, so a balanced sample costs about
+    5 × ceil(per_star / 10) page loads instead of paging through the default ranking.
+    """
+    if not reviews_page_url:
+        return
+    for stars in STAR_FILTERS:
+        n = 0
+        for rv in iter_reviews_from_reviews_page(
+                driver, star_filtered_reviews_url(reviews_page_url, stars),
+                max_pages=max_pages_per_star, max_reviews=per_star, capture=capture, dedupe=dedupe):
+            rv.review_rating = rv.review_rating or f"{stars}.0 out of 5 stars"
+            n += 1
+            yield rv
+        print(f"    • {stars}★ bucket: {n}/{per_star} reviews")
+
+def sample_reviews_by_star(driver, reviews_page_url: str, per_star=20, max_pages_per_star=5,
+                           capture=None, dedupe=None) -> list:
+    """List form of iter_reviews_by_star()."""
+    return list(iter_reviews_by_star(driver, reviews_page_url, per_star, max_pages_per_star, capture, dedupe))
 
 # -------------------- reviews: inline domestic on PRODUCT page (your XPaths) --------------------
-def scrape_inline_domestic_blocks(driver, limit=200) -> list[dict]:
-    results = []
+def iter_inline_domestic_blocks(driver, limit=200, dedupe=None):
     try:
         try:
             hdr = driver.find_element(By.XPATH, '//*[@id="cm-cr-local-reviews-title"]/h3')
@@ -306,59 +416,19 @@ def scrape_inline_domestic_blocks(driver, limit=200) -> list[dict]:
         except:
             pass
 
-        blocks = driver.find_elements(By.XPATH, '//div[starts-with(@id,"customer_review-") and not(starts-with(@id,"customer_review_foreign-"))]')
-        print(f"      Inline domestic blocks found: {len(blocks)}")
+        records = INLINE_DOMESTIC_CHAINS.resolve(driver, limit=limit)
+        print(f"      Inline domestic blocks found: {len(records)}")
 
-        for b in blocks[:limit]:
-            try:
-                title = ""
-                for xp in ['./div[2]/h5/a/span[2]',
-                           './div[1]/a/div[2]/span',
-                           './/a[@data-hook="review-title"]//span',
-                           './/span[@data-hook="review-title"]']:
-                    try:
-                        title = b.find_element(By.XPATH, xp).text.strip()
-                        if title: break
-                    except: continue
-
-                text = ""
-                for xp in ['./div[4]/span/div/div[1]/span',
-                           './/span[@data-hook="review-body"]//span',
-                           './/span[@data-hook="review-body"]']:
-                    try:
-                        text = b.find_element(By.XPATH, xp).text.strip()
-                        if text: break
-                    except: continue
-
-                rating = ""
-                for xp in ['.//i[@data-hook="review-star-rating"]//span',
-                           './/span[contains(@class,"a-icon-alt")]']:
-                    try:
-                        rating = b.find_element(By.XPATH, xp).text.strip()
-                        if rating: break
-                    except: continue
-
-                date = ""
-                for xp in ['.//span[@data-hook="review-date"]',
-                           './/span[contains(@class,"review-date")]']:
-                    try:
-                        date = b.find_element(By.XPATH, xp).text.strip()
-                        if date: break
-                    except: continue
-
-                if text:
-                    results.append({
-                        "review_title": title,
-                        "review_text": text,
-                        "review_rating": rating,
-                        "review_date": date,
-                        "origin_country": ""  # domestic
-                    })
-            except:
-                continue
+        for rec in records:
+            rv = Review(rec["review_title"], rec["review_text"], rec["review_rating"], rec["review_date"],
+                        "")  # domestic: no origin country
+            if rv.review_text and (dedupe is None or dedupe.add(rv)):
+                yield rv
     except Exception as e:
         print(f"      ✗ Inline domestic scrape error: {e}")
-    return results
+
+def scrape_inline_domestic_blocks(driver, limit=200, dedupe=None) -> list:
+    return list(iter_inline_domestic_blocks(driver, limit, dedupe))
 
 # -------------------- reviews: foreign --------------------
 def parse_country_from_date(date_text: str) -> str:
@@ -393,116 +463,53 @@ def go_to_global_reviews_if_possible(driver) -> bool:
             continue
     return False
 
-def scrape_inline_foreign_blocks(driver, limit=200) -> list[dict]:
-    results = []
-    blocks = driver.find_elements(By.XPATH, '//div[starts-with(@id,"customer_review_foreign-")]')
-    print(f"      Inline foreign blocks found: {len(blocks)}")
-    for b in blocks[:limit]:
-        try:
-            title = ""
-            for xp in ['.//a[@data-hook="review-title"]//span', './/span[@data-hook="review-title"]']:
-                try:
-                    title = b.find_element(By.XPATH, xp).text.strip()
-                    if title: break
-                except: continue
-
-            text = ""
-            for xp in ['.//span[@data-hook="review-body"]//span',
-                       './/div[4]//span']:
-                try:
-                    text = b.find_element(By.XPATH, xp).text.strip()
-                    if text: break
-                except: continue
-
-            rating = ""
-            for xp in ['.//i[@data-hook="review-star-rating"]//span',
-                       './/span[contains(@class,"a-icon-alt")]']:
-                try:
-                    rating = b.find_element(By.XPATH, xp).text.strip()
-                    if rating: break
-                except: continue
-
-            date = ""
-            for xp in ['.//span[@data-hook="review-date"]',
-                       './/span[contains(@class,"review-date")]']:
-                try:
-                    date = b.find_element(By.XPATH, xp).text.strip()
-                    if date: break
-                except: continue
-
-            if text:
-                results.append({
-                    "review_title": title,
-                    "review_text": text,
-                    "review_rating": rating,
-                    "review_date": date,
-                    "origin_country": parse_country_from_date(date)
-                })
-        except:
-            continue
-    return results
+def iter_inline_foreign_blocks(driver, limit=200, dedupe=None):
+    records = INLINE_FOREIGN_CHAINS.resolve(driver, limit=limit)
+    print(f"      Inline foreign blocks found: {len(records)}")
+    for rec in records:
+        rv = Review(rec["review_title"], rec["review_text"], rec["review_rating"], rec["review_date"],
+                    parse_country_from_date(rec["review_date"]))
+        if rv.review_text and (dedupe is None or dedupe.add(rv)):
+            yield rv
 
-def scrape_foreign_reviews_from_reviews_page(driver, max_pages=3, max_reviews=200) -> list[dict]:
-    collected: list[dict] = []
+def scrape_inline_foreign_blocks(driver, limit=200, dedupe=None) -> list:
+    return list(iter_inline_foreign_blocks(driver, limit, dedupe))
+
+def iter_foreign_reviews_from_reviews_page(driver, max_pages=3, max_reviews=200, capture=None, dedupe=None):
+    n = 0
     cur = driver.current_url
+    if capture: capture.reset()
     at_global = "/global-reviews/" in cur or go_to_global_reviews_if_possible(driver)
 
     if at_global:
         print("    ✓ On global-reviews listing; scraping foreign reviews (paged)")
         for page in range(1, max_pages + 1):
             time.sleep(1)
-            blocks = []
-            for selector in ['//div[@data-hook="review"]',
-                             '//div[contains(@class,"a-section review aok-relative")]']:
-                try:
-                    blocks = driver.find_elements(By.XPATH, selector)
-                    if blocks: break
-                except: continue
-
-            print(f"      Global page {page}: {len(blocks)} reviews")
-            for b in blocks:
-                try:
-                    title = ""
-                    for xp in ['.//a[@data-hook="review-title"]//span', './/span[@data-hook="review-title"]']:
-                        try:
-                            title = b.find_element(By.XPATH, xp).text.strip()
-                            if title: break
-                        except: continue
-
-                    text = ""
-                    for xp in ['.//span[@data-hook="review-body"]//span', './/span[@data-hook="review-body"]']:
-                        try:
-                            text = b.find_element(By.XPATH, xp).text.strip()
-                            if text: break
-                        except: continue
-
-                    rating = ""
-                    for xp in ['.//i[@data-hook="review-star-rating"]//span', './/i[contains(@class,"a-icon-star")]//span']:
-                        try:
-                            rating = b.find_element(By.XPATH, xp).text.strip()
-                            if rating: break
-                        except: continue
-
-                    date = ""
-                    for xp in ['.//span[@data-hook="review-date"]', './/span[contains(@class,"review-date")]']:
-                        try:
-                            date = b.find_element(By.XPATH, xp).text.strip()
-                            if date: break
-                        except: continue
-
-                    if text:
-                        collected.append({
-                            "review_title": title,
-                            "review_text": text,
-                            "review_rating": rating,
-                            "review_date": date,
-                            "origin_country": parse_country_from_date(date)
-                        })
-                        if len(collected) >= max_reviews:
-                            print("      Reached max foreign reviews limit")
-                            return collected
-                except:
-                    continue
+            captured = capture.collect(origin_country_from_date=parse_country_from_date) if capture else []
+            if captured:
+                print(f"      Global page {page}: captured {len(captured)} reviews from network payloads")
+                fresh = dedupe.filter(captured) if dedupe else captured
+                for rv in fresh[: max_reviews - n]:
+                    n += 1
+                    yield Review.from_dict(rv)
+                if n >= max_reviews:
+                    print("      Reached max foreign reviews limit")
+                    return
+
+            records = []
+            if not captured:
+                records = REVIEW_CHAINS.resolve(driver)
+                print(f"      Global page {page}: {len(records)} reviews")
+
+            for rec in records:
+                rv = Review(rec["review_title"], rec["review_text"], rec["review_rating"], rec["review_date"],
+                            parse_country_from_date(rec["review_date"]))
+                if rv.review_text and (dedupe is None or dedupe.add(rv)):
+                    n += 1
+                    yield rv
+                    if n >= max_reviews:
+                        print("      Reached max foreign reviews limit")
+                        return
 
             next_clicked = False
             for xp in ['//ul[@class="a-pagination"]//li[@class="a-last"]/a',
@@ -513,12 +520,15 @@ def scrape_foreign_reviews_from_reviews_page(driver, max_pages=3, max_reviews=20
                     break
             if not next_clicked:
                 break
-
-        return collected
+        return
 
     # Not on global list → try inline
     print("    • Scraping inline foreign blocks on the current page")
-    return scrape_inline_foreign_blocks(driver, limit=max_reviews)
+    yield from iter_inline_foreign_blocks(driver, limit=max_reviews, dedupe=dedupe)
+
+def scrape_foreign_reviews_from_reviews_page(driver, max_pages=3, max_reviews=200, capture=None,
+                                             dedupe=None) -> list:
+    return list(iter_foreign_reviews_from_reviews_page(driver, max_pages, max_reviews, capture, dedupe))
 
 # -------------------- search tile parsing --------------------
 def get_product_info_from_element(driver, product, index):
@@ -527,14 +537,7 @@ def get_product_info_from_element(driver, product, index):
         asin = product.get_attribute('data-asin')
 
         title = ""
-        for selector in [
-            'h2 a span','h2 span','.a-size-mini .a-color-base','.s-size-mini',
-            'h2 .a-link-normal span','[data-cy="title-recipe-title"]','.a-size-base-plus',
-            'a span.a-text-normal','.a-size-base','.a-color-base','span.a-text-normal',
-            '.s-color-base','.s-size-mini.s-spacing-none.s-color-base','h2.a-size-mini span',
-            '.a-link-normal .a-text-normal','.//h2//span[string-length(text()) > 10]',
-            './/a[contains(@href, "/dp/")]//span[string-length(text()) > 10]'
-        ]:
+        for selector in TILE_TITLE_SELECTORS:
             try:
                 el = product.find_element(By.XPATH, selector) if selector.startswith('.//') else product.find_element(By.CSS_SELECTOR, selector)
                 t = el.text.strip()
@@ -543,12 +546,10 @@ def get_product_info_from_element(driver, product, index):
             except: continue
 
         url = ""
-        for selector in [
-            'h2 a','.a-link-normal[href*="/dp/"]','a[href*="/dp/"]','.s-link-style a',
-            'a.a-text-normal','a[href*="/gp/"]','.a-link-normal',
-            f'a[href*="{asin}"]' if asin else None,'.//a[contains(@href, "/dp/")]','.//h2//a'
-        ]:
-            if not selector: continue
+        for selector in TILE_URL_SELECTORS:
+            if "{asin}" in selector:
+                if not asin: continue
+                selector = selector.format(asin=asin)
             try:
                 el = product.find_element(By.XPATH, selector) if selector.startswith('.//') else product.find_element(By.CSS_SELECTOR, selector)
                 href = el.get_attribute('href')
@@ -558,11 +559,7 @@ def get_product_info_from_element(driver, product, index):
             except: continue
 
         price = ""
-        for selector in [
-            '.a-price .a-offscreen','.a-price-whole',
-            './/span[contains(@class, "a-price")]//span[@class="a-offscreen"]',
-            './/span[contains(text(), "$")]'
-        ]:
+        for selector in TILE_PRICE_SELECTORS:
             try:
                 el = product.find_element(By.XPATH, selector) if selector.startswith('.//') else product.find_element(By.CSS_SELECTOR, selector)
                 t = (el.text or el.get_attribute('textContent') or "").strip()
@@ -570,101 +567,211 @@ def get_product_info_from_element(driver, product, index):
                     price = t; break
             except: continue
 
-        return {'title': title, 'url': url, 'price': price or "Price not available", 'asin': asin or "Not found"}
+        image_url = ""
+        for selector in TILE_IMAGE_SELECTORS:
+            try:
+                el = product.find_element(By.XPATH, selector) if selector.startswith('.//') else product.find_element(By.CSS_SELECTOR, selector)
+                src = el.get_attribute('src') or ""
+                if src.startswith('http'):
+                    image_url = src; break
+            except: continue
+
+        for field, val in (("tile_title", title), ("tile_url", url), ("tile_price", price)):
+            if not val: METRICS.selector_miss("amazon", field)
+        return {'title': title, 'url': url, 'price': price or "Price not available", 'asin': asin or "Not found",
+                'image_url': image_url}
     except Exception as e:
         print(f"  ✗ Error extracting info for product {index}: {str(e)}")
         return None
 
 # -------------------- product details orchestrator --------------------
-def scrape_product_details(driver, product_url, product_number,
-                           max_review_pages=5, max_reviews=300,
-                           max_foreign_pages=3, max_foreign_reviews=200):
-    try:
-        print(f"  → Visiting product {product_number} page...")
-        driver.get(product_url)
-        wait_for_page_load(driver, 10)
-        product_link = get_product_link(driver, product_number)
-
-        # Overall rating / number of ratings
-        overall_rating, num_ratings = "", ""
+# Output columns of each extraction stage, for --fields (field_plan.FieldPlan). "tile" comes from the
+# search results page; every other stage needs the product page, and the review stages their own pages.
+FIELD_STAGES = {
+    "tile": ["Product_Number", "Title", "Price", "URL", "ASIN", "Image_URL", "Image_Path", "Thumbnail_Path"],
+    "link": ["Product_Link"],
+    "rating": ["Overall_Rating", "Number_of_Ratings"],
+    "warranty": ["Warranty_Heading", "Warranty_Text"],
+    "reviews": ["Review_?", "All_Reviews_Concat", "Domestic_Reviews_Count", "Avg_Review_Rating"],
+    "foreign_reviews": ["Foreign_Review_?", "All_Foreign_Reviews_Concat", "Foreign_Reviews_Count"],
+    "marketplaces": ["Price_??", "Overall_Rating_??", "Number_of_Ratings_??", "Reviews_??"],
+}
+PRODUCT_PAGE_STAGES = [s for s in FIELD_STAGES if s != "tile"]
+
+def read_product_summary(driver) -> dict:
+    """amazon_product_fields() of the current product page, with DOM fallbacks for rating and rating count."""
+    # Overall rating / number of ratings: JSON-LD / page state first (one round trip), DOM for what's missing
+    structured = amazon_product_fields(read_structured_data(driver))
+    if not structured["overall_rating"]:
         for selector in ['//*[@id="acrPopover"]/span[1]/a/span','//*[contains(@class,"a-icon-alt")]','//*[@data-hook="rating-out-of-text"]']:
             try:
                 el = driver.find_element(By.XPATH, selector)
                 text = (el.text or el.get_attribute('textContent') or "").strip()
                 if text and ('out of' in text.lower() or 'star' in text.lower()):
-                    overall_rating = text; break
+                    structured["overall_rating"] = text; break
             except: continue
 
+    if not structured["num_ratings"]:
         for selector in ['//*[@id="acrCustomerReviewText"]','//*[@data-hook="total-review-count"]','//*[contains(text(),"rating") or contains(text(),"review")]']:
             try:
                 el = driver.find_element(By.XPATH, selector)
                 t = (el.text or "").strip()
                 if t and ('rating' in t.lower() or 'review' in t.lower()):
-                    num_ratings = t; break
+                    structured["num_ratings"] = t; break
             except: continue
+    return structured
 
-        warranty = scrape_warranty_support(driver)
+def read_marketplace_page(driver, max_reviews: int = 10) -> dict:
+    """Summary fields + local reviews of a product page (marketplace_fanout read_page)."""
+    fields = read_product_summary(driver)
+    reviews = list(iter_inline_domestic_blocks(driver, limit=max_reviews)) if max_reviews else []
+    return {"price": fields["price"], "overall_rating": fields["overall_rating"],
+            "num_ratings": fields["num_ratings"], "availability": fields["availability"], "reviews": reviews}
 
-        # Reviews: domestic
-        reviews_page_url = open_reviews_page_from_product(driver, product_url)
-        domestic_reviews = scrape_full_reviews_from_reviews_page(
-            driver, reviews_page_url or "", max_pages=max_review_pages, max_reviews=max_reviews
-        )
+def scrape_product_details(driver, product_url, product_number,
+                           max_review_pages=5, max_reviews=300,
+                           max_foreign_pages=3, max_foreign_reviews=200, review_capture=None,
+                           review_sample_per_star=0, review_state=None, near_duplicate_reviews=False,
+                           review_sink=None, asin=None, marketplace_fanout=None, plan=None, raise_errors=False):
+    """
+    review_sample_per_star > 0: domestic reviews are a stratified sample (that many per star bucket,
+    max_review_pages pages per bucket) instead of the first max_review_pages pages of the default order.
+    review_state: a review_delta.ReviewDeltaState; domestic reviews are read newest first and only the
+    ones newer than the last run are returned (usually a single page for a product already scraped).
+    Reviews are de-duplicated across all sources as they are scraped (review id / normalized text);
+    near_duplicate_reviews also drops near-copies (syndicated reviews, word-bigram Jaccard).
+    review_sink: a review_stream.ReviewSink; reviews are written to it as they are scraped and
+    reviews_full / reviews_foreign are ReviewStats that keep only the first PREVIEW records
+    (without a sink they keep every record, like the lists they replace).
+    marketplace_fanout: {"codes", "url_template", "max_reviews", "max_parallel"} for marketplace_fanout.fetch_marketplaces();
+    the ASIN is also loaded from those Amazon marketplaces (concurrently) and returned under 'marketplaces'.
+    plan: a field_plan.FieldPlan over FIELD_STAGES (--fields); stages it does not need are skipped
+    entirely (no share-link click, warranty expanders or review navigations) and return empty values.
+    raise_errors: re-raise instead of returning the "Error loading" placeholders (crawl_queue retries the task).
+    """
+    need = plan.needs if plan else (lambda *stages: True)
+    try:
+        print(f"  → Visiting product {product_number} page...")
+        driver.get(product_url)
+        wait_for_page_load(driver, 10)
+        product_link = get_product_link(driver, product_number) if need("link") else ""
+
+        structured = read_product_summary(driver) if need("rating") else \
+            {"overall_rating": "", "num_ratings": "", "price": "", "availability": ""}
+        overall_rating, num_ratings = structured["overall_rating"], structured["num_ratings"]
+
+        warranty = scrape_warranty_support(driver) if need("warranty") else {"warranty_heading": "", "warranty_text": ""}
+
+        # Reviews are consumed as they are scraped: aggregates + preview here, rows to the sink
+        def collect(reviews, source):
+            stats = ReviewStats(keep=PREVIEW if review_sink else None)
+            for rv in reviews:
+                stats.add(rv)
+                if review_sink:
+                    review_sink.write(review_row(rv, asin or "", product_number, source))
+            return stats
 
-        # Fallback inline domestic if needed
-        if not domestic_reviews:
+        # Reviews: domestic
+        dedupe = ReviewDeduper(near_duplicates=near_duplicate_reviews)
+        asin = asin or get_asin_from_url(product_url)
+        if not need("reviews"):
+            reviews_page_url, domestic_reviews = None, ReviewStats()
+        elif review_state is not None and asin:
+            reviews_page_url = f"https://www.amazon.com/product-reviews/{asin}/?reviewerType=all_reviews&sortBy=recent"
+            known = review_state.known_keys(asin)
+            domestic_reviews = collect(iter_reviews_from_reviews_page(
+                driver, reviews_page_url, max_pages=max_review_pages, max_reviews=max_reviews,
+                capture=review_capture, known_keys=known, dedupe=dedupe
+            ), "domestic")
+            review_state.update(asin, domestic_reviews)
+            print(f"    • Review delta: {len(domestic_reviews)} new since last run" if known else
+                  f"    • Review delta: first run for {asin}, {len(domestic_reviews)} reviews recorded")
+        elif review_sample_per_star and asin:
+            # The bucket URLs are built from the ASIN, so skip the product page → reviews page click
+            reviews_page_url = f"https://www.amazon.com/product-reviews/{asin}/?reviewerType=all_reviews"
+            domestic_reviews = collect(iter_reviews_by_star(
+                driver, reviews_page_url, per_star=review_sample_per_star,
+                max_pages_per_star=max_review_pages, capture=review_capture, dedupe=dedupe
+            ), "domestic")
+        else:
+            reviews_page_url = open_reviews_page_from_product(driver, product_url)
+            domestic_reviews = collect(iter_reviews_from_reviews_page(
+                driver, reviews_page_url or "", max_pages=max_review_pages, max_reviews=max_reviews,
+                capture=review_capture, dedupe=dedupe
+            ), "domestic")
+
+        # Fallback inline domestic if needed (in delta mode no new reviews is the normal outcome)
+        if not domestic_reviews and review_state is None and need("reviews"):
             print("    • Domestic reviews not found on reviews page; trying inline domestic blocks")
             driver.get(product_url); wait_for_page_load(driver, 8)
-            domestic_reviews = scrape_inline_domestic_blocks(driver, limit=max_reviews)
+            domestic_reviews = collect(iter_inline_domestic_blocks(driver, limit=max_reviews, dedupe=dedupe), "domestic")
 
         # Reviews: foreign
-        foreign_reviews = []
-        if reviews_page_url:
-            foreign_reviews = scrape_foreign_reviews_from_reviews_page(
-                driver, max_pages=max_foreign_pages, max_reviews=max_foreign_reviews
-            )
-        if not foreign_reviews:
-            print("    • Foreign reviews not found via global page; trying inline extraction")
-            driver.get(product_url); wait_for_page_load(driver, 6)
-            foreign_reviews = scrape_inline_foreign_blocks(driver, limit=max_foreign_reviews)
-
-        print(f"    ✓ Collected: domestic={len(domestic_reviews)}, foreign={len(foreign_reviews)}")
+        foreign_reviews = ReviewStats()
+        if need("foreign_reviews"):
+            # Without domestic reviews we are still on the product page, which links to the global list too
+            if reviews_page_url or not need("reviews"):
+                foreign_reviews = collect(iter_foreign_reviews_from_reviews_page(
+                    driver, max_pages=max_foreign_pages, max_reviews=max_foreign_reviews,
+                    capture=review_capture, dedupe=dedupe
+                ), "foreign")
+            if not foreign_reviews:
+                print("    • Foreign reviews not found via global page; trying inline extraction")
+                driver.get(product_url); wait_for_page_load(driver, 6)
+                foreign_reviews = collect(iter_inline_foreign_blocks(driver, limit=max_foreign_reviews, dedupe=dedupe),
+                                          "foreign")
+
+        # Same ASIN on other Amazon marketplaces, loaded concurrently
+        marketplaces = {}
+        if marketplace_fanout and asin and need("marketplaces"):
+            from marketplace_fanout import fetch_marketplaces, marketplace_source
+            for code, res in fetch_marketplaces(driver, asin, read_marketplace_page, wait_for_page_load,
+                                                **marketplace_fanout).items():
+                res["source"] = marketplace_source(code)
+                res["reviews"] = collect((rv for rv in res["reviews"] if dedupe.add(rv)), res["source"])
+                marketplaces[code] = res
+            print("    ✓ Marketplaces: " + ", ".join(f"{c}={m['price'] or '-'}/{len(m['reviews'])} reviews"
+                                                    for c, m in marketplaces.items()))
+
+        print(f"    ✓ Collected: domestic={len(domestic_reviews)}, foreign={len(foreign_reviews)}"
+              + (f" ({dedupe.total_dropped} duplicates dropped)" if dedupe.total_dropped else ""))
+        if need("rating"):
+            if not overall_rating: METRICS.selector_miss("amazon", "overall_rating")
+            if not num_ratings: METRICS.selector_miss("amazon", "num_ratings")
+        METRICS.reviews_per_product.observe(len(domestic_reviews) + len(foreign_reviews), site="amazon")
 
         return {
             'overall_rating': overall_rating or "Not found",
             'num_ratings': num_ratings or "Not found",
             'reviews_full': domestic_reviews,
             'reviews_foreign': foreign_reviews,
+            'reviews_streamed': review_sink is not None,
+            'marketplaces': marketplaces,
             'product_link': product_link,
             'warranty_heading': warranty["warranty_heading"],
-            'warranty_text': warranty["warranty_text"]
+            'warranty_text': warranty["warranty_text"],
+            'price': structured["price"],
+            'availability': structured["availability"],
         }
 
     except Exception as e:
         print(f"    ✗ Error scraping details for product {product_number}: {str(e)}")
+        if raise_errors:
+            raise
         return {
             'overall_rating': "Error loading",
             'num_ratings': "Error loading",
             'reviews_full': [],
             'reviews_foreign': [],
+            'reviews_streamed': review_sink is not None,
             'product_link': "Error loading",
             'warranty_heading': "Error loading",
             'warranty_text': "Error loading"
         }
 
 # -------------------- main: scrape products --------------------
-def scrape_products(
-    driver,
-    max_products: int = 30,
-    max_review_pages: int = 5,
-    max_reviews: int = 300,
-    max_foreign_pages: int = 3,
-    max_foreign_reviews: int = 200,
-):
-    products_data = []
-    print(f"Starting to scrape up to {max_products} products...")
-
-    search_results_url = driver.current_url
+def collect_product_infos(driver, max_products: int = 30) -> list[dict]:
+    """Parse title/url/price/asin from the search tiles on the current results page."""
     wait_for_page_load(driver, 10)
     driver.execute_script("window.scrollTo(0, document.body.scrollHeight/3);")
     time.sleep(1.2)
@@ -672,14 +779,7 @@ def scrape_products(
     # Find product tiles
     product_infos = []
     products = []
-    for selector in [
-        '[data-component-type="s-search-result"]',
-        '.s-result-item[data-component-type="s-search-result"]',
-        '[data-asin]:not([data-asin=""])',
-        '.s-result-item',
-        '//div[@data-component-type="s-search-result"]',
-        '//div[contains(@class, "s-result-item") and @data-asin]',
-    ]:
+    for selector in TILE_SELECTORS:
         try:
             if selector.startswith('//'):
                 products = driver.find_elements(By.XPATH, selector)
@@ -693,7 +793,7 @@ def scrape_products(
 
     if not products:
         print("No products found with any selector")
-        return pd.DataFrame()
+        return product_infos
 
     # Parse basic info from tiles
     for i, product in enumerate(products[: max_products * 2], 1):
@@ -709,11 +809,110 @@ def scrape_products(
             continue
 
     print(f"\nCollected basic info for {len(product_infos)} products")
+    return product_infos
+
+def build_product_row(i: int, product_info: dict, details: dict) -> dict:
+    """One output row from the search tile info + scrape_product_details() result."""
+    domestic, foreign = details.get("reviews_full", []), details.get("reviews_foreign", [])
+    # Exactly 5 domestic + 5 foreign review texts; never NaN
+    domestic_top5 = top_k_review_texts(domestic, k=5)
+    foreign_top5  = top_k_review_texts(foreign, k=5)
+
+    review_cols  = {f"Review_{k+1}": domestic_top5[k] for k in range(5)}
+    foreign_cols = {f"Foreign_Review_{k+1}": foreign_top5[k] for k in range(5)}
+
+    if details.get("reviews_streamed"):
+        # Only a preview was kept; the full texts are in the reviews table, the row gets aggregates
+        review_agg = {"Domestic_Reviews_Count": len(domestic),
+                      "Avg_Review_Rating": domestic.mean_rating if isinstance(domestic, ReviewStats) else None}
+    else:
+        review_agg = {
+            "All_Reviews_Concat": " ||| ".join([t for t in top_k_review_texts(domestic, k=999) if t]),
+            "All_Foreign_Reviews_Concat": " ||| ".join([t for t in top_k_review_texts(foreign, k=999) if t]),
+        }
+
+    # --marketplaces: price / rating / local review count per marketplace, e.g. Price_UK, Overall_Rating_DE
+    market_cols = {}
+    for code, m in (details.get("marketplaces") or {}).items():
+        c = code.upper()
+        market_cols.update({f"Price_{c}": m["price"], f"Overall_Rating_{c}": m["overall_rating"],
+                            f"Number_of_Ratings_{c}": m["num_ratings"], f"Reviews_{c}": len(m["reviews"])})
+
+    return {
+        "Product_Number": i,
+        "Title": product_info["title"],
+        # Tile price; the product page's structured price when the tile had none
+        "Price": details.get("price") if product_info["price"] == "Price not available" and details.get("price")
+                 else product_info["price"],
+        "URL": product_info["url"],
+        "ASIN": product_info["asin"],
+        "Image_URL": product_info.get("image_url", ""),
+        "Overall_Rating": details.get("overall_rating", "Not found"),
+        "Number_of_Ratings": details.get("num_ratings", "Not found"),
+        "Product_Link": details.get("product_link", ""),
+        "Warranty_Heading": details.get("warranty_heading", "Not found"),
+        "Warranty_Text": details.get("warranty_text", "Not found"),
+        **review_agg,
+        "Foreign_Reviews_Count": len(foreign or []),
+        **review_cols,
+        **foreign_cols,
+        **market_cols,
+    }
+
+def scrape_products(
+    driver,
+    max_products: int = 30,
+    max_review_pages: int = 5,
+    max_reviews: int = 300,
+    max_foreign_pages: int = 3,
+    max_foreign_reviews: int = 200,
+    reviews_out: list | None = None,
+    review_capture=None,
+    images=None,
+    review_sample_per_star: int = 0,
+    review_state=None,
+    near_duplicate_reviews: bool = False,
+    review_sink=None,
+    marketplace_fanout: dict | None = None,
+    plan=None,
+    rank_history=None,
+    query: str = "",
+):
+    """
+    Scrape the current results page and return plain row dicts (no pandas needed).
+    If reviews_out is a list, per-review rows are appended to it.
+    review_sink: a review_stream.ReviewSink that receives per-review rows as they are scraped instead.
+    marketplace_fanout: also load each ASIN from other Amazon marketplaces (see scrape_product_details).
+    plan: field_plan.FieldPlan (--fields); with only tile columns requested no product page is opened.
+    images: an image_pipeline.ImagePipeline; tile images are queued for background download.
+    With a page_prefetch.PrefetchingDriver (--prefetch_depth) the next product pages load in background
+    tabs while the current one is extracted, and the loop no longer returns to the results page in between.
+    rank_history: a rank_history.RankHistory; the tile order (ASIN, tile price) is recorded under query.
+    """
+    products_data = []
+    print(f"Starting to scrape up to {max_products} products...")
+
+    search_results_url = driver.current_url
+    product_infos = collect_product_infos(driver, max_products)
+    if not product_infos:
+        return products_data
+    if rank_history:
+        rank_history.record("amazon", query, [(info["asin"], info["price"]) for info in product_infos])
+    if images:
+        for info in product_infos:
+            images.submit(info.get("image_url"))
+    if plan and not plan.needs(*PRODUCT_PAGE_STAGES):
+        print(f"Only search tile columns requested ({plan.describe()}); product pages are not visited")
+        return [build_product_row(i, info, {}) for i, info in enumerate(product_infos, 1)]
+
+    prefetch = getattr(driver, "prefetch", None)  # page_prefetch.PrefetchingDriver (--prefetch_depth)
 
     # Visit each product
     for i, product_info in enumerate(product_infos, 1):
         try:
             print(f"\nScraping product {i}/{len(product_infos)}: {product_info['title'][:60]}...")
+            if prefetch:
+                prefetch([p["url"] for p in product_infos[i:]])  # the next ones, up to the depth
             details = scrape_product_details(
                 driver,
                 product_info["url"],
@@ -722,41 +921,27 @@ def scrape_products(
                 max_reviews=max_reviews,
                 max_foreign_pages=max_foreign_pages,
                 max_foreign_reviews=max_foreign_reviews,
+                review_capture=review_capture,
+                review_sample_per_star=review_sample_per_star,
+                review_state=review_state,
+                near_duplicate_reviews=near_duplicate_reviews,
+                review_sink=review_sink,
+                asin=product_info["asin"],
+                marketplace_fanout=marketplace_fanout,
+                plan=plan,
             )
-
-            # Exactly 5 domestic + 5 foreign review texts; never NaN
-            domestic_top5 = top_k_review_texts(details.get("reviews_full", []), k=5)
-            foreign_top5  = top_k_review_texts(details.get("reviews_foreign", []), k=5)
-
-            review_cols  = {f"Review_{k+1}": domestic_top5[k] for k in range(5)}
-            foreign_cols = {f"Foreign_Review_{k+1}": foreign_top5[k] for k in range(5)}
-
-            all_reviews_concat = " ||| ".join([t for t in top_k_review_texts(details.get("reviews_full", []), k=999) if t])
-            all_foreign_concat = " ||| ".join([t for t in top_k_review_texts(details.get("reviews_foreign", []), k=999) if t])
-
-            product_data = {
-                "Product_Number": i,
-                "Title": product_info["title"],
-                "Price": product_info["price"],
-                "URL": product_info["url"],
-                "ASIN": product_info["asin"],
-                "Overall_Rating": details.get("overall_rating", "Not found"),
-                "Number_of_Ratings": details.get("num_ratings", "Not found"),
-                "Product_Link": details.get("product_link", ""),
-                "Warranty_Heading": details.get("warranty_heading", "Not found"),
-                "Warranty_Text": details.get("warranty_text", "Not found"),
-                "All_Reviews_Concat": all_reviews_concat,
-                "All_Foreign_Reviews_Concat": all_foreign_concat,
-                "Foreign_Reviews_Count": len(details.get("reviews_foreign", []) or []),
-                **review_cols,
-                **foreign_cols,
-            }
-            products_data.append(product_data)
+            products_data.append(build_product_row(i, product_info, details))
+            if reviews_out is not None:
+                reviews_out.extend(review_rows(details.get("reviews_full"), product_info["asin"], i, "domestic"))
+                reviews_out.extend(review_rows(details.get("reviews_foreign"), product_info["asin"], i, "foreign"))
+                for m in (details.get("marketplaces") or {}).values():
+                    reviews_out.extend(review_rows(m["reviews"], product_info["asin"], i, m["source"]))
             print(f"  ✓ Product {i} done")
 
-            # Back to results
-            driver.get(search_results_url)
-            wait_for_page_load(driver, 5)
+            # Back to results (product URLs are already collected; with prefetch the next page is waiting)
+            if not prefetch:
+                driver.get(search_results_url)
+                wait_for_page_load(driver, 5)
 
         except Exception as e:
             print(f"✗ Error scraping product {i}: {str(e)}")
@@ -768,15 +953,27 @@ def scrape_products(
                 pass
             continue
 
+    if prefetch:
+        driver.finish_prefetch()
     print(f"\nSuccessfully scraped {len(products_data)} products with detailed information")
-    df = pd.DataFrame(products_data).fillna("")  # ensure no NaN in review columns
-    return df
+    return products_data
 
 # -------------------- orchestrator --------------------
-def amazon_detailed_scraper(search_term, max_products=5, executor_url="http://127.0.0.1:9515",
-                            chrome_binary=None, max_review_pages=5, max_reviews=300,
-                            max_foreign_pages=3, max_foreign_reviews=200):
-    website = "https://www.amazon.com/"
+AMAZON_HOME = "https://www.amazon.com/"
+
+def build_driver(executor_url: str, chrome_binary: str | None = None, capture_reviews_network=False,
+                 lightweight=False, backend="selenium", cdp_url="http://127.0.0.1:9222"):
+    """
+    lightweight: no images + 'eager' page loads (DOM ready is enough for quick price checks).
+    backend="cdp": a cdp_backend.CDPDriver tab on the Chrome at cdp_url (launched if chrome_binary is given).
+    """
+    if backend == "cdp":
+        from cdp_backend import CDPDriver
+        return CDPDriver.connect(cdp_url, chrome_binary, lightweight=lightweight,
+                                 performance_log=capture_reviews_network)
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
     options = Options()
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
@@ -789,73 +986,194 @@ def amazon_detailed_scraper(search_term, max_products=5, executor_url="http://12
     options.add_experimental_option("detach", True)
     if chrome_binary:
         options.binary_location = chrome_binary
+    if capture_reviews_network:
+        enable_performance_logging(options)
+    if lightweight:
+        options.page_load_strategy = "eager"
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    driver = webdriver.Remote(command_executor=executor_url, options=options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    return driver
+
+def open_amazon_home(driver):
+    """Open the storefront and dismiss the common region/continue popups."""
+    driver.get(AMAZON_HOME)
+    print("Successfully opened Amazon")
+    wait_for_page_load(driver, 10)
+    for xp in [
+        '//button[@alt="Continue shopping"]',
+        '//button[contains(text(), "Continue")]',
+        '//input[@aria-labelledby="GLUXZipUpdateButton"]'
+    ]:
+        if try_click(driver, By.XPATH, xp, timeout=2):
+            print("Dismissed popup"); break
 
-    try:
-        driver = webdriver.Remote(command_executor=executor_url, options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        driver.get(website)
-        print("Successfully opened Amazon")
-        wait_for_page_load(driver, 10)
+def search_amazon(driver, search_term: str) -> bool:
+    """Type the query into the storefront search box and submit. False if the box is missing."""
+    from selenium.webdriver.common.keys import Keys
 
-        # Dismiss common popups
-        for xp in [
-            '//button[@alt="Continue shopping"]',
-            '//button[contains(text(), "Continue")]',
-            '//input[@aria-labelledby="GLUXZipUpdateButton"]'
-        ]:
-            if try_click(driver, By.XPATH, xp, timeout=2):
-                print("Dismissed popup"); break
-
-        # Search
-        search_box = None
-        for xp in ['//*[@id="twotabsearchtextbox"]','//input[@name="field-keywords"]','#twotabsearchtextbox']:
-            try:
-                search_box = driver.find_element(By.CSS_SELECTOR, xp) if xp.startswith('#') else driver.find_element(By.XPATH, xp)
-                break
-            except: continue
-        if not search_box:
-            print("Could not find search box")
-            return pd.DataFrame()
+    search_box = None
+    for xp in ['//*[@id="twotabsearchtextbox"]','//input[@name="field-keywords"]','#twotabsearchtextbox']:
+        try:
+            search_box = driver.find_element(By.CSS_SELECTOR, xp) if xp.startswith('#') else driver.find_element(By.XPATH, xp)
+            break
+        except: continue
+    if not search_box:
+        print("Could not find search box")
+        return False
 
-        search_box.clear()
-        search_box.send_keys(search_term)
-        print(f"Entered '{search_term}' in search box")
-        time.sleep(1)
+    search_box.clear()
+    search_box.send_keys(search_term)
+    print(f"Entered '{search_term}' in search box")
+    time.sleep(1)
 
-        search_button = None
-        for xp in ['//*[@id="nav-search-submit-button"]','//input[@type="submit"][@value="Go"]','#nav-search-submit-button']:
-            try:
-                search_button = driver.find_element(By.CSS_SELECTOR, xp) if xp.startswith('#') else driver.find_element(By.XPATH, xp)
-                break
-            except: continue
-        if search_button: search_button.click()
-        else: search_box.send_keys(Keys.RETURN)
+    search_button = None
+    for xp in ['//*[@id="nav-search-submit-button"]','//input[@type="submit"][@value="Go"]','#nav-search-submit-button']:
+        try:
+            search_button = driver.find_element(By.CSS_SELECTOR, xp) if xp.startswith('#') else driver.find_element(By.XPATH, xp)
+            break
+        except: continue
+    if search_button: search_button.click()
+    else: search_box.send_keys(Keys.RETURN)
 
-        print("Search initiated")
-        wait_for_page_load(driver, 10)
+    print("Search initiated")
+    wait_for_page_load(driver, 10)
+    return True
+
+def amazon_detailed_scraper(search_term, max_products=5, executor_url="http://127.0.0.1:9515",
+                            chrome_binary=None, max_review_pages=5, max_reviews=300,
+                            max_foreign_pages=3, max_foreign_reviews=200, reviews_out=None,
+                            capture_reviews_network=False, supervise: dict | None = None,
+                            metered=False, backend="selenium", cdp_url="http://127.0.0.1:9222",
+                            images=None, review_sample_per_star=0, archive=None,
+                            review_state=None, near_duplicate_reviews=False, review_sink=None,
+                            marketplace_fanout: dict | None = None, plan=None, rank_history=None,
+                            prefetch_depth=0) -> list[dict]:
+    """
+    supervise: SupervisedDriver thresholds (max_navigations, max_browser_mb, max_heap_mb, latency_growth,
+    sample_every, log_path). When given, the session is health-monitored and recycled.
+    metered: time navigations and count pages / block pages in run_metrics.METRICS.
+    backend: "selenium" (chromedriver at executor_url) or "cdp" (DevTools websocket at cdp_url).
+    images: optional image_pipeline.ImagePipeline fed with the search tile images.
+    review_sample_per_star: stratified domestic review sample size per star bucket (0 = default order).
+    archive: optional page_archive.PageArchive; every loaded page's HTML is saved for page_parser.py.
+    review_state: optional review_delta.ReviewDeltaState; only reviews newer than the last run are fetched.
+    near_duplicate_reviews: also drop near-copies of reviews (exact duplicates are always dropped).
+    review_sink: optional review_stream.ReviewSink; review rows are streamed to it (bounded memory).
+    marketplace_fanout: {"codes", "url_template", "max_reviews"}; each ASIN is also fetched from those marketplaces.
+    plan: field_plan.FieldPlan built from --fields; only the stages it needs are run.
+    rank_history: optional rank_history.RankHistory; each run's result positions are recorded under search_term.
+    prefetch_depth: load this many upcoming product pages in background tabs (page_prefetch.py; 0 = off).
+    """
+    try:
+        review_capture = None
+
+        def bootstrap(d):
+            if review_capture:
+                review_capture.start()
+            open_amazon_home(d)
+
+        def build():
+            return build_driver(executor_url, chrome_binary, capture_reviews_network, backend=backend, cdp_url=cdp_url)
+
+        if supervise:
+            driver = SupervisedDriver(build, bootstrap=bootstrap, **supervise)
+        else:
+            driver = build()
+        if prefetch_depth:
+            from page_prefetch import PrefetchingDriver
+            driver = PrefetchingDriver(driver, prefetch_depth)
+        METRICS.active_sessions.inc(site="amazon")
+        if metered:
+            driver = MeteredDriver(driver, "amazon")
+        if archive:
+            from page_archive import ArchivingDriver
+            driver = ArchivingDriver(driver, archive)
+        if capture_reviews_network:
+            review_capture = ReviewNetworkCapture(driver)
+            if review_capture.start():
+                print("Review network capture enabled")
+        if not supervise:
+            open_amazon_home(driver)
+
+        if not search_amazon(driver, search_term):
+            return []
 
         return scrape_products(driver,
                                max_products=max_products,
                                max_review_pages=max_review_pages,
                                max_reviews=max_reviews,
                                max_foreign_pages=max_foreign_pages,
-                               max_foreign_reviews=max_foreign_reviews)
+                               max_foreign_reviews=max_foreign_reviews,
+                               reviews_out=reviews_out,
+                               review_capture=review_capture,
+                               images=images,
+                               review_sample_per_star=review_sample_per_star,
+                               review_state=review_state,
+                               near_duplicate_reviews=near_duplicate_reviews,
+                               review_sink=review_sink,
+                               marketplace_fanout=marketplace_fanout,
+                               plan=plan,
+                               rank_history=rank_history,
+                               query=search_term)
 
     except Exception as e:
         print(f"Error initializing Remote Chrome or accessing Amazon: {e}")
-        return pd.DataFrame()
+        return []
     finally:
+        METRICS.active_sessions.set(0, site="amazon")
         print("Script finished - browser remains open for inspection")
 
 # -------------------- save wrapper & CLI --------------------
-def save_results(df: pd.DataFrame, query: str, out_dir: Path, out_csv: str | None) -> Path:
+def results_path(query: str, out_dir: Path, out_csv: str | None, out_format: str = "csv", suffix: str = "") -> Path:
     base_dir = (Path.cwd() / out_dir) if not Path(out_dir).is_absolute() else Path(out_dir)
     ensure_dir(base_dir)
     fname = out_csv if out_csv else f"{sanitize_name(query)}_{timestamp()}.csv"
-    csv_path = base_dir / fname
-    df.to_csv(csv_path, index=False)
-    print(f"\nSaved results to: {csv_path}")
-    return csv_path
+    path = base_dir / fname
+    return path.with_name(f"{path.stem}{suffix}.{out_format}")
+
+def save_results(rows: list[dict], query: str, out_dir: Path, out_csv: str | None,
+                 out_format: str = "csv", suffix: str = "", normalize=None) -> Path:
+    """
+    Write rows as JSON Lines (plain records, no pandas), CSV or Parquet.
+    For CSV/Parquet the rows go through a DataFrame and the optional normalize(df) stage;
+    Parquet keeps the typed columns from normalize.py.
+    """
+    path = results_path(query, out_dir, out_csv, out_format, suffix)
+    if out_format == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    else:
+        import pandas as pd
+        df = pd.DataFrame(rows).fillna("")  # ensure no NaN in review columns
+        if normalize:
+            df = normalize(df)
+        if out_format == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+    METRICS.rows_written.inc(len(rows), site="amazon", table=suffix.strip("_") or "products")
+    print(f"\nSaved results to: {path}")
+    return path
+
+def add_marketplace_args(p):
+    g = p.add_argument_group("other marketplaces")
+    g.add_argument("--marketplaces", type=str, default=None,
+                   help="Comma-separated marketplace codes (uk,de,jp,...) to fetch each ASIN from in parallel tabs")
+    g.add_argument("--marketplace_url_template", type=str, default="https://www.amazon.{tld}/dp/{asin}",
+                   help="Product URL per marketplace; placeholders {tld}, {code}, {asin} (e.g. local stand-in hosts)")
+    g.add_argument("--marketplace_reviews", type=int, default=10, help="Local reviews kept per marketplace (0 = none)")
+    g.add_argument("--marketplace_parallel", type=int, default=4,
+                   help="Marketplace pages loading at once per product (tabs against the one browser)")
+
+def marketplace_settings(args) -> dict | None:
+    if not args.marketplaces:
+        return None
+    return {"codes": [c.strip().lower() for c in args.marketplaces.split(",") if c.strip()],
+            "url_template": args.marketplace_url_template, "max_reviews": args.marketplace_reviews,
+            "max_parallel": args.marketplace_parallel}
 
 def parse_args():
     p = argparse.ArgumentParser(description="Amazon scraper (Remote WebDriver on chromedriver --port=9515).")
@@ -865,16 +1183,91 @@ def parse_args():
     p.add_argument("--chrome_binary", type=str, default=None)
     p.add_argument("--out_dir", type=str, default="Products")
     p.add_argument("--out_csv", type=str, default=None)
-    p.add_argument("--max_review_pages", type=int, default=5, help="Max domestic review pages")
+    p.add_argument("--max_review_pages", type=int, default=5,
+                   help="Max domestic review pages (per star bucket with --review_sample_per_star)")
     p.add_argument("--max_reviews", type=int, default=300, help="Max domestic reviews")
+    p.add_argument("--review_sample_per_star", type=int, default=0,
+                   help="Stratified sample: this many domestic reviews per star rating via filterByStar (0 = off)")
+    p.add_argument("--near_duplicate_reviews", action="store_true",
+                   help="Also drop near-duplicate (e.g. syndicated) reviews; exact duplicates are always dropped")
+    p.add_argument("--review_delta_state", type=str, default=None,
+                   help="SQLite file remembering the newest reviews per ASIN; only newer reviews are fetched")
+    p.add_argument("--rank_history", type=str, default=None,
+                   help="SQLite file recording each result's position and price per query and day (rank_history.py)")
     p.add_argument("--max_foreign_pages", type=int, default=3, help="Max foreign/global review pages")
     p.add_argument("--max_foreign_reviews", type=int, default=200, help="Max foreign reviews")
-    return p.parse_args()
+    p.add_argument("--out_format", choices=["csv", "parquet", "jsonl"], default="csv",
+                   help="parquet keeps typed columns (needs pyarrow); jsonl writes raw records without pandas")
+    p.add_argument("--no_reviews_table", action="store_true",
+                   help="Do not write the per-review <name>_reviews table")
+    p.add_argument("--stream_reviews", action="store_true",
+                   help="Write review rows as they are scraped (bounded memory); product rows get "
+                        "Domestic_Reviews_Count / Avg_Review_Rating instead of the concat columns")
+    p.add_argument("--capture_reviews_network", action="store_true",
+                   help="Parse reviews from captured CDP Network responses; DOM scraping as fallback")
+    p.add_argument("--prefetch_depth", type=int, default=0,
+                   help="Load the next N product pages in background tabs while the current one is scraped (0 = off)")
+    p.add_argument("--fields", type=str, default=None,
+                   help="Comma-separated output columns (patterns like Review_* ok) or stages "
+                        f"({', '.join(FIELD_STAGES)}); stages producing none of them are skipped")
+    add_backend_args(p)
+    add_image_args(p, "tile")
+    add_archive_args(p)
+    add_marketplace_args(p)
+    add_session_args(p)
+    add_metrics_args(p)
+    args = p.parse_args()
+    if args.review_delta_state and args.review_sample_per_star:
+        p.error("--review_delta_state and --review_sample_per_star cannot be combined")
+    if args.stream_reviews and args.no_reviews_table:
+        p.error("--stream_reviews writes the reviews table; it cannot be combined with --no_reviews_table")
+    if args.fields:
+        from field_plan import FieldPlan
+        unknown = FieldPlan(FIELD_STAGES, args.fields).unknown
+        if unknown:
+            p.error(f"unknown field(s) {', '.join(unknown)}; stages: {', '.join(FIELD_STAGES)}")
+    if args.marketplaces:
+        from marketplace_fanout import MARKETPLACES
+        unknown = [c for c in marketplace_settings(args)["codes"] if c not in MARKETPLACES]
+        if unknown:
+            p.error(f"unknown marketplace code(s) {', '.join(unknown)}; known: {', '.join(MARKETPLACES)}")
+    return args
 
 if __name__ == "__main__":
     args = parse_args()
-    print("Starting Amazon scraper (Remote WebDriver, port 9515)...")
-    df = amazon_detailed_scraper(
+    print("Starting Amazon scraper (Remote WebDriver, port 9515)..." if args.backend == "selenium"
+          else f"Starting Amazon scraper (CDP at {args.cdp_url})...")
+    reviews = None if args.no_reviews_table or args.stream_reviews else []
+    out_name = args.out_csv or f"{sanitize_name(args.query)}_{timestamp()}.csv"  # shared by both tables
+    if args.out_format == "jsonl":
+        normalize_products = normalize_review_rows = None
+    else:
+        from normalize import normalize_amazon_products as normalize_products
+        from normalize import normalize_reviews as normalize_review_rows
+    plan = None
+    if args.fields:
+        from field_plan import FieldPlan
+        plan = FieldPlan(FIELD_STAGES, args.fields)
+        print(f"Extraction plan: {plan.describe()}")
+    review_sink = None
+    if args.stream_reviews:
+        from review_stream import ReviewSink
+        review_sink = ReviewSink(results_path(args.query, Path(args.out_dir), out_name, args.out_format, "_reviews"),
+                                 args.out_format, normalize=normalize_review_rows,
+                                 on_flush=lambda n: METRICS.rows_written.inc(n, site="amazon", table="reviews"))
+    metered = bool(args.metrics_file or args.metrics_port)
+    stop_metrics = start_exporter(args.metrics_file, args.metrics_port, args.metrics_interval) if metered else None
+    images = build_image_pipeline(args)
+    archive = build_page_archive(args, "amazon")
+    review_state = None
+    if args.review_delta_state:
+        from review_delta import ReviewDeltaState
+        review_state = ReviewDeltaState(args.review_delta_state)
+    rank_history = None
+    if args.rank_history:
+        from rank_history import RankHistory
+        rank_history = RankHistory(args.rank_history)
+    rows = amazon_detailed_scraper(
         args.query,
         max_products=args.max_products,
         executor_url=args.executor_url,
@@ -882,9 +1275,45 @@ if __name__ == "__main__":
         max_review_pages=args.max_review_pages,
         max_reviews=args.max_reviews,
         max_foreign_pages=args.max_foreign_pages,
-        max_foreign_reviews=args.max_foreign_reviews
+        max_foreign_reviews=args.max_foreign_reviews,
+        reviews_out=reviews,
+        capture_reviews_network=args.capture_reviews_network,
+        supervise=session_settings(args),
+        metered=metered,
+        backend=args.backend,
+        cdp_url=args.cdp_url,
+        images=images,
+        review_sample_per_star=args.review_sample_per_star,
+        archive=archive,
+        review_state=review_state,
+        near_duplicate_reviews=args.near_duplicate_reviews,
+        review_sink=review_sink,
+        marketplace_fanout=marketplace_settings(args),
+        plan=plan,
+        rank_history=rank_history,
+        prefetch_depth=args.prefetch_depth
     )
-    if not df.empty:
-        save_results(df, args.query, Path(args.out_dir), args.out_csv)
+    if rank_history:
+        rank_history.close()
+    if review_sink:
+        review_sink.close()
+    if review_state:
+        review_state.close()
+    if archive:
+        archive.close()
+    if images:
+        images.wait()
+        images.annotate(rows)
+        images.close()
+    if plan:
+        rows = [plan.project(r) for r in rows]
+    if rows:
+        save_results(rows, args.query, Path(args.out_dir), out_name, args.out_format,
+                     normalize=normalize_products)
+        if reviews:
+            save_results(reviews, args.query, Path(args.out_dir), out_name, args.out_format,
+                         suffix="_reviews", normalize=normalize_review_rows)
     else:
         print("\nNo data scraped. Check logs (captcha/region popup/element changes).")
+    if stop_metrics:
+        stop_metrics()
@@ -1,20 +1,26 @@
 # Selenium_eBay.py
 #   chromedriver --port=9515 --allowed-origins="*" --allowed-ips=""
 #   python Selenium_eBay.py --query "wireless headphones" --max_products 10
-
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+#
+# selenium and pandas are imported where they are used, so --help and
+# --out_format jsonl runs start without them (see benchmarks/bench_startup.py).
 
 from urllib.parse import urlparse, urlunparse, urlencode, parse_qsl
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
-import argparse, time, re
+import argparse, json, time, re
+
+from cli_options import (add_archive_args, add_backend_args, add_image_args, add_metrics_args, add_session_args,
+                         build_image_pipeline, build_page_archive, session_settings)
+from session_supervisor import SupervisedDriver
+from run_metrics import METRICS, MeteredDriver, start_exporter
+from structured_data import listing_rows, read_structured_data
+
+class By:
+    """Selenium locator strategies (same values as selenium.webdriver.common.by.By), without importing selenium."""
+    ID = "id"
+    XPATH = "xpath"
+    CSS_SELECTOR = "css selector"
 
 # -------------------- small utils --------------------
 def sanitize_name(s: str) -> str:
@@ -30,10 +36,22 @@ def ensure_dir(p: Path) -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
-def save_results(df: pd.DataFrame, query: str, out_dir: Path) -> Path:
+def save_results(rows: list[dict], query: str, out_dir: Path, out_format: str = "csv") -> Path:
     ensure_dir(out_dir)
-    path = out_dir / f"{sanitize_name(query)}_{timestamp()}.csv"
-    df.to_csv(path, index=False)
+    path = out_dir / f"{sanitize_name(query)}_{timestamp()}.{out_format}"
+    if out_format == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    else:
+        import pandas as pd
+        from normalize import normalize_ebay_results
+        df = normalize_ebay_results(pd.DataFrame(rows))
+        if out_format == "parquet":
+            df.to_parquet(path, index=False)  # keeps typed Price_* columns
+        else:
+            df.to_csv(path, index=False)
+    METRICS.rows_written.inc(len(rows), site="ebay", table="results")
     print(f"\nSaved results to: {path}")
     return path
 
@@ -48,7 +66,11 @@ def force_english_url(url: str) -> str:
         return url
 
 def wait_ready(driver, timeout=12):
+    from selenium.webdriver.support.ui import WebDriverWait
     WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
+    archive_page = getattr(driver, "archive_page", None)  # page_archive.ArchivingDriver (--archive_pages)
+    if archive_page:
+        archive_page()
 
 def is_english(driver) -> bool:
     try:
@@ -82,6 +104,8 @@ def clear_site_prefs(driver, domain="https://www.ebay.com/"):
         print("Clear prefs error (non-fatal):", e)
 
 def dismiss_banners(driver):
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
     for by, sel in [
         (By.ID, "gdpr-banner-accept"),
         (By.CSS_SELECTOR, 'button[aria-label*="Accept"]'),
@@ -97,6 +121,9 @@ def dismiss_banners(driver):
 
 def open_lang_menu_and_select_english(driver, timeout=10) -> bool:
     """Open header flyout and click the English entry (data-lang='en-US')."""
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
     wait_ready(driver, timeout)
     # Find flyout button (normalize to BUTTON node)
     btn = None
@@ -182,7 +209,15 @@ def nav(driver, url: str, timeout: int = 12, verify_lang: bool = True):
         wait_ready(driver, timeout)
 
 # -------------------- driver --------------------
-def build_driver(executor_url: str, chrome_binary: str | None = None):
+def build_driver(executor_url: str, chrome_binary: str | None = None, backend="selenium",
+                 cdp_url="http://127.0.0.1:9222"):
+    if backend == "cdp":
+        from cdp_backend import CDPDriver
+        driver = CDPDriver.connect(cdp_url, chrome_binary)
+        cdp_force_english(driver)  # Accept-Language header + locale, same as below
+        return driver
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
     opts = Options()
     # Browser language hints
     opts.add_argument("--lang=en-US")
@@ -217,7 +252,27 @@ def open_english_ebay(driver):
             nav(driver, driver.current_url, timeout=10, verify_lang=True)
     print("Lang now:", driver.execute_script("return document.documentElement.lang"))
 
+def reopen_english_ebay(driver):
+    """Bootstrap for a recycled session: carried-over cookies already pin English, so no prefs wipe."""
+    nav(driver, "https://www.ebay.com/", timeout=12, verify_lang=True)
+    dismiss_banners(driver)
+
+def english_bootstrap():
+    """SupervisedDriver bootstrap: open_english_ebay() on the first session, reopen_english_ebay() after recycles."""
+    first = [True]
+
+    def bootstrap(driver):
+        if first:
+            first.clear()
+            open_english_ebay(driver)
+        else:
+            reopen_english_ebay(driver)
+    return bootstrap
+
 def search_ebay(driver, query: str):
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
     # Locate search box
     search_box = None
     for locator in [
@@ -263,9 +318,46 @@ def search_ebay(driver, query: str):
     print("Search done. Lang:", driver.execute_script("return document.documentElement.lang"))
 
 # -------------------- (optional) basic results scrape --------------------
-def scrape_results_basic(driver, max_products=10) -> pd.DataFrame:
+# CSS selectors, also used offline by page_parser.py
+CARD_SELECTORS = ["li.s-item[data-view*='mi:']", "li.s-item", "ul.srp-results li.s-item"]
+CARD_LINK_SELECTORS = ['a.s-item__link', 'a.s-item__title', 'a[href*="/itm/"]']
+CARD_TITLE_SELECTOR = "h3.s-item__title"
+CARD_PRICE_SELECTORS = ["span.s-item__price", ".x-price .s-item__price", ".s-item__details .s-item__price"]
+CARD_IMAGE_SELECTORS = [".s-item__image-wrapper img", ".s-item__image img", "img"]
+
+# Output columns of each extraction stage, for --fields (field_plan.FieldPlan); "card" always runs
+FIELD_STAGES = {
+    "card": ["Title", "URL"],
+    "price": ["Price"],
+    "image": ["Image_URL", "Image_Path", "Thumbnail_Path"],
+}
+
+def record_ranks(rank_history, query: str, rows: list[dict]):
+    from rank_history import ebay_item_id
+    rank_history.record("ebay", query, [(ebay_item_id(r["URL"]), r.get("Price")) for r in rows])
+
+def scrape_results_basic(driver, max_products=10, plan=None, rank_history=None, query="", images=None) -> list[dict]:
+    """
+    plan: field_plan.FieldPlan (--fields); the price / image lookups per card are skipped when not needed.
+    rank_history: a rank_history.RankHistory; result positions (item id, price) are recorded under query.
+    images: an image_pipeline.ImagePipeline; each result image is queued for background download
+    as soon as its row is read.
+    """
+    need = plan.needs if plan else (lambda *stages: True)
+    # Structured-data fast path: a schema.org ItemList with a price for every item needs no card walk
+    listed = listing_rows(read_structured_data(driver))[:max_products]
+    if listed and all(r["Price"] for r in listed):
+        print(f"Collected {len(listed)} results from structured data")
+        rows = [{**r, "URL": force_english_url(r["URL"])} for r in listed]
+        if images:
+            for r in rows:
+                images.submit(r.get("Image_URL"))
+        if rank_history:
+            record_ranks(rank_history, query, rows)
+        return rows
+
     cards = []
-    for sel in ["li.s-item[data-view*='mi:']", "li.s-item", "ul.srp-results li.s-item"]:
+    for sel in CARD_SELECTORS:
         try:
             cards = driver.find_elements(By.CSS_SELECTOR, sel)
             if cards: break
@@ -275,14 +367,16 @@ def scrape_results_basic(driver, max_products=10) -> pd.DataFrame:
     for card in cards:
         try:
             a = None
-            for sel in ['a.s-item__link', 'a.s-item__title', 'a[href*="/itm/"]']:
+            for sel in CARD_LINK_SELECTORS:
                 try:
                     a = card.find_element(By.CSS_SELECTOR, sel); break
                 except: continue
-            if not a: continue
+            if not a:
+                METRICS.selector_miss("ebay", "card_link")
+                continue
 
             try:
-                title_el = card.find_element(By.CSS_SELECTOR, "h3.s-item__title")
+                title_el = card.find_element(By.CSS_SELECTOR, CARD_TITLE_SELECTOR)
             except:
                 title_el = a
             title = (title_el.text or title_el.get_attribute("textContent") or "").strip()
@@ -291,18 +385,35 @@ def scrape_results_basic(driver, max_products=10) -> pd.DataFrame:
             href = a.get_attribute("href") or ""
             url = force_english_url(href)
             price = ""
-            for ps in ["span.s-item__price", ".x-price .s-item__price", ".s-item__details .s-item__price"]:
-                try:
-                    price = (card.find_element(By.CSS_SELECTOR, ps).text or "").strip()
-                    if price: break
-                except: continue
-
-            rows.append({"Title": title, "Price": price, "URL": url})
+            if need("price"):
+                for ps in CARD_PRICE_SELECTORS:
+                    try:
+                        price = (card.find_element(By.CSS_SELECTOR, ps).text or "").strip()
+                        if price: break
+                    except: continue
+                if not price:
+                    METRICS.selector_miss("ebay", "price")
+
+            image_url = ""
+            if need("image"):
+                for sel in CARD_IMAGE_SELECTORS:
+                    try:
+                        img = card.find_element(By.CSS_SELECTOR, sel)
+                        image_url = img.get_attribute("src") or img.get_attribute("data-src") or ""
+                        if image_url.startswith("http") and not image_url.endswith(".gif"): break
+                        image_url = ""
+                    except: continue
+
+            rows.append({"Title": title, "Price": price, "URL": url, "Image_URL": image_url})
+            if images:
+                images.submit(image_url)
             if len(rows) >= max_products: break
         except: continue
 
     print(f"Collected {len(rows)} results")
-    return pd.DataFrame(rows)
+    if rank_history:
+        record_ranks(rank_history, query, rows)
+    return rows
 
 # -------------------- CLI --------------------
 def parse_args():
@@ -312,30 +423,88 @@ def parse_args():
     p.add_argument("--executor_url", default="http://127.0.0.1:9515")
     p.add_argument("--chrome_binary", default=None)
     p.add_argument("--out_dir", default="Products")
-    return p.parse_args()
+    p.add_argument("--out_format", choices=["csv", "parquet", "jsonl"], default="csv",
+                   help="parquet keeps typed columns (needs pyarrow); jsonl writes raw records without pandas")
+    p.add_argument("--fields", default=None,
+                   help="Comma-separated output columns or stages "
+                        f"({', '.join(FIELD_STAGES)}); per-card lookups for other columns are skipped")
+    p.add_argument("--rank_history", default=None,
+                   help="SQLite file recording each result's position and price per query and day (rank_history.py)")
+    add_backend_args(p)
+    add_image_args(p)
+    add_archive_args(p)
+    add_session_args(p)
+    add_metrics_args(p)
+    args = p.parse_args()
+    if args.fields:
+        from field_plan import FieldPlan
+        unknown = FieldPlan(FIELD_STAGES, args.fields).unknown
+        if unknown:
+            p.error(f"unknown field(s) {', '.join(unknown)}; stages: {', '.join(FIELD_STAGES)}")
+    return args
 
 # -------------------- main --------------------
 if __name__ == "__main__":
     args = parse_args()
-    print("Starting (Remote WebDriver on port 9515)…")
+    print("Starting (Remote WebDriver on port 9515)…" if args.backend == "selenium" else f"Starting (CDP at {args.cdp_url})…")
     driver = None
+    archive = None
+    metered = bool(args.metrics_file or args.metrics_port)
+    stop_metrics = start_exporter(args.metrics_file, args.metrics_port, args.metrics_interval) if metered else None
     try:
-        driver = build_driver(args.executor_url, args.chrome_binary)
-
-        # 1) Open eBay in English (CDP overrides + clear prefs + URL param + menu fallback)
-        open_english_ebay(driver)
+        supervise = session_settings(args)
+        build = lambda: build_driver(args.executor_url, args.chrome_binary, args.backend, args.cdp_url)
+        if supervise:
+            driver = SupervisedDriver(build, bootstrap=english_bootstrap(), **supervise)
+        else:
+            driver = build()
+        METRICS.active_sessions.inc(site="ebay")
+        if metered:
+            driver = MeteredDriver(driver, "ebay")
+        archive = build_page_archive(args, "ebay")
+        if archive:
+            from page_archive import ArchivingDriver
+            driver = ArchivingDriver(driver, archive)
+
+        # 1) Open eBay in English (CDP overrides + clear prefs + URL param + menu fallback);
+        #    a SupervisedDriver has already done this in its bootstrap
+        if not supervise:
+            open_english_ebay(driver)
 
         # 2) Search using the search button
         search_ebay(driver, args.query)
 
         # Optional: capture a few rows
-        df = scrape_results_basic(driver, max_products=args.max_products)
-        if not df.empty:
-            save_results(df, args.query, Path(args.out_dir))
+        plan = None
+        if args.fields:
+            from field_plan import FieldPlan
+            plan = FieldPlan(FIELD_STAGES, args.fields)
+        rank_history = None
+        if args.rank_history:
+            from rank_history import RankHistory
+            rank_history = RankHistory(args.rank_history)
+        images = build_image_pipeline(args)
+        rows = scrape_results_basic(driver, max_products=args.max_products, plan=plan,
+                                    rank_history=rank_history, query=args.query, images=images)
+        if rank_history:
+            rank_history.close()
+        if images:
+            images.wait()
+            images.annotate(rows)
+            images.close()
+        if plan:
+            rows = [plan.project(r) for r in rows]
+        if rows:
+            save_results(rows, args.query, Path(args.out_dir), args.out_format)
         else:
             print("No rows captured (layout/filters may differ).")
 
     except Exception as e:
         print("ERROR:", e)
     finally:
+        METRICS.active_sessions.set(0, site="ebay")
+        if archive:
+            archive.close()
+        if stop_metrics:
+            stop_metrics()
         print("Done. Browser left open for inspection.")
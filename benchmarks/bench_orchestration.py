@@ -0,0 +1,252 @@
+# benchmarks/bench_orchestration.py
+# Python-side orchestration cost of the scrapers, measured against fake_driver.FakeDriver.
+#
+#   python benchmarks/bench_orchestration.py                          # 1,000 tiles, 10,000 reviews, 20 products
+#   python benchmarks/bench_orchestration.py --tiles 5000 --latency 0.002 --get_latency 0.05
+#   python benchmarks/bench_orchestration.py --only reviews,products --json bench.json
+#
+# Needs selenium (WebDriverWait), pandas (DataFrame scenario), lxml + cssselect (fake driver).
+# time.sleep / time.monotonic are virtualized: the scrapers' fixed sleeps and WebDriverWait
+# timeouts cost nothing, but are summed and reported as "simulated sleep". The clipboard used
+# by get_product_link is replaced with an in-memory one.
+#
+# Per scenario: driver round trips (total, per unit, top commands), CPU per unit split into
+# orchestration (scraper code) vs fake browser (fixture parsing + selector evaluation), and wall time.
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fake_driver import FakeDriver  # noqa: E402
+
+SERP_URL = "https://www.amazon.com/s?k=bench"
+EBAY_SERP_URL = "https://www.ebay.com/sch/i.html?_nkw=bench&_lang=en-us"
+LOREM = ("Solid build quality and the battery easily lasts a full day of use. Setup took a few minutes, "
+         "the manual is clear and support answered quickly when I had a question. ")
+
+# -------------------- fixtures --------------------
+class AmazonFixtures:
+    """URL -> HTML for a synthetic SERP, product pages, /product-reviews and /global-reviews pages."""
+
+    def __init__(self, tiles=1000, reviews_per_page=10, review_pages=5, foreign_pages=3):
+        self.tiles = tiles
+        self.reviews_per_page = reviews_per_page
+        self.review_pages = review_pages
+        self.foreign_pages = foreign_pages
+
+    @staticmethod
+    def asin(i: int) -> str:
+        return f"B{i:09d}"
+
+    def __call__(self, url: str) -> str | None:
+        if url.startswith(SERP_URL):
+            return self.serp()
+        for marker, kind in (("/dp/", "product"), ("/product-reviews/", "reviews"), ("/global-reviews/", "global")):
+            if marker in url:
+                asin = url.split(marker, 1)[1][:10]
+                page = int(url.split("pageNumber=", 1)[1].split("&")[0]) if "pageNumber=" in url else 1
+                return self.product(asin) if kind == "product" else self.reviews(asin, page, kind == "global")
+        return None
+
+    def serp(self) -> str:
+        tiles = "".join(
+            f'<div data-component-type="s-search-result" data-asin="{self.asin(i)}" class="s-result-item">'
+            f'<h2><a class="a-link-normal" href="/dp/{self.asin(i)}"><span class="a-text-normal">'
+            f'Benchmark product {i} portable monitor with bluetooth</span></a></h2>'
+            f'<span class="a-price"><span class="a-offscreen">${10 + i % 90}.99</span></span></div>'
+            for i in range(1, self.tiles + 1))
+        return f'<html lang="en-us"><head><title>Amazon.com : bench</title></head><body>{tiles}</body></html>'
+
+    def product(self, asin: str) -> str:
+        return (
+            f'<html lang="en-us"><head><title>Product {asin}</title>'
+            f'<script type="application/ld+json">{{"@context": "https://schema.org", "@type": "Product", '
+            f'"name": "Product {asin}", "offers": {{"@type": "Offer", "price": "19.99", "priceCurrency": "USD"}}, '
+            f'"aggregateRating": {{"@type": "AggregateRating", "ratingValue": 4.4, "ratingCount": 1234}}}}</script>'
+            f'</head><body>'
+            f'<span id="productTitle">Product {asin}</span>'
+            f'<div id="acrPopover" title="4.4 out of 5 stars"><span><a><span>4.4 out of 5 stars</span></a></span></div>'
+            f'<a id="acrCustomerReviewText" href="/product-reviews/{asin}/?reviewerType=all_reviews">1,234 ratings</a>'
+            f'<div id="ssf-primary-widget-desktop"><div><a href="#share">Share</a></div></div>'
+            f'<span>Copy link</span>'
+            f'<div id="productSpecifications_dp_warranty_and_support"><div><h1>Warranty &amp; Support</h1>'
+            f'<div><span>Product Warranty:</span><span> </span><span>1 year manufacturer warranty, parts and labor.'
+            f'</span></div></div></div></body></html>')
+
+    def reviews(self, asin: str, page: int, foreign: bool) -> str:
+        pages = self.foreign_pages if foreign else self.review_pages
+        where = "Canada" if foreign else "the United States"
+        blocks = "".join(
+            f'<div data-hook="review" id="R{asin}{page:04d}{k:03d}" class="a-section review aok-relative">'
+            f'<a data-hook="review-title"><span>Review {page}.{k} title</span></a>'
+            f'<i data-hook="review-star-rating" class="a-icon-star"><span class="a-icon-alt">{1 + k % 5}.0 out of 5 stars</span></i>'
+            f'<span data-hook="review-date">Reviewed in {where} on March {1 + k % 28}, 2025</span>'
+            f'<span data-hook="review-body"><span>{LOREM}({asin} {"g" if foreign else "p"}{page} #{k})</span></span></div>'
+            for k in range(self.reviews_per_page))
+        path = "global-reviews" if foreign else "product-reviews"
+        nxt = (f'<li class="a-last"><a href="/{path}/{asin}/?reviewerType=all_reviews&amp;pageNumber={page + 1}">Next page</a></li>'
+               if page < pages else '<li class="a-disabled a-last">Next page</li>')
+        return (f'<html lang="en-us"><head><title>Reviews {asin}</title></head><body>{blocks}'
+                f'<ul class="a-pagination">{nxt}</ul>'
+                f'<a href="/global-reviews/{asin}/?pageNumber=1">See more reviews from other countries</a></body></html>')
+
+def ebay_serp(cards=1000) -> str:
+    items = "".join(
+        f'<li class="s-item" data-view="mi:1686|iid:{i}"><a class="s-item__link" href="https://www.ebay.com/itm/{1000000000 + i}">'
+        f'<h3 class="s-item__title">Benchmark listing {i} usb-c hub</h3></a>'
+        f'<span class="s-item__price">${5 + i % 50}.50</span></li>'
+        for i in range(1, cards + 1))
+    return f'<html lang="en"><head><title>bench | eBay</title></head><body><ul class="srp-results">{items}</ul></body></html>'
+
+# -------------------- harness --------------------
+class VirtualClock:
+    """Turn time.sleep into bookkeeping and shift monotonic/time by the simulated amount."""
+
+    def __init__(self):
+        self.slept = 0.0
+        self._orig = None
+
+    def sleep(self, seconds):
+        self.slept += max(0.0, seconds)
+
+    def __enter__(self):
+        self._orig = (time.sleep, time.monotonic, time.time)
+        real_monotonic, real_time = time.monotonic, time.time
+        time.sleep = self.sleep
+        time.monotonic = lambda: real_monotonic() + self.slept
+        time.time = lambda: real_time() + self.slept
+        return self
+
+    def __exit__(self, *exc):
+        time.sleep, time.monotonic, time.time = self._orig
+
+def install_memory_clipboard():
+    board = {"text": ""}
+    sys.modules["pyperclip"] = types.SimpleNamespace(copy=lambda t: board.update(text=t),
+                                                     paste=lambda: board["text"])
+
+def measure(name: str, unit: str, n_units: int, driver, fn) -> dict:
+    with VirtualClock() as clock, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        out = fn()
+        cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    fake_cpu = driver.cpu_seconds if driver else 0.0
+    rts = driver.round_trips if driver else 0
+    per = max(1, n_units)
+    return {
+        "scenario": name, "unit": unit, "units": n_units, "produced": len(out) if hasattr(out, "__len__") else None,
+        "round_trips": rts, "round_trips_per_unit": round(rts / per, 2),
+        "cpu_ms": round(cpu * 1000, 1),
+        "orchestration_cpu_us_per_unit": round((cpu - fake_cpu) / per * 1e6, 1),
+        "browser_cpu_us_per_unit": round(fake_cpu / per * 1e6, 1),
+        "wall_s": round(wall, 3), "simulated_sleep_s": round(clock.slept, 1),
+        "top_commands": dict(driver.commands.most_common(5)) if driver else {},
+    }
+
+# -------------------- scenarios --------------------
+def bench_tiles(args, latency):
+    import Selenium_Amazon as amz
+    driver = FakeDriver(AmazonFixtures(tiles=args.tiles), latency=latency)
+    driver.get(SERP_URL)
+    driver.reset_counters()
+    return measure("serp_tiles", "tile", args.tiles, driver, lambda: amz.collect_product_infos(driver, args.tiles))
+
+def bench_reviews(args, latency):
+    import Selenium_Amazon as amz
+    pages = -(-args.reviews // args.reviews_per_page)
+    fx = AmazonFixtures(reviews_per_page=args.reviews_per_page, review_pages=pages)
+    driver = FakeDriver(fx, latency=latency)
+    url = f"https://www.amazon.com/product-reviews/{fx.asin(1)}/?reviewerType=all_reviews"
+    return measure("reviews", "review", args.reviews, driver,
+                   lambda: amz.scrape_full_reviews_from_reviews_page(driver, url, max_pages=pages, max_reviews=args.reviews))
+
+def bench_products(args, latency):
+    import Selenium_Amazon as amz
+    fx = AmazonFixtures(tiles=max(args.products, 1), reviews_per_page=args.reviews_per_page,
+                        review_pages=args.review_pages, foreign_pages=args.foreign_pages)
+    driver = FakeDriver(fx, latency=latency)
+    driver.get(SERP_URL)
+    driver.reset_counters()
+    reviews_out: list = []
+    res = measure("products", "product", args.products, driver, lambda: amz.scrape_products(
+        driver, args.products, max_review_pages=args.review_pages, max_reviews=10**6,
+        max_foreign_pages=args.foreign_pages, max_foreign_reviews=10**6, reviews_out=reviews_out))
+    res["review_rows"] = len(reviews_out)
+    return res
+
+def bench_dataframe(args, latency):
+    import Selenium_Amazon as amz
+    from normalize import normalize_amazon_products, normalize_reviews
+    fx = AmazonFixtures()
+    details = {"overall_rating": "4.4 out of 5 stars", "num_ratings": "1,234 ratings", "product_link": "",
+               "warranty_heading": "Warranty & Support", "warranty_text": "1 year",
+               "reviews_full": [{"review_text": LOREM, "review_title": "t", "review_rating": "4.0 out of 5 stars",
+                                 "review_date": "Reviewed in the United States on March 3, 2025"}] * args.reviews_per_page,
+               "reviews_foreign": []}
+    products = [amz.build_product_row(i, {"title": f"Product {i}", "price": "$19.99", "asin": fx.asin(i),
+                                          "url": f"https://www.amazon.com/dp/{fx.asin(i)}"}, details)
+                for i in range(1, args.tiles + 1)]
+    reviews = amz.review_rows(details["reviews_full"], fx.asin(1), 1, "domestic") * (args.reviews // args.reviews_per_page)
+
+    def run():
+        with tempfile.TemporaryDirectory() as d:
+            amz.save_results(products, "bench", Path(d), "bench.csv", "csv", normalize=normalize_amazon_products)
+            amz.save_results(reviews, "bench", Path(d), "bench.csv", "csv", suffix="_reviews", normalize=normalize_reviews)
+        return products + reviews
+    return measure("dataframe", "row", len(products) + len(reviews), None, run)
+
+def bench_ebay(args, latency):
+    import Selenium_eBay as ebay
+    html = ebay_serp(args.tiles)
+    driver = FakeDriver(lambda url: html, latency=latency)
+    driver.get(EBAY_SERP_URL)
+    driver.reset_counters()
+    return measure("ebay_cards", "card", args.tiles, driver, lambda: ebay.scrape_results_basic(driver, args.tiles))
+
+SCENARIOS = {"tiles": bench_tiles, "reviews": bench_reviews, "products": bench_products,
+             "dataframe": bench_dataframe, "ebay": bench_ebay}
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Orchestration overhead of the scrapers against an in-process fake driver.")
+    p.add_argument("--tiles", type=int, default=1000, help="SERP tiles / eBay cards / DataFrame product rows")
+    p.add_argument("--reviews", type=int, default=10000, help="Reviews paged through in the reviews scenario")
+    p.add_argument("--reviews_per_page", type=int, default=10)
+    p.add_argument("--products", type=int, default=20, help="Products scraped end to end")
+    p.add_argument("--review_pages", type=int, default=5)
+    p.add_argument("--foreign_pages", type=int, default=3)
+    p.add_argument("--latency", type=float, default=0.0, help="Artificial seconds per driver command")
+    p.add_argument("--get_latency", type=float, default=None, help="Artificial seconds per navigation (default --latency)")
+    p.add_argument("--only", default=",".join(SCENARIOS), help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    p.add_argument("--json", default=None, help="Also write the results here")
+    args = p.parse_args()
+
+    install_memory_clipboard()
+    latency = {"*": args.latency, "get": args.latency if args.get_latency is None else args.get_latency}
+    results = []
+    print(f"{'scenario':11s} {'units':>7s} {'round trips':>12s} {'rt/unit':>8s} {'orch µs/unit':>13s} "
+          f"{'browser µs/unit':>16s} {'wall s':>8s} {'sim sleep s':>12s}")
+    for name in [s.strip() for s in args.only.split(",") if s.strip()]:
+        r = SCENARIOS[name](args, latency)
+        results.append(r)
+        print(f"{r['scenario']:11s} {r['units']:7d} {r['round_trips']:12d} {r['round_trips_per_unit']:8.2f} "
+              f"{r['orchestration_cpu_us_per_unit']:13.1f} {r['browser_cpu_us_per_unit']:16.1f} "
+              f"{r['wall_s']:8.3f} {r['simulated_sleep_s']:12.1f}")
+        if r["top_commands"]:
+            print("            " + ", ".join(f"{k}={v}" for k, v in r["top_commands"].items()))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nSaved results to: {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
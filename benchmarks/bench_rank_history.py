@@ -0,0 +1,102 @@
+# benchmarks/bench_rank_history.py
+# Size and query latency of rank_history.RankHistory over a synthetic multi-year daily crawl.
+#
+#   python benchmarks/bench_rank_history.py                        # 3 years, 50 queries, 48 results/day
+#   python benchmarks/bench_rank_history.py --years 5 --queries 200 --churn 0.05
+#
+# Each day every query's ranking drifts a little: a few neighbours swap, `--churn` of the slots is
+# replaced by new products, and a few prices change. Reports the stored rows vs one row per
+# observation (what the per-run CSVs hold), the file size, and median / p95 latency of
+# rank_history(), price_history() and snapshot() for random products and dates.
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rank_history import RankHistory  # noqa: E402
+
+def simulate(history: RankHistory, days: int, queries: int, per_query: int, churn: float, seed: int) -> list:
+    rnd = random.Random(seed)
+    start = date.today() - timedelta(days=days - 1)
+    rankings, prices, next_id = [], {}, 0
+    for _ in range(queries):
+        ids = [f"B{next_id + i:09d}" for i in range(per_query)]
+        next_id += per_query
+        rankings.append(ids)
+        prices.update({i: round(rnd.uniform(5, 200), 2) for i in ids})
+    seen = set()
+    for day in range(days):
+        for q, ids in enumerate(rankings):
+            for _ in range(3):
+                a = rnd.randrange(per_query - 1)
+                ids[a], ids[a + 1] = ids[a + 1], ids[a]
+            for _ in range(int(per_query * churn)):
+                ids[rnd.randrange(per_query)] = new = f"B{next_id:09d}"
+                prices[new] = round(rnd.uniform(5, 200), 2)
+                next_id += 1
+            for i in rnd.sample(ids, 2):
+                prices[i] = round(prices[i] * rnd.choice([0.9, 1.1]), 2)
+            seen.update(ids)
+            history.record("amazon", f"query {q}", [(i, prices[i]) for i in ids], start + timedelta(days=day))
+    return sorted(seen)
+
+def timed(fn, n: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Storage / latency benchmark for rank_history.py.")
+    p.add_argument("--years", type=float, default=3)
+    p.add_argument("--queries", type=int, default=50)
+    p.add_argument("--per_query", type=int, default=48)
+    p.add_argument("--churn", type=float, default=0.02, help="Share of result slots taken by new products per day")
+    p.add_argument("--lookups", type=int, default=200)
+    p.add_argument("--seed", type=int, default=7)
+    args = p.parse_args()
+
+    days = int(args.years * 365)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "rank_history.db"
+        history = RankHistory(str(path))
+        t0 = time.perf_counter()
+        ids = simulate(history, days, args.queries, args.per_query, args.churn, args.seed)
+        load_s = time.perf_counter() - t0
+        history.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        st = history.stats()
+        print(f"{days} days x {args.queries} queries x {args.per_query} results: "
+              f"{st['observations']:,} observations, {st['stored_rows']:,} stored rows "
+              f"({st['observations'] / st['stored_rows']:.1f}x), {path.stat().st_size / 1e6:.1f} MB, "
+              f"recorded in {load_s:.1f} s ({load_s / st['snapshots'] * 1000:.2f} ms per snapshot)")
+
+        rnd = random.Random(args.seed)
+        q_of = {i: q for q, i in history.conn.execute("SELECT query, item_id FROM series")}
+        start = date.today() - timedelta(days=days - 1)
+        cases = {
+            "rank_history (all days)": lambda: history.rank_history(q_of[i := rnd.choice(ids)], i),
+            "rank_history (90 days)": lambda: history.rank_history(q_of[i := rnd.choice(ids)], i,
+                                                                   since=date.today() - timedelta(days=90)),
+            "price_history": lambda: history.price_history(rnd.choice(ids)),
+            "snapshot": lambda: history.snapshot(f"query {rnd.randrange(args.queries)}",
+                                                 day=start + timedelta(days=rnd.randrange(days))),
+        }
+        for name, fn in cases.items():
+            med, p95 = timed(fn, args.lookups)
+            print(f"{name:26s} median {med:6.2f} ms   p95 {p95:6.2f} ms")
+        history.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
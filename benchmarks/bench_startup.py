@@ -0,0 +1,62 @@
+# benchmarks/bench_startup.py
+# Import-time / --help benchmark for both scrapers. Exits non-zero if startup regresses.
+#
+#   python benchmarks/bench_startup.py                 # default budget: 150 ms over bare interpreter
+#   python benchmarks/bench_startup.py --budget_ms 80 --runs 10
+#
+# Checks, per script:
+#   1) importing the module does not pull in selenium / pandas / pyperclip
+#   2) median wall time of `python <script> --help` minus `python -c pass` stays under the budget
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = ["Selenium_Amazon.py", "Selenium_eBay.py"]
+HEAVY_MODULES = ["selenium", "pandas", "pyperclip", "numpy"]
+
+def median_wall_ms(cmd: list[str], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+def heavy_modules_loaded(module: str) -> list[str]:
+    probe = (f"import sys; import {module}; "
+             f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{out.stderr}")
+    return [m for m in out.stdout.strip().split(",") if m]
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Startup-time regression check for the scraper CLIs.")
+    p.add_argument("--runs", type=int, default=7)
+    p.add_argument("--budget_ms", type=float, default=150.0, help="Allowed overhead over `python -c pass`")
+    args = p.parse_args()
+
+    baseline = median_wall_ms([sys.executable, "-c", "pass"], args.runs)
+    print(f"interpreter baseline: {baseline:.1f} ms")
+
+    failed = False
+    for script in SCRIPTS:
+        heavy = heavy_modules_loaded(Path(script).stem)
+        help_ms = median_wall_ms([sys.executable, script, "--help"], args.runs)
+        overhead = help_ms - baseline
+        status = "ok"
+        if heavy:
+            status = f"FAIL (eager imports: {', '.join(heavy)})"; failed = True
+        elif overhead > args.budget_ms:
+            status = f"FAIL (over budget {args.budget_ms:.0f} ms)"; failed = True
+        print(f"{script:22s} --help {help_ms:7.1f} ms  (+{overhead:6.1f} ms)  {status}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
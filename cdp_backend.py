@@ -0,0 +1,492 @@
+# cdp_backend.py
+# Chrome DevTools Protocol backend: one websocket, many tabs, one asyncio event loop (needs `websockets`).
+#
+# Start Chrome with a debugging port (or pass --chrome_binary and it is launched for you):
+#   google-chrome --remote-debugging-port=9222 --user-data-dir=/tmp/cdp-profile
+#   python Selenium_Amazon.py --backend cdp --cdp_url http://127.0.0.1:9222 --query "usb hub"
+#
+# Layers:
+#   CDPBrowser / CDPTab   async core. Tabs are flattened target sessions multiplexed over the
+#                         browser websocket, so hundreds of tabs cost one connection and no threads.
+#   CDPDriver             sync, WebDriver-shaped adapter over one tab (get, current_url,
+#                         find_element(s), execute_script, execute_cdp_cmd, get_log, ...), so the
+#                         existing extraction functions run unchanged on either backend.
+#   new_driver(isolated=True)  another CDPDriver in its own browser context of the same Chrome
+#                         (Target.createBrowserContext): separate cookies, storage and cache, so drivers
+#                         work as independent sessions without a Chrome process tree each.
+#
+# Locators use the Selenium strategy strings ("xpath", "css selector", "id", ...). Missing
+# elements raise selenium's NoSuchElementException when selenium is installed, so WebDriverWait
+# and expected_conditions keep working.
+
+import asyncio
+import itertools
+import json
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import deque
+from urllib.parse import urlparse
+
+try:
+    from selenium.common.exceptions import NoSuchElementException
+except ImportError:
+    class NoSuchElementException(Exception):
+        pass
+
+class CDPError(RuntimeError):
+    pass
+
+STEALTH_JS = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+ENTER_KEYS = ("\ue006", "\ue007")  # selenium Keys.RETURN / Keys.ENTER
+BLOCKED_IMAGE_URLS = ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico"]
+
+# Runs with `this` = context element (or document); returns one node, an array or null.
+QUERY_FN = r"""function(by, sel, all) {
+  const root = (this && this.nodeType) ? this : document;
+  let out = [];
+  if (by === 'xpath') {
+    const r = document.evaluate(sel, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+  } else {
+    const css = by === 'id' ? `[id="${CSS.escape(sel)}"]` : by === 'name' ? `[name="${CSS.escape(sel)}"]`
+              : by === 'class name' ? `.${CSS.escape(sel)}` : sel;
+    out = Array.from(root.querySelectorAll(css));
+  }
+  out = out.filter(n => n.nodeType === 1);
+  return all ? out : (out[0] || null);
+}"""
+
+TEXT_FN = "function() { return (this.innerText || '').trim(); }"
+ATTR_FN = r"""function(n) {
+  const p = this[n];
+  if (p !== undefined && p !== null && typeof p !== 'object' && typeof p !== 'function') return String(p);
+  return this.getAttribute(n);
+}"""
+DISPLAYED_FN = r"""function() {
+  const r = this.getBoundingClientRect(), s = getComputedStyle(this);
+  return (r.width > 0 || r.height > 0) && s.visibility !== 'hidden' && s.display !== 'none';
+}"""
+CLICK_POINT_FN = r"""function() {
+  this.scrollIntoView({block: 'center'});
+  const r = this.getBoundingClientRect();
+  return [r.left + r.width / 2, r.top + r.height / 2];
+}"""
+CLEAR_FN = "function() { this.value = ''; this.dispatchEvent(new Event('input', {bubbles: true})); }"
+
+# -------------------- async core --------------------
+def _http_json(url: str, timeout: float = 5.0):
+    with urllib.request.urlopen(url, timeout=timeout) as r:
+        return json.loads(r.read().decode("utf-8"))
+
+class CDPBrowser:
+    def __init__(self, ws, process=None, endpoint: str = ""):
+        self.ws = ws
+        self.process = process
+        self.endpoint = endpoint
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._tabs: dict[str, "CDPTab"] = {}
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    @classmethod
+    async def connect(cls, endpoint: str = "http://127.0.0.1:9222", process=None):
+        import websockets  # optional dependency, only for --backend cdp
+        info = await asyncio.to_thread(_http_json, endpoint.rstrip("/") + "/json/version")
+        ws = await websockets.connect(info["webSocketDebuggerUrl"], max_size=None, ping_interval=None)
+        return cls(ws, process, endpoint)
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.ws:
+                msg = json.loads(raw)
+                if "id" in msg:
+                    fut = self._pending.pop(msg["id"], None)
+                    if fut and not fut.done():
+                        if "error" in msg:
+                            fut.set_exception(CDPError(f"{msg['error'].get('message')} ({msg['error'].get('code')})"))
+                        else:
+                            fut.set_result(msg.get("result", {}))
+                elif msg.get("sessionId") in self._tabs:
+                    self._tabs[msg["sessionId"]]._dispatch(msg["method"], msg.get("params", {}))
+        finally:
+            for fut in self._pending.values():
+                if not fut.done():
+                    fut.set_exception(CDPError("DevTools connection closed"))
+            self._pending.clear()
+
+    async def send(self, method: str, params: dict | None = None, session_id: str | None = None,
+                   timeout: float = 60.0) -> dict:
+        msg_id = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[msg_id] = fut
+        msg = {"id": msg_id, "method": method, "params": params or {}}
+        if session_id:
+            msg["sessionId"] = session_id
+        await self.ws.send(json.dumps(msg))
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._pending.pop(msg_id, None)
+
+    async def create_context(self) -> str:
+        """A new incognito-style browser context (own cookies, storage, cache); gone when we disconnect."""
+        res = await self.send("Target.createBrowserContext", {"disposeOnDetach": True})
+        return res["browserContextId"]
+
+    async def dispose_context(self, context_id: str):
+        try:
+            await self.send("Target.disposeBrowserContext", {"browserContextId": context_id}, timeout=10)
+        except Exception:
+            pass
+
+    async def new_tab(self, url: str = "about:blank", lightweight: bool = False,
+                      network_events: bool = False, context_id: str | None = None) -> "CDPTab":
+        params = {"url": "about:blank"}
+        if context_id:
+            params["browserContextId"] = context_id
+        target = await self.send("Target.createTarget", params)
+        attached = await self.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        tab = CDPTab(self, target["targetId"], attached["sessionId"], lightweight, network_events)
+        self._tabs[tab.session_id] = tab
+        await tab._setup()
+        if url != "about:blank":
+            await tab.navigate(url)
+        return tab
+
+    async def close(self):
+        try:
+            if self.process:
+                await self.send("Browser.close", timeout=5)
+        except Exception:
+            pass
+        await self.ws.close()
+        self._reader.cancel()
+        if self.process:
+            self.process.terminate()
+
+class CDPTab:
+    def __init__(self, browser: CDPBrowser, target_id: str, session_id: str, lightweight=False, network_events=False):
+        self.browser = browser
+        self.target_id = target_id
+        self.session_id = session_id
+        self.lightweight = lightweight
+        self.network_events = network_events
+        self.events: deque = deque(maxlen=5000)  # Network.* events, read via CDPDriver.get_log("performance")
+        self._waiters: dict[str, list[asyncio.Future]] = {}
+
+    def _dispatch(self, method: str, params: dict):
+        if self.network_events and method.startswith("Network."):
+            self.events.append({"method": method, "params": params})
+        for fut in self._waiters.pop(method, []):
+            if not fut.done():
+                fut.set_result(params)
+
+    async def send(self, method: str, params: dict | None = None, timeout: float = 60.0) -> dict:
+        return await self.browser.send(method, params, self.session_id, timeout)
+
+    async def _setup(self):
+        await self.send("Page.enable")
+        await self.send("Runtime.enable")
+        await self.send("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_JS})
+        if self.lightweight or self.network_events:
+            await self.send("Network.enable")
+        if self.lightweight:
+            await self.send("Network.setBlockedURLs", {"urls": BLOCKED_IMAGE_URLS})
+
+    def wait_event(self, method: str) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(method, []).append(fut)
+        return fut
+
+    async def navigate(self, url: str, timeout: float = 30.0):
+        """Page.navigate, then wait for load (DOMContentLoaded in lightweight mode, like 'eager')."""
+        done = self.wait_event("Page.domContentEventFired" if self.lightweight else "Page.loadEventFired")
+        res = await self.send("Page.navigate", {"url": url})
+        if res.get("errorText"):
+            done.cancel()
+            raise CDPError(f"navigation to {url} failed: {res['errorText']}")
+        if url == "about:blank" or not res.get("loaderId"):
+            done.cancel()  # same-document navigations (no loaderId) fire no load event
+            return
+        try:
+            await asyncio.wait_for(done, timeout)
+        except asyncio.TimeoutError:
+            pass  # same as a slow page under Selenium: carry on with what has loaded
+
+    async def evaluate(self, expression: str, await_promise: bool = True):
+        res = await self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True,
+                                                   "awaitPromise": await_promise})
+        if "exceptionDetails" in res:
+            raise CDPError(res["exceptionDetails"].get("text", "evaluate failed"))
+        return res["result"].get("value")
+
+    async def call(self, object_id: str, function: str, *args, by_value: bool = True):
+        """Runtime.callFunctionOn; CDPRef args are passed as remote objects, everything else by value."""
+        res = await self.send("Runtime.callFunctionOn", {
+            "objectId": object_id, "functionDeclaration": function, "returnByValue": by_value,
+            "awaitPromise": True,
+            "arguments": [{"objectId": a.object_id} if isinstance(a, CDPRef) else {"value": a} for a in args]})
+        if "exceptionDetails" in res:
+            raise CDPError(res["exceptionDetails"].get("text", "callFunctionOn failed"))
+        return res["result"]
+
+    async def document(self) -> str:
+        res = await self.send("Runtime.evaluate", {"expression": "document"})
+        return res["result"]["objectId"]
+
+    async def query(self, by: str, selector: str, within: str | None = None, all: bool = False) -> list[str]:
+        """Object ids of matching elements under `within` (an element object id) or the document."""
+        result = await self.call(within or await self.document(), QUERY_FN, by, selector, all, by_value=False)
+        if result.get("subtype") == "null" or "objectId" not in result:
+            return []
+        if not all:
+            return [result["objectId"]]
+        props = await self.send("Runtime.getProperties", {"objectId": result["objectId"], "ownProperties": True})
+        items = [(int(p["name"]), p["value"]["objectId"]) for p in props.get("result", [])
+                 if p["name"].isdigit() and "objectId" in p.get("value", {})]
+        return [oid for _, oid in sorted(items)]
+
+    async def click(self, object_id: str):
+        """Scroll into view and click with trusted mouse events at the element's center."""
+        x, y = (await self.call(object_id, CLICK_POINT_FN))["value"]
+        for kind in ("mousePressed", "mouseReleased"):
+            await self.send("Input.dispatchMouseEvent", {"type": kind, "x": x, "y": y, "button": "left", "clickCount": 1})
+
+    async def close(self):
+        self.browser._tabs.pop(self.session_id, None)
+        try:
+            await self.browser.send("Target.closeTarget", {"targetId": self.target_id}, timeout=5)
+        except Exception:
+            pass
+
+# -------------------- sync adapter --------------------
+class _LoopThread:
+    """One event loop in a daemon thread, shared by every CDPDriver in the process."""
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="cdp-loop", daemon=True).start()
+
+    @classmethod
+    def get(cls) -> "_LoopThread":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def run(self, coro, timeout: float | None = None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+def launch_chrome(chrome_binary: str, port: int = 9222, headless: bool = True, timeout: float = 20.0):
+    """Start Chrome with a debugging port and a throwaway profile; returns (process, endpoint)."""
+    args = [chrome_binary, f"--remote-debugging-port={port}", f"--user-data-dir={tempfile.mkdtemp(prefix='cdp-')}",
+            "--no-first-run", "--no-default-browser-check", "--disable-dev-shm-usage", "--disable-gpu",
+            "--window-size=1366,900", "--lang=en-US", "--disable-blink-features=AutomationControlled"]
+    if headless:
+        args.append("--headless=new")
+    proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    endpoint = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _http_json(endpoint + "/json/version", timeout=1)
+            return proc, endpoint
+        except Exception:
+            time.sleep(0.2)
+    proc.terminate()
+    raise CDPError(f"Chrome did not open its debugging port {port} within {timeout:.0f}s")
+
+class CDPRef:
+    def __init__(self, object_id: str):
+        self.object_id = object_id
+
+class CDPElement(CDPRef):
+    def __init__(self, driver: "CDPDriver", object_id: str):
+        super().__init__(object_id)
+        self._driver = driver
+
+    def _call(self, fn, *args):
+        return self._driver._run(self._driver.tab.call(self.object_id, fn, *args)).get("value")
+
+    @property
+    def text(self):
+        return self._call(TEXT_FN) or ""
+
+    @property
+    def tag_name(self):
+        return (self._call("function() { return this.tagName; }") or "").lower()
+
+    def get_attribute(self, name):
+        return self._call(ATTR_FN, name)
+
+    def is_displayed(self):
+        return bool(self._call(DISPLAYED_FN))
+
+    def is_enabled(self):
+        return not self._call("function() { return !!this.disabled; }")
+
+    def click(self):
+        self._driver._run(self._driver.tab.click(self.object_id))
+
+    def clear(self):
+        self._call(CLEAR_FN)
+
+    def send_keys(self, *keys):
+        self._call("function() { this.focus(); }")
+        text = ""
+        for ch in "".join(str(k) for k in keys):
+            if ch not in ENTER_KEYS:
+                text += ch
+                continue
+            if text:
+                self._driver.execute_cdp_cmd("Input.insertText", {"text": text})
+                text = ""
+            for kind in ("keyDown", "keyUp"):
+                self._driver.execute_cdp_cmd("Input.dispatchKeyEvent", {
+                    "type": kind, "key": "Enter", "code": "Enter", "windowsVirtualKeyCode": 13,
+                    **({"text": "\r"} if kind == "keyDown" else {})})
+        if text:
+            self._driver.execute_cdp_cmd("Input.insertText", {"text": text})
+
+    def find_element(self, by="xpath", value=None):
+        found = self._driver._query(by, value, within=self.object_id)
+        if not found:
+            raise NoSuchElementException(f"{by}={value}")
+        return found[0]
+
+    def find_elements(self, by="xpath", value=None):
+        return self._driver._query(by, value, within=self.object_id, all=True)
+
+class CDPDriver:
+    """WebDriver-shaped facade over one CDPTab. Use CDPDriver.connect(...) to build one."""
+
+    def __init__(self, browser: CDPBrowser, tab: CDPTab, loop: _LoopThread, owns_browser: bool = False,
+                 command_timeout: float = 90.0, context_id: str | None = None, owns_context: bool = False):
+        self.browser = browser
+        self.tab = tab
+        self._loop = loop
+        self._owns_browser = owns_browser
+        self.command_timeout = command_timeout
+        self.context_id = context_id  # browser context of the tab (None = the default context)
+        self._owns_context = owns_context
+
+    @classmethod
+    def connect(cls, endpoint: str = "http://127.0.0.1:9222", chrome_binary: str | None = None,
+                lightweight: bool = False, performance_log: bool = False, browser: CDPBrowser | None = None,
+                isolated: bool = False, context_id: str | None = None):
+        """
+        Attach a new tab to the browser at `endpoint` (or launch chrome_binary with a debugging port).
+        Pass `browser=` to open another tab on an already connected browser (same websocket).
+        isolated: put the tab in a new browser context, disposed again by quit().
+        context_id: put the tab in an existing browser context (shares its cookies).
+        """
+        loop = _LoopThread.get()
+        owns = False
+        if browser is None:
+            process = None
+            if chrome_binary:
+                process, endpoint = launch_chrome(chrome_binary, urlparse(endpoint).port or 9222)
+            browser = loop.run(CDPBrowser.connect(endpoint, process), 30)
+            owns = True
+        if isolated:
+            context_id = loop.run(browser.create_context(), 30)
+        tab = loop.run(browser.new_tab(lightweight=lightweight, network_events=performance_log,
+                                       context_id=context_id), 30)
+        return cls(browser, tab, loop, owns, context_id=context_id, owns_context=isolated)
+
+    def new_driver(self, **kwargs) -> "CDPDriver":
+        """
+        Another tab on the same browser connection, in this driver's context unless isolated=True.
+        It is set up like this one (lightweight, performance_log) unless the kwargs say otherwise.
+        """
+        if not kwargs.get("isolated"):
+            kwargs.setdefault("context_id", self.context_id)
+        kwargs.setdefault("lightweight", self.tab.lightweight)
+        kwargs.setdefault("performance_log", self.tab.network_events)
+        return CDPDriver.connect(browser=self.browser, **kwargs)
+
+    def _run(self, coro):
+        return self._loop.run(coro, self.command_timeout)
+
+    def _query(self, by, value, within=None, all=False) -> list[CDPElement]:
+        return [CDPElement(self, oid) for oid in self._run(self.tab.query(by, value, within, all))]
+
+    # -------------------- WebDriver surface --------------------
+    def get(self, url):
+        self._run(self.tab.navigate(url))
+
+    @property
+    def current_url(self):
+        return self._run(self.tab.evaluate("location.href"))
+
+    @property
+    def title(self):
+        return self._run(self.tab.evaluate("document.title"))
+
+    @property
+    def page_source(self):
+        return self._run(self.tab.evaluate("document.documentElement.outerHTML"))
+
+    def find_element(self, by="xpath", value=None):
+        found = self._query(by, value)
+        if not found:
+            raise NoSuchElementException(f"{by}={value}")
+        return found[0]
+
+    def find_elements(self, by="xpath", value=None):
+        return self._query(by, value, all=True)
+
+    def execute_script(self, script, *args):
+        """Selenium semantics: `script` is a function body; elements in args arrive as DOM nodes."""
+        async def run():
+            window = (await self.tab.send("Runtime.evaluate", {"expression": "window"}))["result"]["objectId"]
+            res = await self.tab.call(window, f"function() {{\n{script}\n}}", *args, by_value=False)
+            if res.get("subtype") == "node":
+                return CDPElement(self, res["objectId"])
+            if "objectId" in res:
+                return (await self.tab.call(res["objectId"], "function() { return this; }")).get("value")
+            return res.get("value")
+        return self._run(run())
+
+    def execute_cdp_cmd(self, cmd, params=None):
+        return self._run(self.tab.send(cmd, params or {}))
+
+    @property
+    def capabilities(self) -> dict:
+        """chromedriver's debuggerAddress capability (session_supervisor finds the browser process by it)."""
+        return {"browserName": "chrome", "goog:chromeOptions": {"debuggerAddress": urlparse(self.browser.endpoint).netloc}}
+
+    def get_log(self, kind):
+        """Only "performance": buffered Network.* events in chromedriver's log-entry shape."""
+        if kind != "performance":
+            return []
+        out = []
+        while self.tab.events:
+            out.append({"message": json.dumps({"message": self.tab.events.popleft()}), "level": "INFO"})
+        return out
+
+    def get_cookies(self):
+        if self.context_id:  # every cookie of this context, not only the current page's
+            return self._run(self.browser.send("Storage.getCookies", {"browserContextId": self.context_id})).get("cookies", [])
+        return self.execute_cdp_cmd("Network.getCookies").get("cookies", [])
+
+    def delete_all_cookies(self):
+        if self.context_id:
+            self._run(self.browser.send("Storage.clearCookies", {"browserContextId": self.context_id}))
+            return
+        self.execute_cdp_cmd("Network.clearBrowserCookies")
+
+    def close(self):
+        self._run(self.tab.close())
+
+    def quit(self):
+        self._run(self.tab.close())
+        if self._owns_context:
+            self._run(self.browser.dispose_context(self.context_id))
+        if self._owns_browser:
+            self._run(self.browser.close())
@@ -0,0 +1,79 @@
+# cli_options.py
+# Option groups shared by Selenium_Amazon.py and Selenium_eBay.py, and the builders that turn the
+# parsed values into the objects the scrapers use. Light on purpose (argparse + pathlib only):
+# both scripts import it before --help is handled.
+#
+#   add_backend_args(p); add_image_args(p, "tile"); add_archive_args(p); add_metrics_args(p); add_session_args(p)
+#   args = p.parse_args()
+#   images = build_image_pipeline(args)            # None unless --download_images
+#   archive = build_page_archive(args, "amazon")   # None unless --archive_pages
+#   supervise = session_settings(args)             # None unless a recycling threshold / --session_log is set
+
+from pathlib import Path
+
+# -------------------- browser backend --------------------
+def add_backend_args(p):
+    p.add_argument("--backend", choices=["selenium", "cdp"], default="selenium",
+                   help="selenium: chromedriver at --executor_url; cdp: Chrome DevTools websocket at --cdp_url")
+    p.add_argument("--cdp_url", default="http://127.0.0.1:9222",
+                   help="Chrome started with --remote-debugging-port (launched here if --chrome_binary is set)")
+
+# -------------------- product images --------------------
+def add_image_args(p, images_of: str = "result"):
+    g = p.add_argument_group("product images")
+    g.add_argument("--download_images", action="store_true",
+                   help=f"Download {images_of} images in the background; adds Image_Path / Thumbnail_Path columns")
+    g.add_argument("--images_dir", default=None, help="Content-addressed image store (default <out_dir>/images)")
+    g.add_argument("--image_workers", type=int, default=8, help="Concurrent image downloads")
+    g.add_argument("--thumb_size", type=int, default=256, help="Thumbnail bounding box in px (0 = none; needs Pillow)")
+
+def build_image_pipeline(args):
+    if not args.download_images:
+        return None
+    from image_pipeline import ImagePipeline
+    return ImagePipeline(args.images_dir or Path(args.out_dir) / "images", workers=args.image_workers,
+                         thumb_size=args.thumb_size)
+
+# -------------------- raw page archive --------------------
+def add_archive_args(p):
+    g = p.add_argument_group("raw page archive")
+    g.add_argument("--archive_pages", action="store_true",
+                   help="Save every loaded page's HTML for offline re-parsing (page_parser.py)")
+    g.add_argument("--archive_dir", default=None, help="Archive directory (default <out_dir>/archive)")
+    g.add_argument("--archive_codec", choices=["auto", "zstd", "gzip"], default="auto",
+                   help="auto: zstd if the zstandard package is installed, else gzip")
+
+def build_page_archive(args, site: str):
+    if not args.archive_pages:
+        return None
+    from page_archive import PageArchive
+    return PageArchive(args.archive_dir or Path(args.out_dir) / "archive", site, codec=args.archive_codec)
+
+# -------------------- metrics --------------------
+def add_metrics_args(p):
+    g = p.add_argument_group("metrics")
+    g.add_argument("--metrics_file", default=None, help="Write OpenMetrics text here (periodically + at exit)")
+    g.add_argument("--metrics_port", type=int, default=None, help="Serve OpenMetrics on http://0.0.0.0:<port>/metrics")
+    g.add_argument("--metrics_interval", type=float, default=15.0, help="Seconds between metrics file rewrites")
+
+# -------------------- session health / recycling --------------------
+def add_session_args(p):
+    g = p.add_argument_group("session health / recycling")
+    g.add_argument("--recycle_after_navs", type=int, default=0, help="Recycle the browser every N navigations (0 = off)")
+    g.add_argument("--max_browser_mb", type=float, default=0,
+                   help="Recycle when the browser's processes (RSS, local browser; needs psutil) exceed this (0 = off)")
+    g.add_argument("--max_heap_mb", type=float, default=0, help="Recycle when the JS heap exceeds this (0 = off)")
+    g.add_argument("--latency_growth", type=float, default=0,
+                   help="Recycle when median navigation time grows by this factor (0 = off)")
+    g.add_argument("--health_sample_every", type=int, default=10, help="Sample memory every N navigations")
+    g.add_argument("--session_log", default=None, help="Append recycle events / memory samples (JSONL)")
+
+def session_settings(args) -> dict | None:
+    """SupervisedDriver keyword arguments, or None when no recycling was asked for."""
+    if not (args.recycle_after_navs or args.max_browser_mb or args.max_heap_mb or args.latency_growth
+            or args.session_log):
+        return None
+    return {"max_navigations": args.recycle_after_navs, "max_browser_mb": args.max_browser_mb,
+            "max_heap_mb": args.max_heap_mb,
+            "latency_growth": args.latency_growth, "sample_every": args.health_sample_every,
+            "log_path": args.session_log}
@@ -0,0 +1,297 @@
+# crawl_queue.py
+# Coordinator + worker CLI for sharing one crawl across processes and hosts via work_queue.py.
+#
+#   # coordinator: seed SERP tasks, watch progress, export when done
+#   python crawl_queue.py --queue sqlite:///crawl.db seed --site amazon --query "usb hub" --query "ssd" --max_products 10
+#       (de-duplicated per --run, default today: a daily cron re-seeds, a repeat on the same day adds nothing)
+#   python crawl_queue.py --queue sqlite:///crawl.db seed --site amazon --review_asin B0XXXXXXX --review_pages 5
+#   python crawl_queue.py --queue sqlite:///crawl.db progress --watch 30
+#   python crawl_queue.py --queue sqlite:///crawl.db export --out_dir Products
+#
+#   # any number of workers, each with its own chromedriver
+#   python crawl_queue.py --queue sqlite:///crawl.db worker --executor_url http://127.0.0.1:9515
+#
+#   # or many isolated workers in one Chrome: one browser context (own cookies/storage) per worker thread
+#   python crawl_queue.py --queue sqlite:///crawl.db worker --backend cdp --cdp_url http://127.0.0.1:9222 --contexts 8
+#
+# Task kinds:
+#   serp        amazon: search + tiles → one `product` task per tile;  ebay: search + scrape_results_basic → rows
+#   product     amazon: scrape_product_details → product row + review rows
+#   review_page amazon: one /product-reviews page → review rows
+
+import argparse
+import os
+import socket
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+from work_queue import TASK_KINDS, open_queue
+
+# -------------------- worker --------------------
+class CrawlWorker:
+    def __init__(self, queue, executor_url, chrome_binary=None, kinds=None, visibility_timeout=1800,
+                 backend="selenium", cdp_url="http://127.0.0.1:9222", driver_factory=None, name=""):
+        self.queue = queue
+        self.executor_url = executor_url
+        self.chrome_binary = chrome_binary
+        self.kinds = kinds or TASK_KINDS
+        self.visibility_timeout = visibility_timeout
+        self.backend = backend
+        self.cdp_url = cdp_url
+        self.driver_factory = driver_factory  # site -> raw driver; default builds one session per site
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}" + (f":{name}" if name else "")
+        self._drivers = {}
+
+    def driver_for(self, site: str):
+        """One browser session per site per worker, opened (and localized) on first use."""
+        if site not in self._drivers:
+            if site == "amazon":
+                import Selenium_Amazon as amz
+                d = (self.driver_factory(site) if self.driver_factory else
+                     amz.build_driver(self.executor_url, self.chrome_binary, backend=self.backend, cdp_url=self.cdp_url))
+                amz.open_amazon_home(d)
+            else:
+                import Selenium_eBay as ebay
+                d = (self.driver_factory(site) if self.driver_factory else
+                     ebay.build_driver(self.executor_url, self.chrome_binary, backend=self.backend, cdp_url=self.cdp_url))
+                ebay.open_english_ebay(d)
+            self._drivers[site] = d
+        return self._drivers[site]
+
+    def close(self):
+        for d in self._drivers.values():
+            try:
+                d.quit()
+            except:
+                pass
+        self._drivers.clear()
+
+    def run(self, idle_exit: float = 120, poll: float = 5):
+        print(f"Worker {self.worker_id} pulling {', '.join(self.kinds)}")
+        idle_since = time.time()
+        while True:
+            task = self.queue.lease(self.worker_id, self.kinds, self.visibility_timeout)
+            if task is None:
+                if time.time() - idle_since >= idle_exit:
+                    print("Queue idle; worker exiting")
+                    return
+                time.sleep(poll)
+                continue
+            idle_since = time.time()
+            print(f"\n→ Task {task['id']} ({task['kind']}, attempt {task['attempts']})")
+            try:
+                self.handle(task)
+                self.queue.complete(task["id"], self.worker_id)
+                print(f"✓ Task {task['id']} done")
+            except Exception as e:
+                status = self.queue.fail(task["id"], self.worker_id, repr(e))
+                print(f"✗ Task {task['id']} failed ({status}): {e}")
+
+    def handle(self, task):
+        p = task["payload"]
+        site = p.get("site", "amazon")
+        driver = self.driver_for(site)
+        if site == "ebay":
+            return self.ebay_serp(driver, task)
+        return {"serp": self.amazon_serp, "product": self.amazon_product,
+                "review_page": self.amazon_review_page}[task["kind"]](driver, task)
+
+    def amazon_serp(self, driver, task):
+        import Selenium_Amazon as amz
+        p = task["payload"]
+        if not amz.search_amazon(driver, p["query"]):
+            raise RuntimeError("search box not found")
+        infos = amz.collect_product_infos(driver, p.get("max_products", 5))
+        for i, info in enumerate(infos, 1):
+            self.queue.enqueue("product", {**p, "product_number": i, "product_info": info},
+                               dedupe_key=f"{p.get('run', '')}:amazon:product:{p['query']}:{info['asin']}")
+        print(f"  Enqueued {len(infos)} product tasks")
+
+    def amazon_product(self, driver, task):
+        import Selenium_Amazon as amz
+        p = task["payload"]
+        info, n = p["product_info"], p["product_number"]
+        details = amz.scrape_product_details(
+            driver, info["url"], n,
+            max_review_pages=p.get("max_review_pages", 5), max_reviews=p.get("max_reviews", 300),
+            max_foreign_pages=p.get("max_foreign_pages", 3), max_foreign_reviews=p.get("max_foreign_reviews", 200),
+            review_sample_per_star=p.get("review_sample_per_star", 0), raise_errors=True)
+        row = {"Query": p["query"], **amz.build_product_row(n, info, details)}
+        reviews = (amz.review_rows(details.get("reviews_full"), info["asin"], n, "domestic")
+                   + amz.review_rows(details.get("reviews_foreign"), info["asin"], n, "foreign"))
+        self.queue.push_results(task["id"], "amazon_product", [row], self.worker_id)
+        self.queue.push_results(task["id"], "amazon_review", [{"Query": p["query"], **r} for r in reviews], self.worker_id)
+
+    def amazon_review_page(self, driver, task):
+        import Selenium_Amazon as amz
+        p = task["payload"]
+        reviews = amz.scrape_full_reviews_from_reviews_page(driver, p["url"], max_pages=1,
+                                                            max_reviews=p.get("max_reviews", 300))
+        rows = amz.review_rows(reviews, p["asin"], 0, "domestic")
+        self.queue.push_results(task["id"], "amazon_review", [{"Query": p.get("query", p["asin"]), **r} for r in rows],
+                                self.worker_id)
+
+    def ebay_serp(self, driver, task):
+        import Selenium_eBay as ebay
+        p = task["payload"]
+        ebay.search_ebay(driver, p["query"])
+        rows = ebay.scrape_results_basic(driver, max_products=p.get("max_products", 10))
+        self.queue.push_results(task["id"], "ebay_result", [{"Query": p["query"], **r} for r in rows], self.worker_id)
+
+# -------------------- isolated workers in one Chrome --------------------
+def run_context_workers(args):
+    """
+    args.contexts CrawlWorkers in threads, each with its own queue connection and its own browser
+    context per site (Target.createBrowserContext), all over one CDP connection to one Chrome.
+    Contexts share the process tree but not cookies, storage or cache, so each behaves like a
+    separate session at a fraction of a Remote session's memory.
+    """
+    from cdp_backend import CDPDriver
+    root = CDPDriver.connect(args.cdp_url, args.chrome_binary)
+
+    def factory(site):
+        d = root.new_driver(isolated=True)
+        if site == "ebay":
+            import Selenium_eBay as ebay
+            ebay.cdp_force_english(d)
+        return d
+
+    def work(i):
+        worker = CrawlWorker(open_queue(args.queue, max_attempts=args.max_attempts), args.executor_url,
+                             args.chrome_binary, kinds=args.kinds.split(","), visibility_timeout=args.visibility_timeout,
+                             driver_factory=factory, name=f"ctx{i}")
+        try:
+            worker.run(idle_exit=args.idle_exit)
+        finally:
+            worker.close()
+
+    print(f"Starting {args.contexts} isolated workers in one browser at {args.cdp_url}")
+    threads = [threading.Thread(target=work, args=(i,), name=f"ctx{i}") for i in range(1, args.contexts + 1)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    root.quit()
+
+# -------------------- coordinator --------------------
+def seed(queue, args):
+    queries = list(args.query or [])
+    if args.queries_file:
+        queries += [q.strip() for q in Path(args.queries_file).read_text(encoding="utf-8").splitlines() if q.strip()]
+    n = 0
+    for q in queries:
+        payload = {"site": args.site, "run": args.run, "query": q, "max_products": args.max_products,
+                   "max_review_pages": args.max_review_pages, "max_reviews": args.max_reviews,
+                   "max_foreign_pages": args.max_foreign_pages, "max_foreign_reviews": args.max_foreign_reviews,
+                   "review_sample_per_star": args.review_sample_per_star}
+        if queue.enqueue("serp", payload, priority=1, dedupe_key=f"{args.run}:{args.site}:serp:{q}") is not None:
+            n += 1
+    for asin in args.review_asin or []:
+        for page in range(1, args.review_pages + 1):
+            url = f"https://www.amazon.com/product-reviews/{asin}/?reviewerType=all_reviews&pageNumber={page}"
+            if queue.enqueue("review_page", {"site": "amazon", "run": args.run, "asin": asin, "url": url,
+                                             "max_reviews": args.max_reviews},
+                             dedupe_key=f"{args.run}:amazon:review_page:{asin}:{page}") is not None:
+                n += 1
+    print(f"Seeded {n} new tasks")
+
+def print_progress(queue):
+    prog = queue.progress()
+    results = prog.pop("results", {})
+    print(f"{'kind':12s} {'pending':>8s} {'leased':>8s} {'expired':>8s} {'done':>8s} {'dead':>8s}")
+    for kind, counts in sorted(prog.items()):
+        print(f"{kind:12s} " + " ".join(f"{counts.get(k, 0):8d}" for k in ("pending", "leased", "expired", "done", "dead")))
+    print("results: " + (", ".join(f"{k}={v}" for k, v in sorted(results.items())) or "none"))
+    return prog
+
+def export(queue, args):
+    import Selenium_Amazon as amz
+    import Selenium_eBay as ebay
+    by_query: dict[tuple, list] = {}
+    for kind in ("amazon_product", "amazon_review", "ebay_result"):
+        for row in queue.results(kind):
+            by_query.setdefault((kind, row.get("Query", "")), []).append(row)
+    stamp = amz.timestamp()
+    for (kind, query), rows in sorted(by_query.items()):
+        name = f"{amz.sanitize_name(query)}_{stamp}.csv"
+        if kind == "ebay_result":
+            ebay.save_results(rows, f"ebay_{query}", Path(args.out_dir), args.out_format)
+            continue
+        normalize = None
+        if args.out_format != "jsonl":
+            from normalize import normalize_amazon_products, normalize_reviews
+            normalize = normalize_amazon_products if kind == "amazon_product" else normalize_reviews
+        amz.save_results(sorted(rows, key=lambda r: r.get("Product_Number", 0)), query, Path(args.out_dir), name,
+                         args.out_format, suffix="_reviews" if kind == "amazon_review" else "", normalize=normalize)
+
+# -------------------- CLI --------------------
+def parse_args():
+    p = argparse.ArgumentParser(description="Distributed crawl: shared work queue coordinator and workers.")
+    p.add_argument("--queue", default="sqlite:///crawl_queue.db", help="Queue URL (default SQLite file)")
+    p.add_argument("--max_attempts", type=int, default=3)
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    s = sub.add_parser("seed", help="Enqueue SERP (or review-page) tasks")
+    s.add_argument("--site", choices=["amazon", "ebay"], default="amazon")
+    s.add_argument("--run", default=date.today().isoformat(),
+                   help="Run id scoping de-duplication (default today: the same query is seeded once per day)")
+    s.add_argument("--query", action="append")
+    s.add_argument("--queries_file", default=None, help="One query per line")
+    s.add_argument("--max_products", type=int, default=5)
+    s.add_argument("--max_review_pages", type=int, default=5)
+    s.add_argument("--max_reviews", type=int, default=300)
+    s.add_argument("--max_foreign_pages", type=int, default=3)
+    s.add_argument("--max_foreign_reviews", type=int, default=200)
+    s.add_argument("--review_sample_per_star", type=int, default=0, help="Stratified review sample per star bucket")
+    s.add_argument("--review_asin", action="append", help="Enqueue /product-reviews pages for this ASIN")
+    s.add_argument("--review_pages", type=int, default=5)
+
+    w = sub.add_parser("worker", help="Pull and run tasks")
+    w.add_argument("--executor_url", default="http://127.0.0.1:9515")
+    w.add_argument("--chrome_binary", default=None)
+    w.add_argument("--kinds", default=",".join(TASK_KINDS))
+    w.add_argument("--visibility_timeout", type=float, default=1800, help="Seconds before an unfinished lease is retried")
+    w.add_argument("--idle_exit", type=float, default=120, help="Exit after this many idle seconds")
+    w.add_argument("--backend", choices=["selenium", "cdp"], default="selenium",
+                   help="Drive Chrome through chromedriver (selenium) or the DevTools protocol (cdp)")
+    w.add_argument("--cdp_url", default="http://127.0.0.1:9222", help="DevTools endpoint for --backend cdp")
+    w.add_argument("--contexts", type=int, default=1,
+                   help="Run N worker threads, each in its own browser context of one Chrome (needs --backend cdp)")
+
+    g = sub.add_parser("progress", help="Show task counts")
+    g.add_argument("--watch", type=float, default=0, help="Refresh every N seconds until nothing is pending")
+
+    e = sub.add_parser("export", help="Write collected results like the single-host scrapers do")
+    e.add_argument("--out_dir", default="Products")
+    e.add_argument("--out_format", choices=["csv", "parquet", "jsonl"], default="csv")
+    args = p.parse_args()
+    if args.cmd == "worker" and args.contexts > 1 and args.backend != "cdp":
+        p.error("--contexts needs --backend cdp")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    queue = open_queue(args.queue, max_attempts=args.max_attempts)
+    if args.cmd == "seed":
+        seed(queue, args)
+    elif args.cmd == "worker" and args.contexts > 1:
+        run_context_workers(args)
+    elif args.cmd == "worker":
+        worker = CrawlWorker(queue, args.executor_url, args.chrome_binary, kinds=args.kinds.split(","),
+                             visibility_timeout=args.visibility_timeout, backend=args.backend, cdp_url=args.cdp_url)
+        try:
+            worker.run(idle_exit=args.idle_exit)
+        finally:
+            worker.close()
+    elif args.cmd == "progress":
+        while True:
+            prog = print_progress(queue)
+            busy = any(c.get("pending", 0) or c.get("leased", 0) or c.get("expired", 0) for c in prog.values())
+            if not args.watch or not busy:
+                break
+            time.sleep(args.watch)
+            print()
+    elif args.cmd == "export":
+        export(queue, args)
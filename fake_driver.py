@@ -0,0 +1,346 @@
+# fake_driver.py
+# In-process stand-in for webdriver.Remote over static HTML fixtures (needs lxml + cssselect).
+#
+# Implements the subset the scrapers use — get, current_url, page_source, title,
+# find_element(s) (xpath / css / id / name / class / tag), execute_script, execute_cdp_cmd,
+# get_log, cookies, window handles — and counts every command as one "round trip".
+# An artificial per-command latency (seconds, global float or {command: seconds}) models
+# the WebDriver HTTP hop so orchestration overhead can be measured in isolation:
+#
+#   pages = {"https://www.amazon.com/s?k=x": serp_html, "https://www.amazon.com/dp/B000000001": pdp_html}
+#   driver = FakeDriver(pages, latency={"get": 0.05, "*": 0.002})
+#   Selenium_Amazon.collect_product_infos(driver, 100)
+#   print(driver.commands)        # Counter({'find_element': 1700, ...})
+#
+# Fixture directories: index.json mapping URL -> file name, next to the HTML files
+# (see FakeDriver.from_dir).
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from time import process_time, sleep as _real_sleep  # captured before benchmarks virtualize time.sleep
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+
+try:
+    from selenium.common.exceptions import NoSuchElementException
+except ImportError:  # benchmarks of pure-python paths can run without selenium
+    class NoSuchElementException(Exception):
+        pass
+
+_WS = re.compile(r"\s+")
+
+def _to_xpath(by: str, value: str) -> str | None:
+    if by == "xpath":
+        return value
+    if by == "id":
+        return f'.//*[@id="{value}"]'
+    if by == "name":
+        return f'.//*[@name="{value}"]'
+    if by == "class name":
+        return f'.//*[contains(concat(" ", normalize-space(@class), " "), " {value} ")]'
+    if by == "tag name":
+        return f".//{value}"
+    return None  # css handled by cssselect
+
+class FakeElement:
+    def __init__(self, driver, node):
+        self._driver = driver
+        self._node = node
+
+    def _rt(self, command):
+        self._driver._round_trip(command)
+
+    @property
+    def text(self):
+        self._rt("element_text")
+        return _WS.sub(" ", self._node.text_content() or "").strip()
+
+    @property
+    def tag_name(self):
+        self._rt("tag_name")
+        return self._node.tag
+
+    def get_attribute(self, name):
+        self._rt("get_attribute")
+        if name in ("textContent", "innerText"):
+            return self._node.text_content()
+        val = self._node.get(name)
+        if name in ("href", "src") and val is not None:
+            return urljoin(self._driver._win["url"], val)
+        return val
+
+    def is_displayed(self):
+        self._rt("is_displayed")
+        return "display:none" not in (self._node.get("style") or "").replace(" ", "")
+
+    def is_enabled(self):
+        self._rt("is_enabled")
+        return self._node.get("disabled") is None
+
+    def click(self):
+        self._rt("click")
+        href = self._node.get("href")
+        if href and not href.startswith(("#", "javascript:")):
+            self._driver._navigate(urljoin(self._driver._win["url"], href))
+
+    def clear(self):
+        self._rt("clear")
+
+    def send_keys(self, *keys):
+        self._rt("send_keys")
+
+    def find_element(self, by="xpath", value=None):
+        found = self._driver._find(self._node, by, value)
+        self._rt("find_element")
+        if not found:
+            raise NoSuchElementException(f"{by}={value}")
+        return FakeElement(self._driver, found[0])
+
+    def find_elements(self, by="xpath", value=None):
+        self._rt("find_elements")
+        return [FakeElement(self._driver, n) for n in self._driver._find(self._node, by, value)]
+
+    def __eq__(self, other):
+        return isinstance(other, FakeElement) and other._node is self._node
+
+    def __hash__(self):
+        return id(self._node)
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver._round_trip("switch_to_window")
+        self._driver._current = handle
+
+    def new_window(self, kind="tab"):
+        self._driver._round_trip("new_window")
+        self._driver._current = self._driver._open_window()
+
+class FakeDriver:
+    def __init__(self, pages=None, latency=0.0, default_html="<html><body></body></html>", script_handlers=None):
+        """
+        pages: {url: html} or callable(url) -> html | None. Unknown URLs get default_html.
+        latency: seconds per command, or {command: seconds, "*": default}.
+        script_handlers: [(regex, fn(driver, *args))] consulted by execute_script before the built-ins.
+        """
+        self.pages = pages or {}
+        self.latency = latency
+        self.default_html = default_html
+        self.script_handlers = [(re.compile(p), fn) for p, fn in (script_handlers or [])]
+        self.commands: Counter = Counter()
+        self.cpu_seconds = 0.0  # spent parsing fixtures / evaluating selectors, i.e. the "browser" side
+        self.cookies: list[dict] = []
+        self._windows: dict[str, dict] = {}
+        self._opened = 0
+        self._current = self._open_window()
+        self.switch_to = _SwitchTo(self)
+
+    @classmethod
+    def from_dir(cls, path, **kwargs):
+        root = Path(path)
+        index = json.loads((root / "index.json").read_text(encoding="utf-8"))
+        return cls({url: (root / name).read_text(encoding="utf-8") for url, name in index.items()}, **kwargs)
+
+    # -------------------- bookkeeping --------------------
+    @property
+    def round_trips(self) -> int:
+        return sum(self.commands.values())
+
+    def reset_counters(self):
+        self.commands.clear()
+        self.cpu_seconds = 0.0
+
+    def _round_trip(self, command: str):
+        self.commands[command] += 1
+        lat = self.latency.get(command, self.latency.get("*", 0.0)) if isinstance(self.latency, dict) else self.latency
+        if lat:
+            _real_sleep(lat)
+
+    def _open_window(self) -> str:
+        self._opened += 1
+        handle = f"W{self._opened}"  # not len(): handles of closed windows must not be reused
+        self._windows[handle] = {"url": "about:blank", "tree": lxml_html.fromstring(self.default_html)}
+        return handle
+
+    @property
+    def _win(self):
+        return self._windows[self._current]
+
+    def _navigate(self, url: str):
+        t0 = process_time()
+        html = self.pages(url) if callable(self.pages) else self.pages.get(url)
+        self._win["url"] = url
+        self._win["tree"] = lxml_html.fromstring(html or self.default_html)
+        self.cpu_seconds += process_time() - t0
+
+    def _find(self, node, by, value):
+        t0 = process_time()
+        try:
+            xp = _to_xpath(by, value)
+            if xp is None:
+                return node.cssselect(value)
+            return [n for n in node.xpath(xp) if isinstance(n, lxml_html.HtmlElement)]
+        finally:
+            self.cpu_seconds += process_time() - t0
+
+    # -------------------- WebDriver surface --------------------
+    def get(self, url):
+        self._round_trip("get")
+        self._navigate(url)
+
+    @property
+    def current_url(self):
+        self._round_trip("current_url")
+        return self._win["url"]
+
+    @property
+    def title(self):
+        self._round_trip("title")
+        t = self._win["tree"].find(".//title")
+        return t.text_content().strip() if t is not None else ""
+
+    @property
+    def page_source(self):
+        self._round_trip("page_source")
+        return lxml_html.tostring(self._win["tree"], encoding="unicode")
+
+    @property
+    def window_handles(self):
+        self._round_trip("window_handles")
+        return list(self._windows)
+
+    @property
+    def current_window_handle(self):
+        return self._current
+
+    def find_element(self, by="xpath", value=None):
+        found = self._find(self._win["tree"], by, value)
+        self._round_trip("find_element")
+        if not found:
+            raise NoSuchElementException(f"{by}={value}")
+        return FakeElement(self, found[0])
+
+    def find_elements(self, by="xpath", value=None):
+        self._round_trip("find_elements")
+        return [FakeElement(self, n) for n in self._find(self._win["tree"], by, value)]
+
+    def execute_script(self, script, *args):
+        self._round_trip("execute_script")
+        for pattern, fn in self.script_handlers:
+            if pattern.search(script):
+                return fn(self, *args)
+        if "document.readyState" in script:
+            return "complete"
+        if "arguments[0].click()" in script and args and isinstance(args[0], FakeElement):
+            href = args[0]._node.get("href")
+            if href and not href.startswith(("#", "javascript:")):
+                self._navigate(urljoin(self._win["url"], href))
+            return None
+        if "document.documentElement.lang" in script:
+            return self._win["tree"].get("lang", "")
+        if "application/ld+json" in script:  # structured_data.STRUCTURED_JS
+            return self._structured_data()
+        if "resolveChains" in script and args:  # selector_compiler.RESOLVE_JS
+            return self._resolve_chains(args[0])
+        if "location.href =" in script and args:
+            self._navigate(urljoin(self._win["url"], args[0]))
+            return None
+        if "window.open(" in script:
+            handle = self._open_window()
+            m = re.search(r"window\.open\((['\"])(.*?)\1", script)
+            url = (args[0] if args else None) or (m.group(2) if m else None)
+            if url:
+                prev, self._current = self._current, handle
+                self._navigate(url)
+                self._current = prev
+            return None
+        return None
+
+    def _structured_data(self) -> dict:
+        t0 = process_time()
+        tree, out = self._win["tree"], {"ld": [], "state": {}, "price_data": []}
+        for s in tree.xpath('//script[@type="application/ld+json"]'):
+            try:
+                data = json.loads(s.text or "")
+            except ValueError:
+                continue
+            graph = data.get("@graph", []) if isinstance(data, dict) else []
+            out["ld"].extend(d for d in (data if isinstance(data, list) else [data]) + graph if isinstance(d, dict))
+        for s in tree.xpath('//script[@type="a-state"]'):
+            try:
+                out["state"][json.loads(s.get("data-a-state") or "{}")["key"]] = json.loads(s.text or "")
+            except (ValueError, KeyError):
+                continue
+        self.cpu_seconds += process_time() - t0
+        return out
+
+    def _resolve_chains(self, spec: dict) -> list[dict]:
+        """selector_compiler.RESOLVE_JS on the fixture tree: first matching chain entry per field and block."""
+        t0 = process_time()
+        tree = self._win["tree"]
+
+        def find(root, sel):
+            try:
+                if sel.startswith(("//", ".//")):
+                    return [n for n in root.xpath(sel) if isinstance(n, lxml_html.HtmlElement)]
+                return root.cssselect(sel)
+            except Exception:
+                return []
+
+        def record(root):
+            out = {}
+            for name, chain in spec["fields"].items():
+                out[name] = ""
+                for sel in chain:
+                    hits = find(root, sel)
+                    t = _WS.sub(" ", hits[0].text_content() or "").strip() if hits else ""
+                    if len(t) >= (spec.get("min_len") or {}).get(name, 1):
+                        out[name] = t
+                        break
+            for a in spec.get("attrs") or []:
+                out["@" + a] = root.get(a) or ""
+            return out
+
+        if not spec.get("blocks"):
+            result = [record(tree)]
+        else:
+            blocks = []
+            for sel in spec["blocks"]:
+                blocks = find(tree, sel)
+                if blocks:
+                    break
+            result = [record(b) for b in blocks[: spec.get("limit") or None]]
+        self.cpu_seconds += process_time() - t0
+        return result
+
+    def execute_cdp_cmd(self, cmd, params=None):
+        self._round_trip("execute_cdp_cmd")
+        return {}
+
+    def get_log(self, kind):
+        self._round_trip("get_log")
+        return []
+
+    def get_cookies(self):
+        self._round_trip("get_cookies")
+        return list(self.cookies)
+
+    def add_cookie(self, cookie):
+        self._round_trip("add_cookie")
+        self.cookies.append(cookie)
+
+    def delete_all_cookies(self):
+        self._round_trip("delete_all_cookies")
+        self.cookies.clear()
+
+    def close(self):
+        self._round_trip("close")
+        self._windows.pop(self._current, None)
+
+    def quit(self):
+        self._round_trip("quit")
@@ -0,0 +1,47 @@
+# field_plan.py
+# --fields projection: the requested output columns decide which extraction stages run, so a run
+# that only wants prices never opens review pages or clicks warranty expanders.
+#
+#   plan = FieldPlan(Selenium_Amazon.FIELD_STAGES, "Title,Price,Overall_Rating")
+#   plan.needs("reviews")        -> False (no /product-reviews navigation)
+#   plan.project(row)            -> {"Title": ..., "Price": ..., "Overall_Rating": ...}
+#
+# A field is an output column name, an fnmatch pattern over column names ("Review_*", "Price_??")
+# or a stage name ("reviews" = every column that stage produces). No fields = every stage, every column.
+
+from fnmatch import fnmatchcase
+
+class FieldPlan:
+    def __init__(self, stages: dict[str, list[str]], fields=None):
+        """stages: {stage: [output columns (patterns allowed)]}; fields: "a,b" or a list."""
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        self.stages = stages
+        self.fields = [f.strip() for f in (fields or []) if f.strip()]
+        self.unknown = [f for f in self.fields if not self._stages_of(f)]
+        self.active = {s for f in self.fields for s in self._stages_of(f)} if self.fields else set(stages)
+
+    def _stages_of(self, field: str) -> set[str]:
+        if field in self.stages:
+            return {field}
+        return {s for s, cols in self.stages.items()
+                if any(fnmatchcase(c, field) or fnmatchcase(field, c) for c in cols)}
+
+    def needs(self, *stages: str) -> bool:
+        """True if any of the stages produces a requested column."""
+        return any(s in self.active for s in stages)
+
+    def project(self, row: dict) -> dict:
+        """Only the requested columns, in the order they were requested (row unchanged without --fields)."""
+        if not self.fields:
+            return row
+        out = {}
+        for f in self.fields:
+            patterns = self.stages[f] if f in self.stages else [f]
+            for k, v in row.items():
+                if k not in out and any(fnmatchcase(k, p) for p in patterns):
+                    out[k] = v
+        return out
+
+    def describe(self) -> str:
+        return "all stages" if not self.fields else ", ".join(s for s in self.stages if s in self.active)
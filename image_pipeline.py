@@ -0,0 +1,200 @@
+# image_pipeline.py
+# Background product-image downloads into a content-addressed store, with thumbnails.
+#
+#   images = ImagePipeline("Products/images", workers=8, thumb_size=256)
+#   images.submit(url)                  # returns immediately; the browser keeps going
+#   ...
+#   images.wait(); images.annotate(rows, url_field="Image_URL")   # adds Image_Path / Thumbnail_Path
+#   images.close()
+#
+# Layout:
+#   <store>/ab/abcdef....jpg           original bytes, named by SHA-256 (same image = one file)
+#   <store>/thumbs/abcdef..._256.jpg   thumbnails (needs Pillow; skipped with a notice otherwise)
+#   <store>/index.jsonl                url -> sha256 / path, so later runs skip known URLs
+#
+# Downloads run on a bounded thread pool; each thread keeps one keep-alive connection per host,
+# so at most `workers` connections are open per host. Thumbnails are made in a process pool.
+
+import hashlib
+import http.client
+import importlib.util
+import json
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_futures
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/126.0 Safari/537.36")
+EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif",
+              "image/avif": ".avif", "image/svg+xml": ".svg"}
+MAGIC = [(b"\xff\xd8\xff", ".jpg"), (b"\x89PNG", ".png"), (b"GIF8", ".gif"), (b"RIFF", ".webp")]
+
+def _make_thumbnail(src: str, dst: str, size: int) -> str:
+    """Runs in a worker process."""
+    from PIL import Image
+    with Image.open(src) as im:
+        im.thumbnail((size, size))
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        tmp = f"{dst}.{os.getpid()}.tmp"
+        im.save(tmp, "JPEG", quality=85)
+    os.replace(tmp, dst)
+    return dst
+
+def _extension(content_type: str, data: bytes) -> str:
+    ext = EXTENSIONS.get((content_type or "").split(";")[0].strip().lower())
+    if ext:
+        return ext
+    return next((e for magic, e in MAGIC if data.startswith(magic)), ".bin")
+
+class ImagePipeline:
+    def __init__(self, store_dir, workers: int = 8, thumb_size: int = 256, thumb_processes: int = 2,
+                 timeout: float = 20.0):
+        self.store = Path(store_dir)
+        (self.store / "thumbs").mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self.thumb_size = thumb_size
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._open_conns: list = []
+        self._downloads = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="img")
+        self._futures: dict[str, Future] = {}
+        self._thumb_futures: dict[str, Future] = {}
+        self._thumbs = None
+        if thumb_size and importlib.util.find_spec("PIL") is None:
+            print("  ✗ Pillow not installed; images are stored without thumbnails")
+        elif thumb_size:
+            self._thumbs = ProcessPoolExecutor(max_workers=thumb_processes)
+        self._index_path = self.store / "index.jsonl"
+        self.index: dict[str, dict] = {}
+        if self._index_path.exists():
+            for line in self._index_path.read_text(encoding="utf-8").splitlines():
+                try:
+                    rec = json.loads(line)
+                    if (self.store / rec["path"]).exists():
+                        self.index[rec["url"]] = rec
+                except Exception:
+                    continue
+        self.stats = {"submitted": 0, "downloaded": 0, "cached": 0, "duplicates": 0, "failed": 0}
+
+    # -------------------- public --------------------
+    def submit(self, url: str) -> Future | None:
+        """Queue one image URL (idempotent). Never blocks on the network."""
+        if not url or not url.startswith("http"):
+            return None
+        with self._lock:
+            if url in self._futures:
+                return self._futures[url]
+            self.stats["submitted"] += 1
+            fut = self._downloads.submit(self._process, url)
+            self._futures[url] = fut
+            return fut
+
+    def wait(self, timeout: float | None = None):
+        """Block until queued downloads (and their thumbnails) finish."""
+        wait_futures(list(self._futures.values()), timeout=timeout)
+        wait_futures(list(self._thumb_futures.values()), timeout=timeout)
+
+    def lookup(self, url: str) -> dict:
+        rec = self.index.get(url)
+        if not rec:
+            return {"Image_Path": "", "Thumbnail_Path": ""}
+        thumb = self._thumb_path(rec["sha256"])
+        thumb_fut = self._thumb_futures.get(rec["sha256"])
+        has_thumb = thumb.exists() and (thumb_fut is None or (thumb_fut.done() and not thumb_fut.exception()))
+        return {"Image_Path": str(self.store / rec["path"]), "Thumbnail_Path": str(thumb) if has_thumb else ""}
+
+    def annotate(self, rows: list[dict], url_field: str = "Image_URL") -> list[dict]:
+        """Add Image_Path / Thumbnail_Path to each row (in place) from its image URL."""
+        for row in rows:
+            row.update(self.lookup(row.get(url_field, "")))
+        return rows
+
+    def close(self):
+        self._downloads.shutdown(wait=True)
+        if self._thumbs:
+            self._thumbs.shutdown(wait=True)
+        for conn in self._open_conns:
+            conn.close()
+        s = self.stats
+        print(f"Images: {s['downloaded']} downloaded, {s['cached']} already stored, "
+              f"{s['duplicates']} duplicate content, {s['failed']} failed")
+
+    # -------------------- workers --------------------
+    def _conn(self, scheme: str, host: str, fresh: bool = False):
+        conns = self._local.__dict__.setdefault("conns", {})
+        key = (scheme, host)
+        if fresh and key in conns:
+            conns.pop(key).close()
+        if key not in conns:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conns[key] = cls(host, timeout=self.timeout)
+            with self._lock:
+                self._open_conns.append(conns[key])
+        return conns[key]
+
+    def _fetch(self, url: str, redirects: int = 3) -> tuple[bytes, str]:
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):  # second try on a fresh connection if keep-alive was dropped
+            conn = self._conn(parts.scheme, parts.netloc, fresh=attempt > 0)
+            try:
+                conn.request("GET", path, headers={"User-Agent": USER_AGENT, "Accept": "image/*,*/*;q=0.8"})
+                resp = conn.getresponse()
+                data = resp.read()
+                break
+            except (http.client.HTTPException, OSError):
+                if attempt:
+                    raise
+        if resp.status in (301, 302, 303, 307, 308) and redirects and resp.getheader("Location"):
+            return self._fetch(urljoin(url, resp.getheader("Location")), redirects - 1)
+        if resp.status != 200:
+            raise OSError(f"HTTP {resp.status}")
+        return data, resp.getheader("Content-Type", "")
+
+    def _thumb_path(self, sha: str) -> Path:
+        return self.store / "thumbs" / f"{sha}_{self.thumb_size}.jpg"
+
+    def _process(self, url: str):
+        rec = self.index.get(url)
+        if rec:
+            with self._lock:
+                self.stats["cached"] += 1
+        else:
+            try:
+                data, ctype = self._fetch(url)
+            except Exception as e:
+                with self._lock:
+                    self.stats["failed"] += 1
+                print(f"  ✗ Image download failed ({url[:80]}): {e}")
+                return None
+            sha = hashlib.sha256(data).hexdigest()
+            rel = Path(sha[:2]) / f"{sha}{_extension(ctype, data)}"
+            dst = self.store / rel
+            with self._lock:
+                duplicate = dst.exists()
+                self.stats["duplicates" if duplicate else "downloaded"] += 1
+            if not duplicate:
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                tmp = dst.with_name(f"{dst.name}.{threading.get_ident()}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, dst)
+            rec = {"url": url, "sha256": sha, "path": str(rel), "bytes": len(data)}
+            with self._lock:
+                self.index[url] = rec
+                with open(self._index_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(rec) + "\n")
+        self._submit_thumbnail(rec)
+        return rec
+
+    def _submit_thumbnail(self, rec: dict):
+        if not self._thumbs or rec["path"].endswith((".svg", ".bin")):
+            return
+        thumb = self._thumb_path(rec["sha256"])
+        with self._lock:
+            if thumb.exists() or rec["sha256"] in self._thumb_futures:
+                return
+            self._thumb_futures[rec["sha256"]] = self._thumbs.submit(
+                _make_thumbnail, str(self.store / rec["path"]), str(thumb), self.thumb_size)
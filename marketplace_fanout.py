@@ -0,0 +1,124 @@
+# marketplace_fanout.py
+# Fetch one ASIN from several Amazon marketplaces at once, for --marketplaces.
+#
+#   results = fetch_marketplaces(driver, "B0C1234567", ["uk", "de", "jp"], read_page, wait_loaded)
+#   results["de"] -> {"url", "price", "overall_rating", "num_ratings", "availability", "reviews": [Review, ...]}
+#
+# read_page(driver, max_reviews) reads the loaded product page and wait_loaded(driver, timeout) waits for
+# one; the scraper passes its own (Selenium_Amazon.read_marketplace_page / wait_for_page_load), so this
+# module does not import the scraper script.
+#
+# The pages load concurrently, at most max_parallel at a time:
+#   selenium  one tab per marketplace in the same session; each tab of a batch is told to navigate
+#             (non-blocking location change) before any is waited on, then they are read one by one
+#   cdp       one CDPDriver tab per marketplace on the same browser connection, each in its own thread
+# Reviews are the local review blocks of each marketplace's product page, origin_country set to the
+# marketplace's country. The URL template makes the hosts replaceable, e.g. local stand-ins:
+#
+#   --marketplace_url_template "http://127.0.0.1:8000/{code}/dp/{asin}"
+
+from concurrent.futures import ThreadPoolExecutor
+
+# code -> (domain suffix, country written to origin_country)
+MARKETPLACES = {
+    "us": ("com", "United States"), "ca": ("ca", "Canada"), "mx": ("com.mx", "Mexico"),
+    "br": ("com.br", "Brazil"), "uk": ("co.uk", "United Kingdom"), "de": ("de", "Germany"),
+    "fr": ("fr", "France"), "it": ("it", "Italy"), "es": ("es", "Spain"), "nl": ("nl", "Netherlands"),
+    "se": ("se", "Sweden"), "pl": ("pl", "Poland"), "tr": ("com.tr", "Turkey"), "ae": ("ae", "United Arab Emirates"),
+    "in": ("in", "India"), "jp": ("co.jp", "Japan"), "sg": ("sg", "Singapore"), "au": ("com.au", "Australia"),
+}
+DEFAULT_URL_TEMPLATE = "https://www.amazon.{tld}/dp/{asin}"
+
+def marketplace_url(code: str, asin: str, url_template: str = DEFAULT_URL_TEMPLATE) -> str:
+    return url_template.format(code=code, tld=MARKETPLACES[code][0], asin=asin)
+
+def marketplace_source(code: str) -> str:
+    """Source column value of a marketplace's review rows, e.g. 'amazon.co.uk'."""
+    return f"amazon.{MARKETPLACES[code][0]}"
+
+def extract_marketplace_page(driver, code: str, read_page, max_reviews: int = 10) -> dict:
+    """read_page() of driver's current tab, with the marketplace's country on each local review."""
+    res = read_page(driver, max_reviews)
+    for rv in res["reviews"]:
+        rv.origin_country = MARKETPLACES[code][1]
+    return res
+
+def _failed(url: str, e: Exception) -> dict:
+    return {"url": url, "price": "", "overall_rating": "", "num_ratings": "", "availability": "",
+            "reviews": [], "error": str(e)}
+
+# -------------------- selenium: tabs in one session --------------------
+def _fetch_in_tabs(driver, urls: dict, read_page, wait_loaded, max_reviews: int, timeout: float,
+                   max_parallel: int) -> dict:
+    codes = list(urls)
+    results = {}
+    for i in range(0, len(codes), max_parallel):
+        results.update(_fetch_tab_batch(driver, {c: urls[c] for c in codes[i:i + max_parallel]},
+                                        read_page, wait_loaded, max_reviews, timeout))
+    return results
+
+def _fetch_tab_batch(driver, urls: dict, read_page, wait_loaded, max_reviews: int, timeout: float) -> dict:
+    from selenium.webdriver.support.ui import WebDriverWait
+    origin = driver.current_window_handle
+    tabs = {}
+    for code, url in urls.items():
+        try:
+            driver.switch_to.new_window("tab")
+            driver.execute_script("window.location.href = arguments[0];", url)  # returns before the load
+            tabs[code] = driver.current_window_handle
+        except Exception as e:
+            print(f"    ✗ {code}: could not open tab: {e}")
+    results = {}
+    for code, handle in tabs.items():
+        try:
+            driver.switch_to.window(handle)
+            # a fresh tab reports readyState "complete" for about:blank until its navigation commits
+            WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return location.href") != "about:blank")
+            wait_loaded(driver, timeout)
+            results[code] = {"url": urls[code], **extract_marketplace_page(driver, code, read_page, max_reviews)}
+        except Exception as e:
+            print(f"    ✗ {code}: {e}")
+            results[code] = _failed(urls[code], e)
+        finally:
+            try:
+                driver.close()
+            except:
+                pass
+    driver.switch_to.window(origin)
+    return results
+
+# -------------------- cdp: one tab driver per marketplace --------------------
+def _fetch_cdp(driver, urls: dict, read_page, max_reviews: int, max_parallel: int) -> dict:
+    def fetch(code):
+        tab = driver.new_driver(lightweight=True)
+        try:
+            tab.get(urls[code])
+            return {"url": urls[code], **extract_marketplace_page(tab, code, read_page, max_reviews)}
+        finally:
+            tab.close()
+
+    with ThreadPoolExecutor(max_workers=min(len(urls), max_parallel), thread_name_prefix="marketplace") as pool:
+        futures = {code: pool.submit(fetch, code) for code in urls}
+    results = {}
+    for code, fut in futures.items():
+        try:
+            results[code] = fut.result()
+        except Exception as e:
+            print(f"    ✗ {code}: {e}")
+            results[code] = _failed(urls[code], e)
+    return results
+
+def fetch_marketplaces(driver, asin: str, codes, read_page, wait_loaded, url_template: str = DEFAULT_URL_TEMPLATE,
+                       max_reviews: int = 10, timeout: float = 20, max_parallel: int = 4) -> dict:
+    """
+    {code: result} in the order of codes; a marketplace that fails has empty fields and an "error".
+    max_parallel: pages loading at once (tabs / threads against the one browser).
+    """
+    max_parallel = max(1, max_parallel)
+    urls = {code: marketplace_url(code, asin, url_template) for code in codes}
+    if not urls:
+        return {}
+    print(f"    → Fetching {asin} from {len(urls)} marketplaces: {', '.join(urls)}")
+    if hasattr(driver, "new_driver"):
+        return _fetch_cdp(driver, urls, read_page, max_reviews, max_parallel)
+    return _fetch_in_tabs(driver, urls, read_page, wait_loaded, max_reviews, timeout, max_parallel)
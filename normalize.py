@@ -0,0 +1,110 @@
+# normalize.py
+# Typed post-processing for scraped frames (Amazon products, Amazon reviews, eBay results).
+# All parsing uses vectorized pandas string ops, so it scales to millions of rows:
+#   "$129.99"                                        -> Price_Value=129.99, Price_Currency="USD"
+#   "4.5 out of 5 stars"                             -> Overall_Rating_Value=4.5
+#   "1,234 ratings"                                  -> Number_of_Ratings_Count=1234
+#   "Reviewed in the United States on March 3, 2024" -> Review_Date_Value=2024-03-03, Origin_Country="United States"
+#   "Reviewed in the United Kingdom on 3 March 2024" -> Review_Date_Value=2024-03-03 (day-first marketplaces)
+
+import pandas as pd
+
+# Longest symbols first so "US $" wins over "$"
+CURRENCY_SYMBOLS = {
+    "US $": "USD", "C $": "CAD", "AU $": "AUD", "CA$": "CAD", "A$": "AUD",
+    "$": "USD", "£": "GBP", "€": "EUR", "¥": "JPY", "₩": "KRW", "₹": "INR",
+}
+CURRENCY_CODES = ["USD", "CAD", "AUD", "GBP", "EUR", "JPY", "KRW", "INR", "MXN", "BRL", "CHF", "SEK", "PLN"]
+
+_NUM = r"\d[\d.,\s]*\d|\d"
+
+def _as_str(s: pd.Series) -> pd.Series:
+    return s.astype("string").str.strip()
+
+def parse_number(s: pd.Series) -> pd.Series:
+    """'1,234.56' / '1.234,56' / '15 000' -> Float64 (NA when nothing numeric)."""
+    raw = _as_str(s).str.extract(f"({_NUM})", expand=False).str.replace(r"\s", "", regex=True)
+    # Decimal comma (e.g. '1.234,56' or '12,99') → swap separators
+    decimal_comma = raw.str.contains(r",\d{1,2}$", regex=True, na=False)
+    raw = raw.mask(decimal_comma, raw.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    raw = raw.where(decimal_comma, raw.str.replace(",", "", regex=False))
+    return pd.to_numeric(raw, errors="coerce").astype("Float64")
+
+def parse_currency(s: pd.Series) -> pd.Series:
+    s = _as_str(s)
+    out = pd.Series(pd.NA, index=s.index, dtype="string")
+    for code in CURRENCY_CODES:
+        out = out.mask(out.isna() & s.str.contains(rf"\b{code}\b", regex=True, na=False), code)
+    for sym, code in CURRENCY_SYMBOLS.items():
+        out = out.mask(out.isna() & s.str.contains(sym, regex=False, na=False), code)
+    return out.astype("category")
+
+def parse_price(s: pd.Series) -> pd.DataFrame:
+    """Price text -> (value, max, currency). Ranges like '$12.99 to $19.99' keep both ends."""
+    s = _as_str(s)
+    parts = s.str.split(r"\s+(?:to|-|–)\s+", n=1, expand=True, regex=True)
+    low = parts[0] if 0 in parts else s
+    high = parts[1] if 1 in parts else pd.Series(pd.NA, index=s.index, dtype="string")
+    value = parse_number(low)
+    high_value = parse_number(high).fillna(value)
+    return pd.DataFrame({"value": value, "max": high_value, "currency": parse_currency(s)}, index=s.index)
+
+def parse_rating(s: pd.Series) -> pd.Series:
+    """'4.5 out of 5 stars' / '4,5 von 5 Sternen' -> 4.5 (Float64)."""
+    num = _as_str(s).str.extract(r"(\d+(?:[.,]\d+)?)", expand=False).str.replace(",", ".", regex=False)
+    val = pd.to_numeric(num, errors="coerce").astype("Float64")
+    return val.where(val <= 5)
+
+def parse_count(s: pd.Series) -> pd.Series:
+    """'1,234 ratings' -> 1234 (Int64)."""
+    digits = _as_str(s).str.extract(r"(\d[\d,.\s]*)", expand=False).str.replace(r"[,.\s]", "", regex=True)
+    return pd.to_numeric(digits, errors="coerce").astype("Int64")
+
+def parse_review_date(s: pd.Series) -> pd.DataFrame:
+    """'Reviewed in the United States on March 3, 2024' / '... on 3 March 2024' -> (date, origin_country)."""
+    parts = _as_str(s).str.extract(r"Reviewed in\s+(?:the\s+)?(?P<country>.+?)\s+on\s+(?P<date>.+)$")
+    date_text = parts["date"].fillna(_as_str(s))
+    date = pd.to_datetime(date_text, format="%B %d, %Y", errors="coerce")
+    day_first = pd.to_datetime(date_text[date.isna()], format="%d %B %Y", errors="coerce")
+    date = date.fillna(day_first)
+    return pd.DataFrame({"date": date, "origin_country": parts["country"].astype("string")}, index=s.index)
+
+# -------------------- frame-level stages --------------------
+def normalize_amazon_products(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    df = df.copy()
+    if "Price" in df:  # absent when --fields leaves it out
+        price = parse_price(df["Price"])
+        df["Price_Value"] = price["value"]
+        df["Price_Currency"] = price["currency"]
+    if "Overall_Rating" in df:
+        df["Overall_Rating_Value"] = parse_rating(df["Overall_Rating"])
+    if "Number_of_Ratings" in df:
+        df["Number_of_Ratings_Count"] = parse_count(df["Number_of_Ratings"])
+    if "Foreign_Reviews_Count" in df:
+        df["Foreign_Reviews_Count"] = pd.to_numeric(df["Foreign_Reviews_Count"], errors="coerce").astype("Int64")
+    return df
+
+def normalize_ebay_results(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    df = df.copy()
+    if "Price" in df:
+        price = parse_price(df["Price"])
+        df["Price_Value"] = price["value"]
+        df["Price_Max"] = price["max"]
+        df["Price_Currency"] = price["currency"]
+    return df
+
+def normalize_reviews(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-review frame (Review_Rating, Review_Date, Origin_Country raw text) -> typed columns."""
+    if df.empty:
+        return df
+    df = df.copy()
+    df["Review_Rating_Value"] = parse_rating(df["Review_Rating"])
+    parsed = parse_review_date(df["Review_Date"])
+    df["Review_Date_Value"] = parsed["date"]
+    country = df["Origin_Country"].astype("string").replace("", pd.NA) if "Origin_Country" in df else parsed["origin_country"]
+    df["Origin_Country"] = country.fillna(parsed["origin_country"]).astype("category")
+    return df
@@ -0,0 +1,122 @@
+# page_archive.py
+# Raw page archive: every page the scrapers load is saved (page_source) so it can be re-parsed
+# offline with page_parser.py after a selector fix, without crawling again.
+#
+#   archive = PageArchive("Products/archive", site="amazon")      # zstd if installed, else gzip
+#   driver = ArchivingDriver(driver, archive)                      # wait_for_page_load() snapshots
+#   ...
+#   archive.close()
+#
+#   for rec in read_archive("Products/archive/amazon_20250301_101500.pages.zst"):
+#       rec["url"], rec["ts"], rec["html"]
+#
+# File format: one compressed frame (zstd) or gzip member per page, each holding one JSON line
+# {"url", "site", "ts", "html"}. Frames are independent, so a crash loses at most the last page
+# and both `zstd -dc` and `zcat` read the file as plain JSON Lines.
+
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+CODECS = {"zstd": ".pages.zst", "gzip": ".pages.gz"}
+
+def default_codec() -> str:
+    return "zstd" if importlib.util.find_spec("zstandard") else "gzip"
+
+class PageArchive:
+    def __init__(self, archive_dir, site: str, codec: str = "auto", level: int | None = None):
+        self.codec = default_codec() if codec == "auto" else codec
+        self.level = level or 6
+        if self.codec == "zstd":
+            import zstandard
+            self._zstd = zstandard.ZstdCompressor(level=self.level)
+        self.path = Path(archive_dir) / f"{site}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{CODECS[self.codec]}"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.site = site
+        self._file = open(self.path, "ab")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archive")  # keeps page order
+        self._lock = threading.Lock()
+        self._seen: set[str] = set()
+        self.pages = 0
+        self.raw_bytes = 0
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return self._zstd.compress(data)
+        return gzip.compress(data, compresslevel=self.level)
+
+    def _write(self, rec: dict):
+        data = (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+        frame = self._compress(data)
+        self._file.write(frame)
+        self._file.flush()
+        self.raw_bytes += len(data)
+
+    def add(self, url: str, html: str) -> bool:
+        """Queue one page (compressed and written off the browser thread). Exact repeats are skipped."""
+        if not html or not url or url.startswith(("about:", "data:", "chrome")):
+            return False
+        digest = hashlib.sha1(html.encode("utf-8", "replace")).hexdigest()
+        with self._lock:
+            if digest in self._seen:
+                return False
+            self._seen.add(digest)
+            self.pages += 1
+        self._writer.submit(self._write, {"url": url, "site": self.site, "ts": time.time(), "html": html})
+        return True
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        self._file.close()
+        size = self.path.stat().st_size
+        ratio = self.raw_bytes / size if size else 0
+        print(f"Archived {self.pages} pages to {self.path} ({size / 1e6:.1f} MB, {ratio:.1f}x compression)")
+
+def read_archive(path):
+    """Yield the page records of one archive file; a truncated last frame is ignored."""
+    path = Path(path)
+    if path.name.endswith(CODECS["zstd"]):
+        import zstandard
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+    else:
+        raw = gzip.open(path, "rb")
+    with io.TextIOWrapper(io.BufferedReader(raw), encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, OSError, ValueError) as e:  # interrupted run: keep what was complete
+            print(f"  ✗ {path.name}: stopped at a damaged frame ({e})")
+
+class ArchivingDriver:
+    """Proxy that gives scrapers an archive_page() hook; they call it once a page has loaded."""
+
+    def __init__(self, driver, archive: PageArchive):
+        self.driver = driver
+        self.archive = archive
+
+    def __getattr__(self, name):
+        driver = self.__dict__.get("driver")
+        if driver is None:
+            raise AttributeError(name)
+        return getattr(driver, name)
+
+    def archive_page(self):
+        try:
+            self.archive.add(self.driver.current_url, self.driver.page_source)
+        except Exception as e:
+            print(f"    ✗ Could not archive page: {e}")
+
+if __name__ == "__main__":
+    import sys
+    for p in sys.argv[1:]:
+        n = sum(1 for _ in read_archive(p))
+        print(f"{p}: {n} pages ({os.path.getsize(p) / 1e6:.1f} MB)")
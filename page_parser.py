@@ -0,0 +1,246 @@
+# page_parser.py
+# Offline parser for page_archive.py archives: the live extractors re-done on lxml, so a month of
+# archived pages can be re-parsed in minutes (no browser) after a selector fix.
+#
+#   python page_parser.py "Products/archive/*.pages.*" --processes 8 --out_dir Products/reparsed
+#   python page_parser.py Products/archive/amazon_20250301_101500.pages.zst --out_format parquet
+#
+# Tables (one file each in --out_dir, rows carry Page_URL / Fetched_At):
+#   amazon_tiles      search pages          fields of get_product_info_from_element()
+#   amazon_reviews    /product-reviews,     fields of scrape_full_reviews_from_reviews_page()
+#                     /global-reviews       (foreign: Origin_Country from the date line)
+#   amazon_warranty   /dp/ product pages    fields of scrape_warranty_support()
+#   ebay_results      /sch/ search pages    fields of scrape_results_basic()
+#
+# The selector lists are imported from the scrapers, so a fix there applies here too. Text is
+# lxml text_content() with whitespace collapsed (the live scrape gets the browser's rendered text).
+# Archive files are parsed in parallel, one file per worker process.
+
+import argparse
+import glob
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urljoin
+
+import Selenium_Amazon as amz
+import Selenium_eBay as ebay
+from page_archive import read_archive
+
+TABLES = ["amazon_tiles", "amazon_reviews", "amazon_warranty", "ebay_results"]
+
+# -------------------- lxml helpers --------------------
+@lru_cache(maxsize=None)
+def compile_selector(selector: str):
+    """XPath for '//' / './/' selectors, CSS (via cssselect) for the rest; relative to the context node."""
+    from lxml import etree
+    if selector.startswith(("//", ".//")):
+        return etree.XPath(selector)
+    from cssselect import GenericTranslator
+    return etree.XPath(GenericTranslator().css_to_xpath(selector, prefix="descendant::"))
+
+def find_all(node, selector: str) -> list:
+    try:
+        return compile_selector(selector)(node)
+    except Exception:
+        return []
+
+def find_first(node, selectors, accept=lambda text: bool(text)):
+    """First match of each selector in turn (like find_element); the first whose text passes accept."""
+    for sel in selectors:
+        hits = find_all(node, sel)
+        if hits:
+            text = text_of(hits[0])
+            if accept(text):
+                return text
+    return ""
+
+def text_of(el) -> str:
+    return " ".join(el.text_content().split())
+
+# -------------------- amazon --------------------
+def parse_amazon_tiles(doc, url: str) -> list[dict]:
+    tiles = []
+    for sel in amz.TILE_SELECTORS:
+        tiles = find_all(doc, sel)
+        if tiles:
+            break
+    rows = []
+    for tile in tiles:
+        asin = (tile.get("data-asin") or "").strip()
+        if not asin:
+            continue
+        title = find_first(tile, amz.TILE_TITLE_SELECTORS,
+                           lambda t: len(t) > 10 and not t.lower().startswith("sponsored"))
+        link = ""
+        for sel in amz.TILE_URL_SELECTORS:
+            sel = sel.format(asin=asin) if "{asin}" in sel else sel
+            hits = find_all(tile, sel)
+            href = urljoin(url, hits[0].get("href") or "") if hits and hits[0].get("href") else ""
+            if "/dp/" in href or "/gp/" in href:
+                link = href
+                break
+        price = find_first(tile, amz.TILE_PRICE_SELECTORS, lambda t: "$" in t)
+        image_url = ""
+        for sel in amz.TILE_IMAGE_SELECTORS:
+            hits = find_all(tile, sel)
+            src = urljoin(url, hits[0].get("src") or "") if hits and hits[0].get("src") else ""
+            if src.startswith("http"):
+                image_url = src
+                break
+        if title and link:
+            rows.append({"ASIN": asin, "Title": title, "Price": price or "Price not available", "URL": link,
+                         "Image_URL": image_url})
+    return rows
+
+def parse_amazon_reviews(doc, url: str) -> list[dict]:
+    foreign = "/global-reviews/" in url
+    blocks = []
+    for sel in amz.REVIEW_BLOCK_XPATHS:
+        blocks = find_all(doc, sel)
+        if blocks:
+            break
+    reviews = []
+    for b in blocks:
+        rv = {field: find_first(b, xps) for field, xps in amz.REVIEW_FIELD_XPATHS.items()}
+        if rv["review_text"]:
+            rv["origin_country"] = amz.parse_country_from_date(rv["review_date"]) if foreign else ""
+            reviews.append(rv)
+    rows = amz.review_rows(reviews, amz.get_asin_from_url(url) or "", 0, "foreign" if foreign else "domestic")
+    return [{k: v for k, v in r.items() if k != "Product_Number"} for r in rows]
+
+def parse_amazon_warranty(doc, url: str) -> list[dict]:
+    heading = find_first(doc, amz.WARRANTY_HEADING_XPATHS)
+    body = find_first(doc, amz.WARRANTY_BODY_XPATHS, lambda t: len(t) > 5)
+    return [{"ASIN": amz.get_asin_from_url(url) or "", "Warranty_Heading": heading or "Not found",
+             "Warranty_Text": body or "Not found"}]
+
+# -------------------- ebay --------------------
+def parse_ebay_results(doc, url: str) -> list[dict]:
+    cards = []
+    for sel in ebay.CARD_SELECTORS:
+        cards = find_all(doc, sel)
+        if cards:
+            break
+    rows = []
+    for card in cards:
+        link = next((hits[0] for sel in ebay.CARD_LINK_SELECTORS if (hits := find_all(card, sel))), None)
+        if link is None:
+            continue
+        title_els = find_all(card, ebay.CARD_TITLE_SELECTOR)
+        title = text_of(title_els[0] if title_els else link)
+        if not title:
+            continue
+        price = find_first(card, ebay.CARD_PRICE_SELECTORS)
+        image_url = ""
+        for sel in ebay.CARD_IMAGE_SELECTORS:
+            hits = find_all(card, sel)
+            if hits:
+                src = urljoin(url, hits[0].get("src") or hits[0].get("data-src") or "")
+                if src.startswith("http") and not src.endswith(".gif"):
+                    image_url = src
+                    break
+        rows.append({"Title": title, "Price": price, "URL": ebay.force_english_url(urljoin(url, link.get("href") or "")),
+                     "Image_URL": image_url})
+    return rows
+
+# -------------------- dispatch --------------------
+def classify(url: str) -> str | None:
+    if "amazon." in url:
+        if "/product-reviews/" in url or "/global-reviews/" in url:
+            return "amazon_reviews"
+        if "/dp/" in url or "/gp/product/" in url:
+            return "amazon_warranty"
+        if "/s?" in url or "/s/" in url:
+            return "amazon_tiles"
+    elif "ebay." in url and "/sch/" in url:
+        return "ebay_results"
+    return None
+
+PARSERS = {"amazon_tiles": parse_amazon_tiles, "amazon_reviews": parse_amazon_reviews,
+           "amazon_warranty": parse_amazon_warranty, "ebay_results": parse_ebay_results}
+
+def parse_record(rec: dict) -> tuple[str | None, list[dict]]:
+    import lxml.html
+    table = classify(rec.get("url", ""))
+    if not table:
+        return None, []
+    doc = lxml.html.document_fromstring(rec["html"])
+    fetched = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(rec.get("ts", 0)))
+    return table, [{**row, "Page_URL": rec["url"], "Fetched_At": fetched} for row in PARSERS[table](doc, rec["url"])]
+
+def parse_archive(path: str) -> dict:
+    """Worker: every page of one archive file -> {table: rows, "_pages": n, "_skipped": n}."""
+    out = {t: [] for t in TABLES}
+    out["_pages"] = out["_skipped"] = 0
+    for rec in read_archive(path):
+        out["_pages"] += 1
+        try:
+            table, rows = parse_record(rec)
+        except Exception as e:
+            print(f"  ✗ {rec.get('url', '')[:80]}: {e}")
+            table, rows = None, []
+        if table is None:
+            out["_skipped"] += 1
+            continue
+        out[table].extend(rows)
+    return out
+
+def parse_archives(paths: list[str], processes: int = 4) -> dict:
+    tables = {t: [] for t in TABLES}
+    pages = skipped = 0
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {pool.submit(parse_archive, p): p for p in paths}
+        for fut in as_completed(futures):
+            try:
+                res = fut.result()
+            except Exception as e:
+                print(f"  ✗ {futures[fut]}: {e}")
+                continue
+            pages += res.pop("_pages")
+            skipped += res.pop("_skipped")
+            for t, rows in res.items():
+                tables[t].extend(rows)
+            print(f"  ✓ {Path(futures[fut]).name}: " + ", ".join(f"{t}={len(r)}" for t, r in res.items() if r))
+    print(f"Parsed {pages} pages ({skipped} not handled)")
+    return tables
+
+# -------------------- CLI --------------------
+def save_table(rows: list[dict], path: Path, out_format: str) -> Path:
+    path = path.with_suffix(f".{out_format}")
+    if out_format == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    else:
+        import pandas as pd
+        df = pd.DataFrame(rows).fillna("")
+        if out_format == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+    return path
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Re-parse archived pages (page_archive.py) without a browser.")
+    p.add_argument("archives", nargs="+", help="Archive files or globs (*.pages.zst / *.pages.gz)")
+    p.add_argument("--processes", type=int, default=4)
+    p.add_argument("--out_dir", default="Products/reparsed")
+    p.add_argument("--out_format", choices=["csv", "parquet", "jsonl"], default="csv")
+    return p.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    paths = sorted({f for pat in args.archives for f in (glob.glob(pat) or [pat]) if Path(f).exists()})
+    if not paths:
+        raise SystemExit("No archive files found")
+    t0 = time.perf_counter()
+    tables = parse_archives(paths, args.processes)
+    out_dir = amz.ensure_dir(Path(args.out_dir))
+    stamp = amz.timestamp()
+    for table, rows in tables.items():
+        if rows:
+            print(f"Saved {len(rows)} rows to {save_table(rows, out_dir / f'{table}_{stamp}', args.out_format)}")
+    print(f"Done in {time.perf_counter() - t0:.1f}s")
@@ -0,0 +1,150 @@
+# page_prefetch.py
+# Speculative prefetch for --prefetch_depth: the next product pages start loading in background tabs
+# while the current one is extracted, and get() of a prefetched URL switches to its tab instead of
+# navigating, so the navigation latency is (mostly) already paid.
+#
+#   driver = PrefetchingDriver(driver, depth=2)
+#   for i, url in enumerate(urls):
+#       driver.prefetch(urls[i + 1:])    # opens tabs for the next ones (at most `depth` open)
+#       driver.get(url)                  # hit: switch to the loaded tab; miss: normal navigation
+#       ...
+#   driver.finish_prefetch()             # closes unused tabs, prints the hit rate
+#
+# Tabs:
+#   selenium  switch_to.new_window("tab") + a non-blocking location change, then back to the working tab;
+#             on a hit the working tab is closed and the prefetched one becomes the working tab
+#   cdp       another CDPDriver tab on the same connection (cdp_backend new_driver(), which sets it up
+#             like the working tab: lightweight image blocking, performance_log network events);
+#             on a hit it replaces the wrapped driver and the old tab is closed
+#
+# A hit is a page visit that never reaches the wrapped driver's get(); a SupervisedDriver underneath
+# is told through its count_navigation() hook, so --recycle_after_navs counts it, and every get() first
+# lets it recycle through maybe_recycle(), so a run of hits cannot outlive the thresholds. A recycle
+# closes the prefetched tabs with the old session: the next get() of one of them is a miss and navigates.
+# Like the other driver proxies (MeteredDriver, ArchivingDriver) everything else is delegated, so it
+# can sit under them; scrapers find the hooks with getattr(driver, "prefetch", None).
+
+import time
+
+class PrefetchingDriver:
+    def __init__(self, driver, depth: int = 2, timeout: float = 30):
+        self.driver = driver
+        self.depth = depth
+        self.timeout = timeout
+        self._tabs = {}  # url -> window handle (selenium) or CDPDriver (cdp), in prefetch order
+        self._expected = set()  # prefetched URLs not visited yet: their first get() is a hit or a miss
+        self.hits = 0
+        self.ready_hits = 0  # hits whose page had finished loading before it was needed
+        self.misses = 0
+        if callable(getattr(type(driver), "new_driver", None)):  # the CDPDriver itself, not a proxy over one
+            self.mode = "cdp"
+        elif hasattr(driver, "switch_to"):
+            self.mode = "tabs"
+        else:
+            self.mode = None
+            print("✗ Prefetch needs window switching (selenium) or an unwrapped CDPDriver; prefetch disabled")
+
+    def __getattr__(self, name):
+        driver = self.__dict__.get("driver")
+        if driver is None:
+            raise AttributeError(name)
+        return getattr(driver, name)
+
+    # -------------------- background tabs --------------------
+    def prefetch(self, urls):
+        """Start loading the first of urls that are not open yet, keeping at most `depth` tabs open."""
+        todo = [u for u in urls if u and u not in self._tabs][: max(0, self.depth - len(self._tabs))]
+        if not todo or not self.mode:
+            return
+        self._expected.update(todo)
+        if self.mode == "cdp":
+            for url in todo:
+                try:
+                    tab = self.driver.new_driver()
+                    tab.execute_script("window.location.href = arguments[0];", url)  # returns before the load
+                    self._tabs[url] = tab
+                except Exception as e:
+                    print(f"    ✗ Prefetch failed: {e}")
+                    return
+            return
+        home = self.driver.current_window_handle
+        try:
+            for url in todo:
+                self.driver.switch_to.new_window("tab")
+                self.driver.execute_script("window.location.href = arguments[0];", url)
+                self._tabs[url] = self.driver.current_window_handle
+        except Exception as e:
+            print(f"    ✗ Prefetch failed: {e}")
+        finally:
+            self.driver.switch_to.window(home)
+
+    def _ready_state(self) -> str:
+        """readyState of the working tab once its navigation has committed ("" while still on about:blank)."""
+        state = self.driver.execute_script("return location.href === 'about:blank' ? '' : document.readyState")
+        return state or ""
+
+    def _wait_loaded(self) -> bool:
+        """Block like a normal get() until the page has loaded; True if it already had."""
+        deadline = time.monotonic() + self.timeout
+        state = self._ready_state()
+        ready = state == "complete"
+        while state != "complete" and time.monotonic() < deadline:
+            time.sleep(0.1)
+            state = self._ready_state()
+        return ready
+
+    def _switch_to(self, tab):
+        if self.mode == "cdp":
+            old, self.driver = self.driver, tab
+            old.close()
+        else:
+            if tab not in self.driver.window_handles:  # gone with a recycled session: keep the working tab
+                raise LookupError("window closed")
+            self.driver.close()  # the working tab; the prefetched one takes its place
+            self.driver.switch_to.window(tab)
+
+    def get(self, url):
+        maybe_recycle = getattr(self.driver, "maybe_recycle", None)  # session_supervisor.SupervisedDriver
+        if maybe_recycle and maybe_recycle():
+            self._tabs.clear()  # closed with the old session
+        tab = self._tabs.pop(url, None)
+        expected = url in self._expected
+        self._expected.discard(url)  # later visits of the same page (e.g. back from its reviews) are plain gets
+        if tab is None:
+            if expected:
+                self.misses += 1
+            return self.driver.get(url)
+        try:
+            self._switch_to(tab)
+        except Exception as e:  # e.g. the session was recycled and the handle is gone
+            print(f"    ✗ Prefetched tab unavailable ({e}); navigating")
+            self._tabs.clear()
+            self.misses += 1
+            return self.driver.get(url)
+        self.hits += 1
+        self.ready_hits += self._wait_loaded()
+        count_navigation = getattr(self.driver, "count_navigation", None)  # session_supervisor.SupervisedDriver
+        if count_navigation:
+            count_navigation()
+
+    def finish_prefetch(self) -> dict:
+        """Close the tabs that were never used and print the hit rate."""
+        for tab in self._tabs.values():
+            try:
+                if self.mode == "cdp":
+                    tab.close()
+                else:
+                    home = self.driver.current_window_handle
+                    self.driver.switch_to.window(tab)
+                    self.driver.close()
+                    self.driver.switch_to.window(home)
+            except Exception:
+                pass
+        self._tabs.clear()
+        total = self.hits + self.misses
+        stats = {"hits": self.hits, "ready_hits": self.ready_hits, "misses": self.misses,
+                 "hit_rate": self.hits / total if total else 0.0}
+        if total:
+            print(f"Prefetch (depth {self.depth}): {self.hits}/{total} prefetched pages served from background tabs "
+                  f"({stats['hit_rate']:.0%} hit rate, {self.ready_hits} fully loaded on arrival)")
+        return stats
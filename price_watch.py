@@ -0,0 +1,195 @@
+# price_watch.py
+# Cheap re-check of known products: one lightweight page visit + one execute_script per item.
+#
+#   python price_watch.py --asins B0C1234567,B0D7654321
+#   python price_watch.py --items_file watchlist.txt --state watch_state.db --out_dir Products
+#
+# watchlist.txt: one ASIN, Amazon product URL or eBay item URL per line.
+# Only price, availability, rating and rating count are read (no share link, warranty or
+# review pages), then diffed against the last stored values; only changes are emitted
+# (printed and written to Products/price_changes_<YYYYmmdd_HHMMSS>.csv).
+
+import argparse
+import csv
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import Selenium_Amazon as amz
+from Selenium_eBay import force_english_url
+
+WATCH_FIELDS = ["price", "availability", "rating", "rating_count"]
+
+# Everything a price check needs in one round trip. JSON-LD first (eBay item pages, some
+# Amazon pages), then the usual DOM spots for each site.
+WATCH_JS = r"""
+const txt = (sel) => { const el = document.querySelector(sel);
+  return el ? (el.textContent || '').replace(/\s+/g, ' ').trim() : ''; };
+const attr = (sel, a) => { const el = document.querySelector(sel); return el ? (el.getAttribute(a) || '') : ''; };
+const out = {title: '', price: '', availability: '', rating: '', rating_count: '',
+             blocked: !!document.querySelector('form[action*="validateCaptcha"]')};
+for (const s of document.querySelectorAll('script[type="application/ld+json"]')) {
+  let data; try { data = JSON.parse(s.textContent); } catch (e) { continue; }
+  for (const d of [].concat(data, (data && data['@graph']) || [])) {
+    if (!d || !String(d['@type'] || '').includes('Product')) continue;
+    const offer = [].concat(d.offers || [])[0] || {};
+    out.title = out.title || d.name || '';
+    out.price = out.price || (offer.price ? `${offer.priceCurrency || ''} ${offer.price}`.trim() : '');
+    out.availability = out.availability || String(offer.availability || '').replace(/^https?:\/\/schema.org\//, '');
+    const agg = d.aggregateRating || {};
+    out.rating = out.rating || String(agg.ratingValue || '');
+    out.rating_count = out.rating_count || String(agg.reviewCount || agg.ratingCount || '');
+  }
+}
+out.title = out.title || txt('#productTitle') || txt('h1.x-item-title__mainTitle');
+out.price = out.price || txt('#corePrice_feature_div .a-offscreen') || txt('#corePriceDisplay_desktop_feature_div .a-offscreen')
+  || txt('.a-price .a-offscreen') || txt('#priceblock_ourprice') || txt('.x-price-primary') || txt('.x-bin-price');
+out.availability = out.availability || txt('#availability') || txt('#outOfStock') || txt('.d-quantity__availability')
+  || txt('#qtySubTxt');
+out.rating = out.rating || attr('#acrPopover', 'title') || txt('#acrPopover .a-icon-alt') || txt('.x-star-rating .clipped');
+out.rating_count = out.rating_count || txt('#acrCustomerReviewText') || txt('.x-star-rating + span');
+return out;
+"""
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watch_state (
+    item_key TEXT PRIMARY KEY, site TEXT, url TEXT, title TEXT,
+    price TEXT, price_value REAL, availability TEXT, rating TEXT, rating_count TEXT,
+    checked_at TEXT, changed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS watch_changes (
+    item_key TEXT, field TEXT, old TEXT, new TEXT, checked_at TEXT
+);
+CREATE INDEX IF NOT EXISTS watch_changes_item ON watch_changes(item_key, checked_at);
+"""
+
+# -------------------- items --------------------
+def parse_item(line: str) -> dict | None:
+    line = (line or "").strip()
+    if not line or line.startswith("#"):
+        return None
+    if re.fullmatch(r"[A-Z0-9]{10}", line):
+        return {"key": f"amazon:{line}", "site": "amazon", "url": f"https://www.amazon.com/dp/{line}"}
+    if "ebay." in line:
+        m = re.search(r"/itm/(?:[^/]+/)?(\d{9,15})", line)
+        key = m.group(1) if m else line
+        return {"key": f"ebay:{key}", "site": "ebay", "url": force_english_url(line)}
+    asin = amz.get_asin_from_url(line)
+    if asin:
+        return {"key": f"amazon:{asin}", "site": "amazon", "url": f"https://www.amazon.com/dp/{asin}"}
+    print(f"  ✗ Skipping unrecognized watch item: {line}")
+    return None
+
+def price_value(text: str) -> float | None:
+    m = re.search(r"\d[\d,]*(?:\.\d+)?", text or "")
+    return float(m.group(0).replace(",", "")) if m else None
+
+def normalize_observation(raw: dict) -> dict:
+    obs = {k: re.sub(r"\s+", " ", str(raw.get(k) or "")).strip() for k in ["title", *WATCH_FIELDS]}
+    m = re.search(r"\d+(?:\.\d+)?", obs["rating"])
+    obs["rating"] = m.group(0) if m else ""
+    obs["rating_count"] = re.sub(r"[^\d]", "", obs["rating_count"])
+    obs["price_value"] = price_value(obs["price"])
+    return obs
+
+# -------------------- check + diff --------------------
+def check_item(driver, item: dict) -> dict | None:
+    """None when the check failed (load/extract error, block page, or nothing product-like on the page)."""
+    try:
+        driver.get(item["url"])
+        raw = driver.execute_script(WATCH_JS) or {}
+    except Exception as e:
+        print(f"  ✗ {item['key']}: check failed: {e}")
+        return None
+    if raw.get("blocked"):
+        print(f"  ✗ {item['key']}: captcha/block page")
+        return None
+    obs = normalize_observation(raw)
+    if not obs["title"] and not obs["price"]:  # error / "dog" page: not a reading of the product
+        print(f"  ✗ {item['key']}: no title or price on the page; state left unchanged")
+        return None
+    return obs
+
+def diff_and_store(conn, item: dict, obs: dict, now: str) -> list[dict]:
+    prev = conn.execute(
+        "SELECT price, price_value, availability, rating, rating_count FROM watch_state WHERE item_key=?",
+        (item["key"],)).fetchone()
+    changes = []
+    if prev is None:
+        changes = [{"field": "new", "old": "", "new": obs["price"]}]
+    else:
+        old = dict(zip(["price", "price_value", "availability", "rating", "rating_count"], prev))
+        for f in WATCH_FIELDS:
+            if f == "price":
+                same = (old["price_value"] == obs["price_value"]) if obs["price_value"] is not None else old["price"] == obs["price"]
+            else:
+                same = (old[f] or "") == obs[f]
+            if not same and (obs[f] or old[f]):
+                changes.append({"field": f, "old": old[f] or "", "new": obs[f]})
+    conn.execute(
+        "INSERT INTO watch_state(item_key, site, url, title, price, price_value, availability, rating, rating_count, "
+        "checked_at, changed_at) VALUES (?,?,?,?,?,?,?,?,?,?,?) "
+        "ON CONFLICT(item_key) DO UPDATE SET url=excluded.url, title=COALESCE(NULLIF(excluded.title,''), title), "
+        "price=excluded.price, price_value=excluded.price_value, availability=excluded.availability, "
+        "rating=excluded.rating, rating_count=excluded.rating_count, checked_at=excluded.checked_at, "
+        "changed_at=CASE WHEN ? THEN excluded.checked_at ELSE changed_at END",
+        (item["key"], item["site"], item["url"], obs["title"], obs["price"], obs["price_value"], obs["availability"],
+         obs["rating"], obs["rating_count"], now, now, bool(changes)))
+    conn.executemany("INSERT INTO watch_changes VALUES (?,?,?,?,?)",
+                     [(item["key"], c["field"], str(c["old"]), str(c["new"]), now) for c in changes])
+    return [{"Item": item["key"], "URL": item["url"], "Title": obs["title"], "Field": c["field"],
+             "Old": c["old"], "New": c["new"], "Checked_At": now} for c in changes]
+
+def run_watch(driver, items: list[dict], state_path: str) -> list[dict]:
+    conn = sqlite3.connect(state_path)
+    conn.executescript(STATE_SCHEMA)
+    all_changes = []
+    for i, item in enumerate(items, 1):
+        now = datetime.now().isoformat(timespec="seconds")
+        obs = check_item(driver, item)
+        if obs is None:
+            continue
+        changes = diff_and_store(conn, item, obs, now)
+        conn.commit()
+        for c in changes:
+            print(f"  Δ [{i}/{len(items)}] {c['Item']} {c['Field']}: {c['Old']!s} → {c['New']!s}")
+        all_changes.extend(changes)
+    conn.close()
+    return all_changes
+
+def save_changes(changes: list[dict], out_dir: Path) -> Path:
+    amz.ensure_dir(out_dir)
+    path = out_dir / f"price_changes_{amz.timestamp()}.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=["Item", "URL", "Title", "Field", "Old", "New", "Checked_At"])
+        w.writeheader()
+        w.writerows(changes)
+    print(f"\nSaved {len(changes)} changes to: {path}")
+    return path
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Price watch: cheap re-check of known ASINs / eBay items with change detection.")
+    p.add_argument("--asins", default="", help="Comma-separated ASINs")
+    p.add_argument("--items_file", default=None, help="One ASIN / Amazon URL / eBay item URL per line")
+    p.add_argument("--state", default="watch_state.db", help="SQLite file with the last seen values")
+    p.add_argument("--executor_url", default="http://127.0.0.1:9515")
+    p.add_argument("--chrome_binary", default=None)
+    p.add_argument("--out_dir", default="Products")
+    return p.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    lines = [a for a in args.asins.split(",") if a.strip()]
+    if args.items_file:
+        lines += Path(args.items_file).read_text(encoding="utf-8").splitlines()
+    items = [it for it in (parse_item(x) for x in lines) if it]
+    if not items:
+        raise SystemExit("Nothing to watch (use --asins or --items_file)")
+    print(f"Checking {len(items)} items...")
+    driver = amz.build_driver(args.executor_url, args.chrome_binary, lightweight=True)
+    changes = run_watch(driver, items, args.state)
+    if changes:
+        save_changes(changes, Path(args.out_dir))
+    else:
+        print("\nNo changes since last check.")
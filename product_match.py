@@ -0,0 +1,259 @@
+# product_match.py
+# Match Amazon products to eBay listings across saved runs (MinHash + LSH, near-linear).
+#
+#   python product_match.py                                   # every table in Products/
+#   python product_match.py --inputs "Products/usb_hub_*.csv" "Products/ebay_*.parquet" --min_score 0.7
+#
+# Amazon tables are recognised by their ASIN column, eBay tables by Title/URL with /itm/ links;
+# *_reviews, price_changes_* and earlier matches_* files are skipped. Listings seen in several
+# runs are de-duplicated (ASIN / eBay item id, newest file wins).
+#
+# Pipeline: normalize titles -> token + bigram shingles -> 64-permutation MinHash signatures
+# (numpy, chunked) -> 16 bands x 4 rows LSH buckets (Amazon side indexed, eBay side probed)
+# -> candidate pairs scored by token Jaccard, model-number agreement and price ratio.
+# Output: Products/matches_<YYYYmmdd_HHMMSS>.csv with ASIN <-> eBay item and Confidence.
+
+import argparse
+import glob
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from pathlib import Path
+
+from Selenium_Amazon import ensure_dir, timestamp
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "for", "with", "of", "to", "in", "on", "by", "at", "from", "new", "brand",
+    "free", "shipping", "fast", "ship", "sale", "hot", "best", "genuine", "original", "authentic", "oem",
+    "lot", "item", "w", "compatible", "version", "edition", "latest", "upgraded", "2023", "2024", "2025",
+}
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+_UNITS = re.compile(r"\b(\d+(?:\.\d+)?)\s+(tb|gb|mb|mah|w|v|hz|khz|inch|in|mm|cm|m|ft|oz|lb|lbs|pack|pcs|pc|ct|count|x)\b")
+_MODEL = re.compile(r"(?=.*\d)(?=.*[a-z])[a-z0-9.\-]{4,}")
+_MEASURE = re.compile(r"\d+(?:\.\d+)?(?:tb|gb|mb|mah|w|v|hz|khz|inch|in|mm|cm|m|ft|oz|lb|lbs|pack|pcs|pc|ct|count|x|k|p)|\d+in\d+")
+_N_IN_1 = re.compile(r"\b(\d+)\s*-?\s*in\s*-?\s*(\d+)\b")  # "7-in-1" / "7 in 1" -> "7in1" (not 7 inches)
+
+PRIME = 4294967311  # > 2**32, so crc32 shingles hash uniformly; a*h + b stays inside uint64
+
+# -------------------- titles --------------------
+def normalize_title(title: str) -> str:
+    t = unicodedata.normalize("NFKD", str(title or "")).encode("ascii", "ignore").decode("ascii").lower()
+    t = t.replace("&", " and ").replace("+", " plus ")
+    t = _N_IN_1.sub(r"\1in\2", t)
+    t = _UNITS.sub(r"\1\2", t)
+    return " ".join(_TOKEN.findall(t))
+
+def title_words(title: str) -> list[str]:
+    """Normalized words with hyphenated ones split ("usb-c" / "usb c", "7-in-1" / "7 in 1" agree);
+    a hyphenated model number ("sdssde61-1t00") is also kept whole."""
+    words = []
+    for w in normalize_title(title).split():
+        if "-" in w:
+            words += [p for p in w.split("-") if p and p not in STOPWORDS]
+            if model_tokens([w]):
+                words.append(w)
+        elif w not in STOPWORDS:
+            words.append(w)
+    return words
+
+def title_features(title: str) -> tuple[frozenset, list[int]]:
+    """(token set for scoring, crc32 shingles for MinHash: tokens + adjacent bigrams)."""
+    words = title_words(title)
+    shingles = set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+    return frozenset(words), [zlib.crc32(s.encode()) for s in shingles]
+
+# -------------------- MinHash / LSH --------------------
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 7):
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        self.np = np
+        self.num_perm = num_perm
+        self.a = rng.integers(1, 2**31, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2**31, num_perm, dtype=np.uint64)
+
+    def signatures(self, shingle_lists: list[list[int]], chunk: int = 4000):
+        """One (num_perm,) uint32 signature per listing; listings without shingles get None."""
+        np = self.np
+        out = [None] * len(shingle_lists)
+        for start in range(0, len(shingle_lists), chunk):
+            block = [(i, s) for i, s in enumerate(shingle_lists[start:start + chunk], start) if s]
+            if not block:
+                continue
+            lengths = np.array([len(s) for _, s in block])
+            flat = np.fromiter((h for _, s in block for h in s), dtype=np.uint64, count=int(lengths.sum()))
+            hashed = (flat[:, None] * self.a + self.b) % np.uint64(PRIME)
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            mins = np.minimum.reduceat(hashed, offsets, axis=0).astype(np.uint32)
+            for (i, _), sig in zip(block, mins):
+                out[i] = sig
+        return out
+
+class LSHIndex:
+    def __init__(self, bands: int = 16, rows: int = 4, max_bucket: int = 500):
+        self.bands, self.rows, self.max_bucket = bands, rows, max_bucket
+        self.buckets: dict[tuple, list[int]] = defaultdict(list)
+
+    def _keys(self, sig):
+        for b in range(self.bands):
+            yield b, sig[b * self.rows:(b + 1) * self.rows].tobytes()
+
+    def add(self, item_id: int, sig):
+        for key in self._keys(sig):
+            self.buckets[key].append(item_id)
+
+    def candidates(self, sig) -> set[int]:
+        out: set[int] = set()
+        for key in self._keys(sig):
+            ids = self.buckets.get(key)
+            if ids and len(ids) <= self.max_bucket:  # giant buckets are generic titles, not matches
+                out.update(ids)
+        return out
+
+# -------------------- scoring --------------------
+def model_tokens(tokens) -> set:
+    """Letter+digit tokens that look like model numbers ("a2337", "sdssde61-1t00"), not sizes ("1tb", "4k")."""
+    return {t for t in tokens if _MODEL.fullmatch(t) and not _MEASURE.fullmatch(t)}
+
+def score_pair(a: dict, e: dict) -> dict:
+    ta, te = a["tokens"], e["tokens"]
+    title_sim = len(ta & te) / len(ta | te) if ta and te else 0.0
+    ma, me = model_tokens(ta), model_tokens(te)
+    if ma and me:
+        # shared model number is strong evidence; two different model numbers almost never match
+        title_sim = min(1.0, title_sim + 0.15) if ma & me else max(0.0, title_sim - 0.35)
+    price_ratio = None
+    if a["price"] and e["price"] and (not a["currency"] or not e["currency"] or a["currency"] == e["currency"]):
+        price_ratio = min(a["price"], e["price"]) / max(a["price"], e["price"])
+    confidence = title_sim if price_ratio is None else 0.7 * title_sim + 0.3 * price_ratio
+    return {"Title_Similarity": round(title_sim, 4),
+            "Price_Ratio": round(price_ratio, 4) if price_ratio is not None else None,
+            "Confidence": round(confidence, 4)}
+
+def match_listings(amazon: list[dict], ebay: list[dict], min_score: float = 0.6, top_k: int = 1,
+                   num_perm: int = 64, bands: int = 16) -> list[dict]:
+    """Listings: dicts with key, title, price (float|None), currency, url. Returns joined match rows."""
+    for lst in (amazon, ebay):
+        for x in lst:
+            x["tokens"], x["shingles"] = title_features(x["title"])
+    hasher = MinHasher(num_perm)
+    index = LSHIndex(bands=bands, rows=num_perm // bands)
+    for i, sig in enumerate(hasher.signatures([a["shingles"] for a in amazon])):
+        if sig is not None:
+            index.add(i, sig)
+
+    best: dict[int, list[tuple]] = defaultdict(list)
+    n_candidates = 0
+    for j, sig in enumerate(hasher.signatures([e["shingles"] for e in ebay])):
+        if sig is None:
+            continue
+        scored = []
+        for i in index.candidates(sig):
+            n_candidates += 1
+            s = score_pair(amazon[i], ebay[j])
+            if s["Confidence"] >= min_score:
+                scored.append((s["Confidence"], i, s))
+        if scored:  # an eBay listing is one product: keep it only under its best ASIN
+            conf, i, s = max(scored, key=lambda t: t[0])
+            best[i].append((conf, j, s))
+    print(f"Scored {n_candidates} candidate pairs (all-pairs would be {len(amazon) * len(ebay)})")
+
+    rows = []
+    for i, found in best.items():
+        a = amazon[i]
+        for rank, (_, j, s) in enumerate(sorted(found, key=lambda t: -t[0])[:top_k], 1):
+            e = ebay[j]
+            rows.append({"ASIN": a["key"], "Amazon_Title": a["title"], "Amazon_Price": a["price_text"],
+                         "Amazon_URL": a["url"], "eBay_Item_ID": e["key"], "eBay_Title": e["title"],
+                         "eBay_Price": e["price_text"], "eBay_URL": e["url"], "Rank": rank, **s})
+    rows.sort(key=lambda r: (-r["Confidence"], r["ASIN"]))
+    return rows
+
+# -------------------- loading saved runs --------------------
+def read_table(path: Path):
+    import pandas as pd
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    if path.suffix == ".jsonl":
+        return pd.read_json(path, lines=True, dtype=False)
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+def load_listings(paths: list[Path]) -> tuple[list[dict], list[dict]]:
+    import pandas as pd
+    from normalize import parse_price
+    amazon: dict[str, dict] = {}
+    ebay: dict[str, dict] = {}
+    for path in sorted(paths, key=lambda p: p.stat().st_mtime):  # newest run wins on duplicates
+        if path.stem.endswith("_reviews") or path.stem.startswith(("price_changes_", "matches_")):
+            continue
+        try:
+            df = read_table(path)
+        except Exception as e:
+            print(f"  ✗ Skipping {path}: {e}")
+            continue
+        if "Title" not in df.columns or "URL" not in df.columns:
+            continue
+        is_amazon = "ASIN" in df.columns
+        if not is_amazon and not df["URL"].astype(str).str.contains("/itm/").any():
+            continue
+        price_text = df["Price"].astype(str) if "Price" in df.columns else df["Title"].map(lambda _: "")
+        price = parse_price(price_text)
+        for rec, value, currency, ptext in zip(df.to_dict("records"), price["value"], price["currency"], price_text):
+            url = str(rec.get("URL") or "")
+            if is_amazon:
+                key = str(rec.get("ASIN") or "")
+                if not key or key == "Not found":
+                    continue
+                target = amazon
+            else:
+                m = re.search(r"/itm/(?:[^/?]+/)?(\d{9,15})", url)
+                if not m:
+                    continue
+                key, target = m.group(1), ebay
+            target[key] = {"key": key, "title": str(rec.get("Title") or ""), "url": url, "price_text": ptext,
+                           "price": None if pd.isna(value) else float(value),
+                           "currency": None if pd.isna(currency) else str(currency)}
+    return list(amazon.values()), list(ebay.values())
+
+def save_matches(rows: list[dict], out_dir: Path, out_format: str = "csv") -> Path:
+    import pandas as pd
+    ensure_dir(out_dir)
+    path = out_dir / f"matches_{timestamp()}.{out_format}"
+    df = pd.DataFrame(rows)
+    if out_format == "parquet":
+        df.to_parquet(path, index=False)
+    elif out_format == "jsonl":
+        df.to_json(path, orient="records", lines=True, force_ascii=False)
+    else:
+        df.to_csv(path, index=False)
+    print(f"\nSaved {len(rows)} matches to: {path}")
+    return path
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Match Amazon products to eBay listings from saved runs (MinHash/LSH).")
+    p.add_argument("--inputs", nargs="*", default=None,
+                   help="Files or globs (default: every csv/parquet/jsonl in --out_dir)")
+    p.add_argument("--min_score", type=float, default=0.6, help="Minimum Confidence to emit a pair")
+    p.add_argument("--top_k", type=int, default=1, help="eBay matches kept per ASIN")
+    p.add_argument("--num_perm", type=int, default=64, help="MinHash permutations (divisible by --bands)")
+    p.add_argument("--bands", type=int, default=16, help="LSH bands; more bands = more recall, more candidates")
+    p.add_argument("--out_dir", default="Products")
+    p.add_argument("--out_format", choices=["csv", "parquet", "jsonl"], default="csv")
+    return p.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    patterns = args.inputs or [str(Path(args.out_dir) / f"*.{ext}") for ext in ("csv", "parquet", "jsonl")]
+    paths = sorted({Path(f) for pat in patterns for f in (glob.glob(pat) or ([pat] if Path(pat).exists() else []))})
+    amazon, ebay = load_listings(paths)
+    print(f"Loaded {len(amazon)} Amazon products and {len(ebay)} eBay listings from {len(paths)} files")
+    if not amazon or not ebay:
+        raise SystemExit("Need at least one Amazon and one eBay table to match")
+    if args.num_perm % args.bands:
+        raise SystemExit("--num_perm must be divisible by --bands")
+    matches = match_listings(amazon, ebay, args.min_score, args.top_k, args.num_perm, args.bands)
+    if matches:
+        save_matches(matches, Path(args.out_dir), args.out_format)
+    else:
+        print("No matches above --min_score.")
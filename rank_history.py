@@ -0,0 +1,296 @@
+# rank_history.py
+# Search-rank time series: where each product sat in the results of each query, run after run.
+#
+#   python Selenium_Amazon.py --query "usb hub" --rank_history rank_history.db      # records every run
+#   python rank_history.py rank  --query "usb hub" --id B0C1234567 --days 90
+#   python rank_history.py price --id B0C1234567 --site amazon
+#   python rank_history.py snapshot --query "usb hub" --date 2025-03-01
+#   python rank_history.py import --inputs "Products/*.csv"                         # backfill from old tables
+#
+# Storage is delta-encoded: a snapshot is (site, query, day, [(id, position, price), ...]) but only the
+# series whose position or price changed since the previous snapshot of that query get a row; a product
+# that drops out of the results gets one row with position NULL. A daily query whose top results are
+# stable writes a handful of rows per day instead of the whole table. Rows are keyed (series, day) and
+# series are unique on (site, query, id) with an index on id, so one product's history is a single
+# index range scan no matter how many days are stored. One run per query and day; a re-run the same
+# day replaces that day's snapshot.
+
+import argparse
+import glob
+import re
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id      INTEGER PRIMARY KEY,
+    site    TEXT NOT NULL,
+    query   TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    UNIQUE(site, query, item_id)
+);
+CREATE INDEX IF NOT EXISTS series_item ON series(item_id, site);
+CREATE TABLE IF NOT EXISTS snapshots (
+    site  TEXT NOT NULL,
+    query TEXT NOT NULL,
+    day   INTEGER NOT NULL,
+    items INTEGER NOT NULL,
+    PRIMARY KEY(site, query, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS changes (
+    series_id INTEGER NOT NULL,
+    day       INTEGER NOT NULL,
+    position  INTEGER,
+    price     REAL,
+    PRIMARY KEY(series_id, day)
+) WITHOUT ROWID;
+"""
+
+ABSENT = (None, None)  # (position, price) of a product not in the results
+_PRICE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_STAMP = re.compile(r"_(\d{8})_\d{6}$")
+_EBAY_ITEM = re.compile(r"/itm/(?:[^/?]+/)?(\d{9,15})")
+
+def query_key(query: str) -> str:
+    """'USB  Hub' / 'usb_hub' (a saved file's name) -> 'usb hub'."""
+    return " ".join(re.sub(r"[_\s]+", " ", (query or "").lower()).split())
+
+def price_value(price) -> float | None:
+    """'$1,299.99' -> 1299.99; '$10.00 to $20.00' -> 10.0."""
+    if isinstance(price, (int, float)):
+        return float(price)
+    m = _PRICE.search(str(price or ""))
+    return float(m.group(0).replace(",", "")) if m else None
+
+def ebay_item_id(url: str) -> str:
+    m = _EBAY_ITEM.search(url or "")
+    return m.group(1) if m else ""
+
+def _day(d) -> int:
+    if d is None:
+        return date.today().toordinal()
+    if isinstance(d, str):
+        d = date.fromisoformat(d[:10])
+    return d.toordinal()
+
+def _iso(day: int) -> str:
+    return date.fromordinal(day).isoformat()
+
+class RankHistory:
+    def __init__(self, path: str = "rank_history.db"):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    # -------------------- write --------------------
+    def _state_at(self, series_id: int, day: int) -> tuple:
+        row = self.conn.execute("SELECT position, price FROM changes WHERE series_id=? AND day<=? "
+                                "ORDER BY day DESC LIMIT 1", (series_id, day)).fetchone()
+        return tuple(row) if row else ABSENT
+
+    def _present(self, site: str, query: str, day: int) -> dict:
+        """{series id: (position, price)} of the products in the ranking in effect on day."""
+        rows = self.conn.execute(
+            "SELECT s.id, c.position, c.price FROM series s JOIN changes c ON c.series_id = s.id "
+            "WHERE s.site=? AND s.query=? AND c.day = (SELECT MAX(day) FROM changes WHERE series_id = s.id AND day<=?) "
+            "AND c.position IS NOT NULL", (site, query, day)).fetchall()
+        return {series_id: (pos, price) for series_id, pos, price in rows}
+
+    def _set(self, series_id: int, day: int, state: tuple, before: tuple) -> bool:
+        """Row at day = state, or no row when it repeats the state in effect before day."""
+        if state == before:
+            self.conn.execute("DELETE FROM changes WHERE series_id=? AND day=?", (series_id, day))
+            return False
+        self.conn.execute("INSERT OR REPLACE INTO changes VALUES (?,?,?,?)", (series_id, day, *state))
+        return True
+
+    def record(self, site: str, query: str, items, day=None) -> int:
+        """
+        Store one results snapshot. items: (id, price) pairs in rank order (position = index + 1;
+        price as text or number; entries without an id keep their slot). Returns the change rows stored for day.
+        """
+        q, d = query_key(query), _day(day)
+        observed = {}
+        for pos, (item_id, price) in enumerate(items, 1):
+            if item_id and item_id not in observed:
+                observed[item_id] = (pos, price_value(price))
+        written = 0
+        with self.conn:
+            # A backfilled day between two stored snapshots must not change what the next one reads
+            nxt = self.conn.execute("SELECT MIN(day) FROM snapshots WHERE site=? AND query=? AND day>?",
+                                    (site, q, d)).fetchone()[0]
+            self.conn.execute("INSERT OR REPLACE INTO snapshots VALUES (?,?,?,?)", (site, q, d, len(observed)))
+            self.conn.executemany("INSERT OR IGNORE INTO series(site, query, item_id) VALUES (?,?,?)",
+                                  [(site, q, i) for i in observed])
+            ids = {series_id: item_id for series_id, item_id in self.conn.execute(
+                "SELECT id, item_id FROM series WHERE site=? AND query=?", (site, q))}
+            # Only series in the ranking before, on (a same-day re-run) or after day can need a row;
+            # the long tail of products that left the results long ago is never touched
+            before = self._present(site, q, d - 1)
+            touched = set(before) | set(self._present(site, q, d)) | {i for i, item in ids.items() if item in observed}
+            after = self._present(site, q, nxt) if nxt else {}
+            touched |= set(after)
+            for series_id in touched:
+                state = observed.get(ids[series_id], ABSENT)
+                written += self._set(series_id, d, state, before.get(series_id, ABSENT))
+                if nxt:
+                    self._set(series_id, nxt, after.get(series_id, ABSENT), state)
+        return written
+
+    # -------------------- read --------------------
+    def _series_id(self, site: str, query: str, item_id: str) -> int | None:
+        row = self.conn.execute("SELECT id FROM series WHERE site=? AND query=? AND item_id=?",
+                                (site, query_key(query), item_id)).fetchone()
+        return row[0] if row else None
+
+    def rank_history(self, query: str, item_id: str, site: str = "amazon", since=None, until=None) -> list[dict]:
+        """One {"date", "position", "price"} per stored snapshot of query in [since, until]; position None = absent."""
+        lo, hi = _day(since) if since else 0, _day(until)
+        days = [r[0] for r in self.conn.execute(
+            "SELECT day FROM snapshots WHERE site=? AND query=? AND day BETWEEN ? AND ? ORDER BY day",
+            (site, query_key(query), lo, hi))]
+        series_id = self._series_id(site, query, item_id)
+        if series_id is None or not days:
+            return [{"date": _iso(d), "position": None, "price": None} for d in days]
+        points = self.conn.execute("SELECT day, position, price FROM changes WHERE series_id=? AND day BETWEEN ? AND ? "
+                                   "ORDER BY day", (series_id, days[0], hi)).fetchall()
+        state, out, k = self._state_at(series_id, days[0] - 1), [], 0
+        for d in days:
+            while k < len(points) and points[k][0] <= d:
+                state = points[k][1:]
+                k += 1
+            out.append({"date": _iso(d), "position": state[0], "price": state[1]})
+        return out
+
+    def price_history(self, item_id: str, site: str | None = None, since=None, until=None) -> list[dict]:
+        """Search-result price of item_id over every query it was seen in: one {"date", "price"} per change."""
+        lo, hi = _day(since) if since else 0, _day(until)
+        sql = ("SELECT c.day, c.price FROM series s JOIN changes c ON c.series_id = s.id "
+               "WHERE s.item_id=? AND c.price IS NOT NULL AND c.day BETWEEN ? AND ?")
+        params = [item_id, lo, hi]
+        if site:
+            sql += " AND s.site=?"
+            params.append(site)
+        out = []
+        for d, price in self.conn.execute(sql + " ORDER BY c.day", params):
+            if not out or out[-1]["price"] != price:
+                out.append({"date": _iso(d), "price": price})
+        return out
+
+    def snapshot(self, query: str, site: str = "amazon", day=None) -> list[dict]:
+        """The ranking stored for query on the last snapshot at or before day."""
+        q = query_key(query)
+        row = self.conn.execute("SELECT MAX(day) FROM snapshots WHERE site=? AND query=? AND day<=?",
+                                (site, q, _day(day))).fetchone()
+        if row[0] is None:
+            return []
+        ids = dict(self.conn.execute("SELECT id, item_id FROM series WHERE site=? AND query=?", (site, q)))
+        ranking = sorted(self._present(site, q, row[0]).items(), key=lambda kv: kv[1][0])
+        return [{"date": _iso(row[0]), "position": p, "id": ids[i], "price": v} for i, (p, v) in ranking]
+
+    def stats(self) -> dict:
+        one = lambda sql: self.conn.execute(sql).fetchone()[0] or 0
+        return {"queries": one("SELECT COUNT(DISTINCT site || ':' || query) FROM snapshots"),
+                "snapshots": one("SELECT COUNT(*) FROM snapshots"),
+                "products": one("SELECT COUNT(DISTINCT item_id) FROM series"),
+                "observations": one("SELECT SUM(items) FROM snapshots"),
+                "stored_rows": one("SELECT COUNT(*) FROM changes")}
+
+    def close(self):
+        self.conn.close()
+
+# -------------------- backfill from saved tables --------------------
+def import_tables(history: RankHistory, patterns: list[str]) -> int:
+    """Record every saved results table (Amazon product / eBay result rows) under its file's query and date."""
+    from review_index import query_from_filename, read_records
+
+    files = {Path(f) for pat in patterns for f in glob.glob(pat)}
+    dated = sorted((m.group(1), path.name, path) for path in files if (m := _STAMP.search(path.stem)))
+    n = 0
+    for stamp, _, path in dated:  # oldest first, so each record() is a plain append
+        if path.stem.startswith(("price_changes_", "matches_")):
+            continue
+        try:
+            rows = list(read_records(path))
+        except Exception as e:
+            print(f"  ✗ {path.name}: {e}")
+            continue
+        if not rows:
+            continue
+        day = datetime.strptime(stamp, "%Y%m%d").date()
+        query = query_from_filename(path)
+        if "ASIN" in rows[0] and "Product_Number" in rows[0]:
+            rows.sort(key=lambda r: int(r.get("Product_Number") or 0))
+            items = [(str(r.get("ASIN") or ""), r.get("Price_Value") or r.get("Price")) for r in rows]
+            site = "amazon"
+        elif "URL" in rows[0] and "Price" in rows[0]:
+            items = [(ebay_item_id(str(r.get("URL") or "")), r.get("Price_Value") or r.get("Price")) for r in rows]
+            site = "ebay"
+        else:
+            continue
+        if query.startswith("ebay_"):  # crawl_queue export names eBay tables ebay_<query>
+            query, site = query[len("ebay_"):], "ebay"
+        history.record(site, query, items, day)
+        print(f"  ✓ {path.name}: {site} '{query_key(query)}' {day} ({len(items)} results)")
+        n += 1
+    return n
+
+# -------------------- CLI --------------------
+def parse_args():
+    p = argparse.ArgumentParser(description="Search-rank and price history per query and product.")
+    p.add_argument("--db", default="rank_history.db")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("rank", help="Position (and price) of one product in one query, per run")
+    r.add_argument("--query", required=True)
+    r.add_argument("--id", required=True, help="ASIN or eBay item id")
+    r.add_argument("--site", choices=["amazon", "ebay"], default="amazon")
+    r.add_argument("--days", type=int, default=90, help="Look back this many days (0 = everything)")
+
+    c = sub.add_parser("price", help="Price changes of one product across all queries")
+    c.add_argument("--id", required=True)
+    c.add_argument("--site", choices=["amazon", "ebay"], default=None)
+    c.add_argument("--days", type=int, default=0)
+
+    s = sub.add_parser("snapshot", help="The ranking of one query on a date")
+    s.add_argument("--query", required=True)
+    s.add_argument("--site", choices=["amazon", "ebay"], default="amazon")
+    s.add_argument("--date", default=None, help="YYYY-MM-DD (default: latest)")
+
+    i = sub.add_parser("import", help="Backfill from saved results tables")
+    i.add_argument("--inputs", nargs="+", default=["Products/*.csv", "Products/*.parquet", "Products/*.jsonl"])
+
+    sub.add_parser("stats", help="Stored snapshots and compression")
+    return p.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    history = RankHistory(args.db)
+    since = (date.today() - timedelta(days=args.days)) if getattr(args, "days", 0) else None
+    t0 = time.perf_counter()
+    if args.cmd == "rank":
+        points = history.rank_history(args.query, args.id, args.site, since=since)
+        for pt in points:
+            print(f"{pt['date']}  {pt['position'] if pt['position'] is not None else '-':>4}  {pt['price'] or ''}")
+        print(f"{len(points)} runs in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    elif args.cmd == "price":
+        points = history.price_history(args.id, args.site, since=since)
+        for pt in points:
+            print(f"{pt['date']}  {pt['price']}")
+        print(f"{len(points)} price changes in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    elif args.cmd == "snapshot":
+        rows = history.snapshot(args.query, args.site, args.date)
+        for r in rows:
+            print(f"{r['position']:>4}  {r['id']}  {r['price'] or ''}")
+        print(f"{len(rows)} results on {rows[0]['date'] if rows else '-'}")
+    elif args.cmd == "import":
+        print(f"Imported {import_tables(history, args.inputs)} tables")
+    else:
+        st = history.stats()
+        print(", ".join(f"{k}={v}" for k, v in st.items()))
+        if st["stored_rows"]:
+            print(f"{st['observations'] / st['stored_rows']:.1f} observations per stored row")
+    history.close()
@@ -0,0 +1,193 @@
+# review_capture.py
+# Network-capture mode for Amazon reviews.
+#
+# Instead of reading each review field from the rendered DOM (one WebDriver round trip per
+# field per review), Chrome's performance log is used to see CDP Network events. The response
+# bodies of the review page documents and of the review AJAX widgets
+# (/hz/reviews-render/ajax/..., "see more reviews") are fetched with Network.getResponseBody
+# and parsed in bulk. Callers fall back to DOM scraping when nothing was captured.
+#
+# Requires the session to be created with performance logging on:
+#   enable_performance_logging(options)
+
+import base64
+import json
+import re
+from html.parser import HTMLParser
+
+REVIEW_URL_PATTERNS = [
+    r"/hz/reviews-render/ajax/",
+    r"/portal/customer-reviews/ajax/",
+    r"/product-reviews/",
+    r"/global-reviews/",
+    r"/reviews/get",
+]
+CAPTURED_TYPES = {"XHR", "Fetch", "Document"}
+
+FIELD_HOOKS = {
+    "review-title": "review_title",
+    "review-body": "review_text",
+    "review-star-rating": "review_rating",
+    "cmps-review-star-rating": "review_rating",
+    "review-date": "review_date",
+}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+def enable_performance_logging(options):
+    """Ask chromedriver to record CDP Network events in the 'performance' log."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+# -------------------- payload parsing --------------------
+class _ReviewBlockParser(HTMLParser):
+    """Collect data-hook="review" blocks and their title/body/rating/date text from raw HTML."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.reviews: list[dict] = []
+        self._depth = 0
+        self._review = None
+        self._review_depth = 0
+        self._fields = []  # stack of (field_name, depth, text parts) so nested hooks don't bleed
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == "br" and self._fields:
+                self._fields[-1][2].append(" ")
+            return
+        self._depth += 1
+        a = dict(attrs)
+        hook = a.get("data-hook") or ""
+        if hook == "review" and self._review is None:
+            self._review = {"review_id": a.get("id") or "", "review_title": "", "review_text": "",
+                            "review_rating": "", "review_date": ""}
+            self._review_depth = self._depth
+        elif self._review is not None and hook in FIELD_HOOKS:
+            self._fields.append((FIELD_HOOKS[hook], self._depth, []))
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        if self._fields and self._fields[-1][1] == self._depth:
+            name, _, parts = self._fields.pop()
+            text = re.sub(r"\s+", " ", "".join(parts)).strip()
+            if text and not self._review.get(name):
+                self._review[name] = text
+        if self._review is not None and self._depth == self._review_depth:
+            if self._review["review_text"]:
+                self.reviews.append(self._review)
+            self._review = None
+            self._fields = []
+        self._depth = max(0, self._depth - 1)
+
+    def handle_data(self, data):
+        if self._fields:
+            self._fields[-1][2].append(data)
+
+def html_fragments_from_payload(body: str) -> list[str]:
+    """
+    Amazon review widgets answer with '&&&'-separated JSON commands such as
+    ["append","#cm_cr-review_list","<div id=\\"R..\\" data-hook=\\"review\\">..."].
+    Plain HTML documents are returned as a single fragment.
+    """
+    body = body or ""
+    if "&&&" not in body and not body.lstrip().startswith("["):
+        return [body]
+    fragments = []
+    for chunk in body.split("&&&"):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        try:
+            cmd = json.loads(chunk)
+        except ValueError:
+            continue
+        for part in (cmd if isinstance(cmd, list) else [cmd]):
+            if isinstance(part, str) and "data-hook" in part:
+                fragments.append(part)
+    return fragments
+
+def parse_reviews_from_payload(body: str) -> list[dict]:
+    reviews = []
+    for frag in html_fragments_from_payload(body):
+        parser = _ReviewBlockParser()
+        try:
+            parser.feed(frag)
+            parser.close()
+        except Exception:
+            pass
+        reviews.extend(parser.reviews)
+    return reviews
+
+# -------------------- capture --------------------
+class ReviewNetworkCapture:
+    """Collect review-bearing response bodies from the performance log of one driver."""
+
+    def __init__(self, driver, url_patterns=None):
+        self.driver = driver
+        self.url_re = re.compile("|".join(url_patterns or REVIEW_URL_PATTERNS))
+        self._pending: dict[str, str] = {}   # requestId -> url
+        self._finished: set[str] = set()
+        self.bodies_fetched = 0
+        self.enabled = False
+
+    def start(self) -> bool:
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.get_log("performance")  # drop anything recorded before we started
+            self.enabled = True
+        except Exception as e:
+            print(f"    ✗ Network capture unavailable (falling back to DOM): {e}")
+            self.enabled = False
+        return self.enabled
+
+    def reset(self):
+        """Forget everything seen so far (call before navigating to a new review page)."""
+        if not self.enabled:
+            return
+        self._read_log()
+        self._pending.clear()
+        self._finished.clear()
+
+    def _read_log(self):
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            return
+        for entry in entries:
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            method, params = msg.get("method"), msg.get("params", {})
+            if method == "Network.responseReceived":
+                url = params.get("response", {}).get("url", "")
+                if params.get("type") in CAPTURED_TYPES and self.url_re.search(url):
+                    self._pending[params["requestId"]] = url
+            elif method == "Network.loadingFinished":
+                self._finished.add(params.get("requestId"))
+
+    def collect(self, origin_country_from_date=None) -> list[dict]:
+        """Parse reviews out of every finished matching response since the last call."""
+        if not self.enabled:
+            return []
+        self._read_log()
+        reviews, seen = [], set()
+        for request_id in [r for r in self._pending if r in self._finished]:
+            self._pending.pop(request_id, None)
+            try:
+                res = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            except Exception:
+                continue
+            self.bodies_fetched += 1
+            body = res.get("body", "")
+            if res.get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8", "replace")
+            for rv in parse_reviews_from_payload(body):
+                key = rv["review_id"] or rv["review_text"]
+                if key in seen:
+                    continue
+                seen.add(key)
+                rv["origin_country"] = origin_country_from_date(rv["review_date"]) if origin_country_from_date else ""
+                reviews.append(rv)
+        return reviews
@@ -0,0 +1,82 @@
+# review_dedup.py
+# Streaming review de-duplication across the sources of one product (/product-reviews pages,
+# network captures, inline blocks, /global-reviews): each review is checked as it is scraped,
+# so duplicates never count towards max_reviews, Foreign_Reviews_Count or the concat columns.
+#
+#   seen = ReviewDeduper(near_duplicates=True)
+#   if seen.add(rv): results.append(rv)
+#
+# Exact duplicates: same review id (R...), or same normalized text (case, punctuation, whitespace,
+# "Read more") on the same date. Titles and the "Reviewed in <country>" part are ignored because
+# the inline and global renderings of one review differ there.
+# Near duplicates (optional, for syndicated reviews that are lightly edited or wrapped, e.g.
+# "This review is from: ..."): Jaccard similarity of word-bigram sets >= min_similarity. An inverted
+# index from bigram to review makes each check proportional to the overlap, not to the review count.
+
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+_BOILERPLATE = re.compile(r"\b(read more|this review is from\s*:?)\b", re.I)
+_DATE = re.compile(r"\b\w+ \d{1,2}, \d{4}\b|\b\d{1,2} \w+ \d{4}\b|\d{4}[-./]\d{1,2}[-./]\d{1,2}")
+MIN_NEAR_TOKENS = 8  # shorter texts ("Great product!") are left to the exact check
+
+def normalize_review_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return " ".join(_NON_WORD.sub(" ", _BOILERPLATE.sub(" ", text)).split())
+
+def bigrams(tokens: list[str]) -> set[str]:
+    return {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+class ReviewDeduper:
+    def __init__(self, near_duplicates: bool = False, min_similarity: float = 0.7):
+        self.near_duplicates = near_duplicates
+        self.min_similarity = min_similarity
+        self._ids: set[str] = set()
+        self._hashes: set[str] = set()
+        self._shingles: list[int] = []            # review number -> size of its bigram set
+        self._index: dict[str, list[int]] = {}    # bigram -> review numbers
+        self.dropped = {"id": 0, "exact": 0, "near": 0}
+
+    def add(self, rv: dict) -> bool:
+        """True if rv is new (and remember it); False if it duplicates a review already added."""
+        rid = rv.get("review_id") or ""
+        if rid and rid in self._ids:
+            self.dropped["id"] += 1
+            return False
+        norm = normalize_review_text(rv.get("review_text", ""))
+        date = _DATE.search(rv.get("review_date") or "")
+        digest = hashlib.sha1(f"{norm}\x1f{date.group(0) if date else ''}".encode("utf-8")).hexdigest()
+        if digest in self._hashes:
+            self.dropped["exact"] += 1
+            return False
+        shingles = None
+        tokens = norm.split()
+        if self.near_duplicates and len(tokens) >= MIN_NEAR_TOKENS:
+            shingles = bigrams(tokens)
+            if self._near_match(shingles):
+                self.dropped["near"] += 1
+                return False
+        if rid:
+            self._ids.add(rid)
+        self._hashes.add(digest)
+        if shingles:
+            n = len(self._shingles)
+            self._shingles.append(len(shingles))
+            for sh in shingles:
+                self._index.setdefault(sh, []).append(n)
+        return True
+
+    def filter(self, reviews: list[dict]) -> list[dict]:
+        return [rv for rv in reviews if self.add(rv)]
+
+    def _near_match(self, shingles: set[str]) -> bool:
+        shared = Counter(n for sh in shingles for n in self._index.get(sh, ()))
+        return any(common / (len(shingles) + self._shingles[n] - common) >= self.min_similarity
+                   for n, common in shared.items())
+
+    @property
+    def total_dropped(self) -> int:
+        return sum(self.dropped.values())
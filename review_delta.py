@@ -0,0 +1,54 @@
+# review_delta.py
+# Per-ASIN memory of the newest reviews already scraped, for --review_delta_state.
+#
+#   state = ReviewDeltaState("review_state.db")
+#   known = state.known_keys(asin)          # empty on the first run for this ASIN
+#   ... scrape /product-reviews/<asin>?sortBy=recent, stop at the first review in `known` ...
+#   state.update(asin, new_reviews)         # newest first
+#
+# Keys are review_stream.review_key(): Amazon's review id (R...) when the page exposes it,
+# otherwise a hash of title + text + date. The newest KEEP keys are stored, not just one, so a
+# deleted or edited top review does not make the next run page through everything again.
+
+import json
+import sqlite3
+from datetime import datetime
+
+from review_stream import review_key
+
+KEEP = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS review_state (
+    asin        TEXT PRIMARY KEY,
+    newest_keys TEXT NOT NULL,
+    total_seen  INTEGER NOT NULL DEFAULT 0,
+    updated_at  TEXT
+);
+"""
+
+class ReviewDeltaState:
+    def __init__(self, path: str = "review_state.db"):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def known_keys(self, asin: str) -> set[str]:
+        row = self.conn.execute("SELECT newest_keys FROM review_state WHERE asin=?", (asin,)).fetchone()
+        return set(json.loads(row[0])) if row else set()
+
+    def update(self, asin: str, new_reviews: list[dict]):
+        """Record reviews fetched this run (newest first) ahead of the previously stored keys."""
+        row = self.conn.execute("SELECT newest_keys FROM review_state WHERE asin=?", (asin,)).fetchone()
+        if row and not new_reviews:
+            return
+        old = json.loads(row[0]) if row else []
+        keys = list(dict.fromkeys([review_key(rv) for rv in new_reviews] + old))[:KEEP]
+        self.conn.execute(
+            "INSERT INTO review_state(asin, newest_keys, total_seen, updated_at) VALUES (?,?,?,?) "
+            "ON CONFLICT(asin) DO UPDATE SET newest_keys=excluded.newest_keys, "
+            "total_seen=total_seen + excluded.total_seen, updated_at=excluded.updated_at",
+            (asin, json.dumps(keys), len(new_reviews), datetime.now().isoformat(timespec="seconds")))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,264 @@
+# review_index.py
+# SQLite FTS5 index over every scraped review, ingested incrementally from the saved tables.
+#
+#   python review_index.py ingest                                  # Products/*_reviews.* (+ older product tables)
+#   python review_index.py search "overheat*"  --query "usb hub" --max_rating 2
+#   python review_index.py search '"stopped working" NEAR battery' --asin B0C1234567 --limit 50
+#   python review_index.py stats
+#
+# Sources:
+#   <name>_reviews.{csv,parquet,jsonl}   one row per review (ASIN, rating, date, country)
+#   <name>.{csv,...} product tables      All_Reviews_Concat / All_Foreign_Reviews_Concat split on " ||| "
+#                                        (text + ASIN only; used for runs saved before the reviews table)
+# Files already ingested with the same size/mtime are skipped; the same review (ASIN + text)
+# seen in several runs is stored once, and a text-only copy from a product table is completed by the
+# reviews table of the same run (title, rating, date, country) whichever file is read first. Search syntax is FTS5 MATCH (prefix*, "phrases", NEAR, OR, -not).
+
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from Selenium_Amazon import parse_country_from_date, sanitize_name
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id          INTEGER PRIMARY KEY,
+    review_key  TEXT UNIQUE NOT NULL,
+    asin        TEXT,
+    query       TEXT,
+    source      TEXT,
+    title       TEXT,
+    text        TEXT NOT NULL,
+    rating      REAL,
+    review_date TEXT,
+    country     TEXT,
+    file        TEXT
+);
+CREATE INDEX IF NOT EXISTS reviews_asin ON reviews(asin);
+CREATE INDEX IF NOT EXISTS reviews_query ON reviews(query);
+CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+    title, text, content='reviews', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS reviews_ai AFTER INSERT ON reviews BEGIN
+    INSERT INTO reviews_fts(rowid, title, text) VALUES (new.id, new.title, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS reviews_ad AFTER DELETE ON reviews BEGIN
+    INSERT INTO reviews_fts(reviews_fts, rowid, title, text) VALUES ('delete', old.id, old.title, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS reviews_au AFTER UPDATE OF title, text ON reviews BEGIN
+    INSERT INTO reviews_fts(reviews_fts, rowid, title, text) VALUES ('delete', old.id, old.title, old.text);
+    INSERT INTO reviews_fts(rowid, title, text) VALUES (new.id, new.title, new.text);
+END;
+CREATE TABLE IF NOT EXISTS ingested_files (
+    path TEXT PRIMARY KEY, size INTEGER, mtime REAL, reviews INTEGER, ingested_at TEXT
+);
+"""
+
+# A review already stored keeps its row; columns it lacks (concat tables carry text only) are filled in
+UPSERT = """
+INSERT INTO reviews(review_key, asin, query, source, title, text, rating, review_date, country, file)
+VALUES (?,?,?,?,?,?,?,?,?,?)
+ON CONFLICT(review_key) DO UPDATE SET
+    title = CASE WHEN reviews.title = '' THEN excluded.title ELSE reviews.title END,
+    rating = COALESCE(reviews.rating, excluded.rating),
+    review_date = COALESCE(reviews.review_date, excluded.review_date),
+    country = CASE WHEN reviews.country = '' THEN excluded.country ELSE reviews.country END
+WHERE (reviews.title = '' AND excluded.title != '') OR (reviews.rating IS NULL AND excluded.rating IS NOT NULL)
+   OR (reviews.review_date IS NULL AND excluded.review_date IS NOT NULL)
+   OR (reviews.country = '' AND excluded.country != '')
+"""
+
+_STAMP = re.compile(r"_\d{8}_\d{6}$")
+
+def query_from_filename(path: Path) -> str:
+    """'usb_hub_20250301_101500_reviews.csv' -> 'usb_hub' (the sanitized query)."""
+    stem = path.stem[:-len("_reviews")] if path.stem.endswith("_reviews") else path.stem
+    return _STAMP.sub("", stem)
+
+def parse_rating(text) -> float | None:
+    m = re.search(r"\d+(?:[.,]\d+)?", str(text or ""))
+    if not m:
+        return None
+    val = float(m.group(0).replace(",", "."))
+    return val if val <= 5 else None
+
+def parse_date(text) -> str | None:
+    """'Reviewed in the United States on March 3, 2025' / '... on 3 March 2025' -> '2025-03-03'."""
+    for pattern, fmt in ((r"([A-Z][a-z]+ \d{1,2}, \d{4})", "%B %d, %Y"), (r"(\d{1,2} [A-Z][a-z]+ \d{4})", "%d %B %Y")):
+        m = re.search(pattern, str(text or ""))
+        if m:
+            try:
+                return datetime.strptime(m.group(1), fmt).date().isoformat()
+            except ValueError:
+                pass
+    return None
+
+def read_records(path: Path):
+    if path.suffix == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.suffix == ".parquet":
+        import pandas as pd
+        yield from pd.read_parquet(path).astype(object).where(lambda d: d.notna(), "").to_dict("records")
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+class ReviewIndex:
+    def __init__(self, path: str = "reviews.db"):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    # -------------------- ingest --------------------
+    def _rows_from_file(self, path: Path):
+        query_default = query_from_filename(path)
+        for rec in read_records(path):
+            query = sanitize_name(str(rec.get("Query") or "")) if rec.get("Query") else query_default
+            asin = str(rec.get("ASIN") or "")
+            if "Review_Text" in rec:
+                date_text = str(rec.get("Review_Date") or "")
+                yield (asin, query, str(rec.get("Source") or ""), str(rec.get("Review_Title") or ""),
+                       str(rec.get("Review_Text") or ""), parse_rating(rec.get("Review_Rating")),
+                       parse_date(date_text), str(rec.get("Origin_Country") or "") or parse_country_from_date(date_text))
+            else:
+                for col, source in (("All_Reviews_Concat", "domestic"), ("All_Foreign_Reviews_Concat", "foreign")):
+                    for text in str(rec.get(col) or "").split(" ||| "):
+                        yield asin, query, source, "", text, None, None, ""
+
+    def ingest_file(self, path: Path, force: bool = False) -> int:
+        st = path.stat()
+        seen = self.conn.execute("SELECT size, mtime FROM ingested_files WHERE path=?", (str(path),)).fetchone()
+        if seen and not force and seen == (st.st_size, st.st_mtime):
+            return 0
+        batch = []
+        for asin, query, source, title, text, rating, date, country in self._rows_from_file(path):
+            text = text.strip()
+            if not text:
+                continue
+            key = hashlib.sha1(f"{asin}\x1f{text}".encode("utf-8")).hexdigest()
+            batch.append((key, asin, query, source, title, text, rating, date, country, path.name))
+        with self.conn:
+            last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM reviews").fetchone()[0]
+            self.conn.executemany(UPSERT, batch)
+            added = self.conn.execute("SELECT COUNT(*) FROM reviews WHERE id > ?", (last_id,)).fetchone()[0]
+            self.conn.execute("INSERT OR REPLACE INTO ingested_files VALUES (?,?,?,?,?)",
+                              (str(path), st.st_size, st.st_mtime, added, datetime.now().isoformat(timespec="seconds")))
+        return added
+
+    def ingest(self, paths, force: bool = False) -> int:
+        total = 0
+        for path in paths:
+            if path.stem.startswith(("price_changes_", "matches_")):
+                continue
+            try:
+                n = self.ingest_file(path, force)
+            except Exception as e:
+                print(f"  ✗ {path}: {e}")
+                continue
+            if n:
+                print(f"  ✓ {path.name}: {n} new reviews")
+            total += n
+        return total
+
+    # -------------------- search --------------------
+    def search(self, match: str, asin: str | None = None, query: str | None = None,
+               min_rating: float | None = None, max_rating: float | None = None, country: str | None = None,
+               since: str | None = None, until: str | None = None, limit: int = 20) -> list[dict]:
+        """Ranked (bm25, title weighted 2x) hits for an FTS5 MATCH expression plus column filters."""
+        sql = ["SELECT r.asin, r.query, r.source, r.title, r.rating, r.review_date, r.country, r.file,",
+               "snippet(reviews_fts, 1, '[', ']', ' … ', 16) AS snippet, bm25(reviews_fts, 2.0, 1.0) AS score",
+               "FROM reviews_fts JOIN reviews r ON r.id = reviews_fts.rowid WHERE reviews_fts MATCH ?"]
+        args: list = [match]
+        for cond, val in (("r.asin = ?", asin), ("r.query = ?", sanitize_name(query) if query else None),
+                          ("r.rating >= ?", min_rating), ("r.rating <= ?", max_rating),
+                          ("r.country = ?", country), ("r.review_date >= ?", since), ("r.review_date <= ?", until)):
+            if val is not None:
+                sql.append(f"AND {cond}")
+                args.append(val)
+        sql.append("ORDER BY score LIMIT ?")
+        args.append(limit)
+        cur = self.conn.execute(" ".join(sql), args)
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, row)) for row in cur]
+
+    def stats(self) -> dict:
+        n, asins, queries = self.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT asin), COUNT(DISTINCT query) FROM reviews").fetchone()
+        files = self.conn.execute("SELECT COUNT(*) FROM ingested_files").fetchone()[0]
+        return {"reviews": n, "asins": asins, "queries": queries, "files": files}
+
+    def optimize(self):
+        self.conn.execute("INSERT INTO reviews_fts(reviews_fts) VALUES ('optimize')")
+        self.conn.commit()
+
+# -------------------- CLI --------------------
+def expand(patterns: list[str]) -> list[Path]:
+    out = []
+    for pat in patterns:
+        out.extend(Path(f) for f in sorted(glob.glob(pat)) or ([pat] if Path(pat).exists() else []))
+    return out
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Full-text index over scraped reviews (SQLite FTS5).")
+    p.add_argument("--db", default="reviews.db")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    i = sub.add_parser("ingest", help="Add new review tables to the index")
+    i.add_argument("paths", nargs="*", help="Files or globs (default: Products/*.csv|parquet|jsonl)")
+    i.add_argument("--force", action="store_true", help="Re-read files even if unchanged")
+
+    s = sub.add_parser("search", help="Ranked FTS5 search")
+    s.add_argument("match", help='FTS5 expression, e.g. overheat* or "stopped working"')
+    s.add_argument("--asin", default=None)
+    s.add_argument("--query", default=None, help="Only reviews scraped for this search query")
+    s.add_argument("--min_rating", type=float, default=None)
+    s.add_argument("--max_rating", type=float, default=None)
+    s.add_argument("--country", default=None, help='Origin country, e.g. "United Kingdom"')
+    s.add_argument("--since", default=None, help="YYYY-MM-DD")
+    s.add_argument("--until", default=None, help="YYYY-MM-DD")
+    s.add_argument("--limit", type=int, default=20)
+    s.add_argument("--json", action="store_true", help="One JSON object per hit")
+
+    sub.add_parser("stats", help="Index size")
+    sub.add_parser("optimize", help="Merge FTS segments (after large ingests)")
+    return p.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    index = ReviewIndex(args.db)
+    if args.cmd == "ingest":
+        paths = expand(args.paths or [f"Products/*.{ext}" for ext in ("csv", "parquet", "jsonl")])
+        added = index.ingest(paths, args.force)
+        print(f"Indexed {added} new reviews ({index.stats()['reviews']} total)")
+    elif args.cmd == "search":
+        t0 = time.perf_counter()
+        try:
+            hits = index.search(args.match, args.asin, args.query, args.min_rating, args.max_rating, args.country,
+                                args.since, args.until, args.limit)
+        except sqlite3.OperationalError as e:
+            sys.exit(f"Bad search expression: {e}")
+        ms = (time.perf_counter() - t0) * 1000
+        for h in hits:
+            if args.json:
+                print(json.dumps(h, ensure_ascii=False))
+            else:
+                stars = f"{h['rating']:.0f}★" if h["rating"] is not None else "  "
+                print(f"{h['asin']:12s} {stars} {h['review_date'] or '':10s} {h['country'] or '':15.15s} {h['snippet']}")
+        print(f"\n{len(hits)} hits in {ms:.1f} ms", file=sys.stderr)
+    elif args.cmd == "stats":
+        print(json.dumps(index.stats()))
+    elif args.cmd == "optimize":
+        index.optimize()
+        print("FTS index optimized")
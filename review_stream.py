@@ -0,0 +1,193 @@
+# review_stream.py
+# Bounded-memory review handling for --stream_reviews: the collectors in Selenium_Amazon.py are
+# generators of compact Review records, each record goes straight to a ReviewSink (the <name>_reviews
+# table, written in batches) and the product row keeps only ReviewStats (count, mean rating and the
+# first few records for the Review_1..5 columns). Peak memory no longer grows with the review count.
+#
+#   sink = ReviewSink("Products/monitor_20250301_101500_reviews.parquet", "parquet", normalize=normalize_reviews)
+#   stats = ReviewStats(keep=PREVIEW)
+#   for rv in iter_reviews_from_reviews_page(driver, url, ...):
+#       stats.add(rv)
+#       sink.write(review_row(rv, asin, product_number, "domestic"))
+#   sink.close()
+#
+# Review supports the dict calls the rest of the code uses (rv.get("review_text"), rv["review_rating"] = ...),
+# so review_key(), ReviewDeduper, review_rows() and top_k_review_texts() take either.
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+_RATING = re.compile(r"\d+(?:[.,]\d+)?")
+PREVIEW = 20  # records kept per product and source when streaming: Review_1..5 + review_delta.KEEP keys
+
+class Review:
+    __slots__ = ("review_title", "review_text", "review_rating", "review_date", "origin_country", "review_id")
+
+    def __init__(self, review_title="", review_text="", review_rating="", review_date="", origin_country="",
+                 review_id=""):
+        self.review_title = review_title
+        self.review_text = review_text
+        self.review_rating = review_rating
+        self.review_date = review_date
+        self.origin_country = origin_country
+        self.review_id = review_id
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Review":
+        return cls(**{k: d.get(k) or "" for k in cls.__slots__})
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self):
+        return f"Review({self.review_rating!r}, {self.review_text[:40]!r})"
+
+def review_row(rv, asin, product_number, source) -> dict:
+    """One row of the per-review output table."""
+    return {
+        "Product_Number": product_number,
+        "ASIN": asin,
+        "Source": source,
+        "Review_Title": rv.get("review_title", ""),
+        "Review_Text": rv.get("review_text", ""),
+        "Review_Rating": rv.get("review_rating", ""),
+        "Review_Date": rv.get("review_date", ""),
+        "Origin_Country": rv.get("origin_country", ""),
+    }
+
+def review_key(rv) -> str:
+    """Stable identity of a review: Amazon's review id when known, else a hash of its content."""
+    if rv.get("review_id"):
+        return rv["review_id"]
+    content = "\x1f".join(rv.get(f) or "" for f in ("review_title", "review_text", "review_date"))
+    return "h:" + hashlib.sha1(content.encode("utf-8")).hexdigest()[:20]
+
+def rating_value(text: str) -> float | None:
+    """'4.0 out of 5 stars' / '4,0 von 5 Sternen' -> 4.0."""
+    m = _RATING.search(text or "")
+    return float(m.group(0).replace(",", ".")) if m else None
+
+class ReviewStats:
+    """Running aggregates of one product's reviews from one source; keeps the first `keep` records (all if None)."""
+    __slots__ = ("keep", "head", "count", "rated", "rating_sum")
+
+    def __init__(self, keep: int | None = None):
+        self.keep = keep
+        self.head: list = []
+        self.count = 0
+        self.rated = 0
+        self.rating_sum = 0.0
+
+    def add(self, rv):
+        self.count += 1
+        if self.keep is None or len(self.head) < self.keep:
+            self.head.append(rv)
+        value = rating_value(rv.get("review_rating", ""))
+        if value is not None:
+            self.rated += 1
+            self.rating_sum += value
+
+    def extend(self, reviews):
+        for rv in reviews:
+            self.add(rv)
+        return self
+
+    @property
+    def complete(self) -> bool:
+        """True when every record is still held (head is the full list)."""
+        return len(self.head) == self.count
+
+    @property
+    def mean_rating(self) -> float | None:
+        return round(self.rating_sum / self.rated, 2) if self.rated else None
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.head)
+
+class ReviewSink:
+    """
+    Append review rows to one output file in batches: JSON Lines directly, CSV / Parquet through a
+    DataFrame per batch and the optional normalize(df) stage (Parquet via a pyarrow ParquetWriter,
+    every batch cast to the first batch's schema). The file is created on the first flush.
+    """
+
+    def __init__(self, path, out_format: str = "csv", normalize=None, batch_size: int = 1000, on_flush=None):
+        self.path = Path(path)
+        self.out_format = out_format
+        self.normalize = normalize
+        self.batch_size = batch_size
+        self.on_flush = on_flush  # called with the number of rows written
+        self.rows = 0
+        self._buf: list[dict] = []
+        self._writer = None
+        self._header = True
+
+    def write(self, row: dict):
+        self._buf.append(row)
+        if len(self._buf) >= self.batch_size:
+            self.flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        if not self._buf:
+            return
+        batch, self._buf = self._buf, []
+        if self.out_format == "jsonl":
+            with open(self.path, "a", encoding="utf-8") as f:
+                for row in batch:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            import pandas as pd
+            df = pd.DataFrame(batch).fillna("")
+            if self.normalize:
+                df = self.normalize(df)
+            if self.out_format == "parquet":
+                self._write_parquet(df)
+            else:
+                df.to_csv(self.path, mode="a", header=self._header, index=False)
+        self._header = False
+        self.rows += len(batch)
+        if self.on_flush:
+            self.on_flush(len(batch))
+
+    def _write_parquet(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = pa.Table.from_pandas(df, schema=self._writer.schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self) -> Path | None:
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self.rows:
+            print(f"\nStreamed {self.rows} review rows to: {self.path}")
+            return self.path
+        return None
@@ -0,0 +1,211 @@
+# run_metrics.py
+# Operational metrics for long-running crawls, exported in OpenMetrics text format.
+#
+# Both scrapers update the module-level METRICS registry; export is opt-in:
+#   --metrics_file Products/metrics.prom   rewritten every --metrics_interval seconds and at exit
+#                                          (works with node_exporter's textfile collector)
+#   --metrics_port 9108                    serves http://<host>:9108/metrics
+#
+# Metrics (all labelled by site):
+#   scraper_pages_fetched_total, scraper_pages_per_second, scraper_navigation_seconds (histogram),
+#   scraper_selector_misses_total{field}, scraper_block_pages_total, scraper_reviews_per_product (histogram),
+#   scraper_rows_written_total, scraper_active_sessions
+
+import os
+import threading
+import time
+
+NAV_BUCKETS = (0.5, 1, 2, 3, 5, 8, 13, 21, 34, 60)
+REVIEW_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+def _label_str(labels: tuple) -> str:
+    if not labels:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels) + "}"
+
+class _Metric:
+    def __init__(self, name, help_text, kind, lock):
+        self.name, self.help, self.kind, self._lock = name, help_text, kind, lock
+        self.values: dict[tuple, float] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(sorted(labels.items()))
+
+class Counter(_Metric):
+    def inc(self, amount: float = 1, **labels):
+        k = self._key(labels)
+        with self._lock:
+            self.values[k] = self.values.get(k, 0) + amount
+
+    def render(self):
+        for k, v in self.values.items():
+            yield f"{self.name}_total{_label_str(k)} {v}"
+
+class Gauge(_Metric):
+    def set(self, value: float, **labels):
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        k = self._key(labels)
+        with self._lock:
+            self.values[k] = self.values.get(k, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self):
+        for k, v in self.values.items():
+            yield f"{self.name}{_label_str(k)} {v}"
+
+class Histogram(_Metric):
+    def __init__(self, name, help_text, kind, lock, buckets):
+        super().__init__(name, help_text, kind, lock)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        k = self._key(labels)
+        with self._lock:
+            counts, total = self.values.get(k, ([0] * len(self.buckets), [0.0, 0]))
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    counts[i] += 1
+            total[0] += value
+            total[1] += 1
+            self.values[k] = (counts, total)
+
+    def render(self):
+        for k, (counts, (s, n)) in self.values.items():
+            for b, c in zip(self.buckets, counts):
+                yield f"{self.name}_bucket{_label_str(k + (('le', b),))} {c}"
+            yield f"{self.name}_bucket{_label_str(k + (('le', '+Inf'),))} {n}"
+            yield f"{self.name}_sum{_label_str(k)} {s}"
+            yield f"{self.name}_count{_label_str(k)} {n}"
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: list[_Metric] = []
+        self.started = time.time()
+        self.pages = self.counter("scraper_pages_fetched", "Pages navigated to")
+        self.pages_per_second = self.gauge("scraper_pages_per_second", "Pages fetched per second over the run")
+        self.navigation = self.histogram("scraper_navigation_seconds", "driver.get() latency", NAV_BUCKETS)
+        self.selector_misses = self.counter("scraper_selector_misses", "Fields whose whole selector fallback chain missed")
+        self.block_pages = self.counter("scraper_block_pages", "Captcha / robot-check pages seen")
+        self.reviews_per_product = self.histogram("scraper_reviews_per_product", "Reviews collected per product",
+                                                  REVIEW_BUCKETS)
+        self.rows_written = self.counter("scraper_rows_written", "Output rows written")
+        self.active_sessions = self.gauge("scraper_active_sessions", "Open browser sessions")
+
+    def counter(self, name, help_text):
+        return self._add(Counter(name, help_text, "counter", self._lock))
+
+    def gauge(self, name, help_text):
+        return self._add(Gauge(name, help_text, "gauge", self._lock))
+
+    def histogram(self, name, help_text, buckets):
+        return self._add(Histogram(name, help_text, "histogram", self._lock, buckets))
+
+    def _add(self, m):
+        self._metrics.append(m)
+        return m
+
+    def selector_miss(self, site: str, field: str):
+        self.selector_misses.inc(site=site, field=field)
+
+    def render(self) -> str:
+        elapsed = max(1e-9, time.time() - self.started)
+        for k, v in list(self.pages.values.items()):
+            self.pages_per_second.set(round(v / elapsed, 4), **dict(k))
+        lines = []
+        with self._lock:
+            for m in self._metrics:
+                lines.append(f"# TYPE {m.name} {m.kind}")
+                lines.append(f"# HELP {m.name} {m.help}")
+                lines.extend(m.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Atomic rewrite so collectors never read a half-written file."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+METRICS = MetricsRegistry()
+
+# -------------------- exporters --------------------
+def _serve(port: int):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # only when an endpoint is requested
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("/metrics", ""):
+                self.send_error(404)
+                return
+            body = METRICS.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_exporter(textfile: str | None = None, port: int | None = None, interval: float = 15.0):
+    """Start the HTTP endpoint and/or periodic textfile writer (daemon threads). Returns a stop() callable."""
+    stop = threading.Event()
+    server = None
+    if port:
+        server = _serve(port)
+        print(f"Metrics at http://127.0.0.1:{port}/metrics")
+    if textfile:
+        def loop():
+            while not stop.wait(interval):
+                METRICS.write_textfile(textfile)
+        threading.Thread(target=loop, daemon=True).start()
+
+    def shutdown():
+        stop.set()
+        if textfile:
+            METRICS.write_textfile(textfile)
+        if server:
+            server.shutdown()
+    return shutdown
+
+# -------------------- driver instrumentation --------------------
+BLOCK_CHECK_JS = ("return !!document.querySelector('form[action*=\"validateCaptcha\"], #captcha, iframe[src*=\"captcha\"]')"
+                  " || /robot check|captcha|security measure/i.test(document.title)")
+
+class MeteredDriver:
+    """Proxy that times navigations and counts pages / block pages for one site."""
+
+    def __init__(self, driver, site: str):
+        self.driver = driver
+        self.site = site
+
+    def __getattr__(self, name):
+        driver = self.__dict__.get("driver")
+        if driver is None:
+            raise AttributeError(name)
+        return getattr(driver, name)
+
+    def get(self, url):
+        t0 = time.perf_counter()
+        try:
+            return self.driver.get(url)
+        finally:
+            METRICS.navigation.observe(time.perf_counter() - t0, site=self.site)
+            METRICS.pages.inc(site=self.site)
+            try:
+                if self.driver.execute_script(BLOCK_CHECK_JS):
+                    METRICS.block_pages.inc(site=self.site)
+            except Exception:
+                pass
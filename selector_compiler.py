@@ -0,0 +1,138 @@
+# selector_compiler.py
+# Resolve ordered selector fallback chains for every block of a page in one execute_script call.
+#
+#   chains = SelectorChains({"review_title": [...], "review_text": [...]}, blocks=REVIEW_BLOCK_XPATHS, attrs=["id"])
+#   chains.resolve(driver)    -> [{"review_title": "...", "review_text": "...", "@id": "R1..."}, ...]
+#
+#   warranty = SelectorChains({"warranty_heading": [...], "warranty_text": [...]}, min_len={"warranty_text": 6})
+#   warranty.resolve(driver)  -> [{"warranty_heading": "...", "warranty_text": "..."}]     (no blocks: the document)
+#
+# Same semantics as the find_element loops it replaces: blocks are all matches of the first block
+# selector that matches anything; a field is the text of the first match of the first selector in
+# its chain whose text is long enough (non-empty by default), "" if none. Strings starting with
+# '//' or './/' are XPath, the rest CSS (the convention of the selector lists in the scrapers).
+# An XPath union ("a | b") would return document order, not chain order, so the priority walk runs
+# as a small JS resolver instead. 10 review blocks x 4 fields with 2 selectors each cost up to ~80
+# find_element / text round trips (plus a NoSuchElementException per miss); here they cost one.
+# Drivers whose execute_script cannot run it (returns something other than a list) get the same
+# result from the element-by-element walk.
+
+RESOLVE_JS = r"""
+const spec = arguments[0];
+const isXPath = (s) => s.startsWith('//') || s.startsWith('.//');
+const first = (root, sel) => {
+  try {
+    if (isXPath(sel)) return document.evaluate(sel, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    return root.querySelector(sel);
+  } catch (e) { return null; }
+};
+const all = (root, sel) => {
+  try {
+    if (!isXPath(sel)) return Array.from(root.querySelectorAll(sel));
+    const snap = document.evaluate(sel, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    return Array.from({length: snap.snapshotLength}, (_, i) => snap.snapshotItem(i));
+  } catch (e) { return []; }
+};
+// WebDriver's element text is the rendered text ("" when not rendered); textContent only as a fallback
+const text = (el) => {
+  let t = el.getClientRects().length ? (el.innerText || '').trim() : '';
+  if (!t && spec.content_fallback) t = (el.textContent || '').trim();
+  return t;
+};
+const resolveChains = (root) => {
+  const out = {};
+  for (const [name, chain] of Object.entries(spec.fields)) {
+    const min = (spec.min_len || {})[name] || 1;
+    out[name] = '';
+    for (const sel of chain) {
+      const el = first(root, sel);
+      if (!el) continue;
+      const t = text(el);
+      if (t.length >= min) { out[name] = t; break; }
+    }
+  }
+  for (const a of spec.attrs || []) out['@' + a] = root.getAttribute(a) || '';
+  return out;
+};
+if (!spec.blocks) return [resolveChains(document)];
+let blocks = [];
+for (const sel of spec.blocks) { blocks = all(document, sel); if (blocks.length) break; }
+if (spec.limit) blocks = blocks.slice(0, spec.limit);
+return blocks.map(resolveChains);
+"""
+
+def _by(selector: str) -> str:
+    return "xpath" if selector.startswith(("//", ".//")) else "css selector"
+
+class SelectorChains:
+    def __init__(self, fields: dict[str, list[str]], blocks: list[str] | None = None,
+                 min_len: dict[str, int] | None = None, attrs=(), content_fallback: bool = False):
+        """
+        fields: {name: ordered fallback selectors}, relative to each block (or the document).
+        blocks: ordered fallback selectors for the repeated blocks; None = one record for the document.
+        min_len: {name: shortest accepted text} (default 1). attrs: block attributes returned as "@name".
+        content_fallback: use textContent when the rendered text is empty (el.text or textContent).
+        """
+        self.fields = fields
+        self.blocks = blocks
+        self.min_len = min_len or {}
+        self.attrs = list(attrs)
+        self.content_fallback = content_fallback
+
+    def spec(self, limit: int | None = None, attrs=None) -> dict:
+        return {"fields": self.fields, "blocks": self.blocks, "min_len": self.min_len,
+                "attrs": self.attrs if attrs is None else list(attrs),
+                "content_fallback": self.content_fallback, "limit": limit}
+
+    def resolve(self, driver, limit: int | None = None, attrs=None) -> list[dict]:
+        """
+        One record per block (at most limit), in page order; [record] for the document without blocks.
+        attrs: block attributes to return instead of the ones given at construction.
+        """
+        spec = self.spec(limit, attrs)
+        try:
+            out = driver.execute_script(RESOLVE_JS, spec)
+            if isinstance(out, list):
+                return out
+        except Exception:
+            pass
+        return self.resolve_by_elements(driver, spec)
+
+    # -------------------- element-by-element fallback --------------------
+    def _text(self, el) -> str:
+        t = (el.text or "").strip()
+        if not t and self.content_fallback:
+            t = (el.get_attribute("textContent") or "").strip()
+        return t
+
+    def _record(self, root, attrs) -> dict:
+        out = {}
+        for name, chain in self.fields.items():
+            out[name] = ""
+            for sel in chain:
+                try:
+                    t = self._text(root.find_element(_by(sel), sel))
+                except Exception:
+                    continue
+                if len(t) >= self.min_len.get(name, 1):
+                    out[name] = t
+                    break
+        for a in attrs:
+            try:
+                out["@" + a] = root.get_attribute(a) or ""
+            except Exception:
+                out["@" + a] = ""
+        return out
+
+    def resolve_by_elements(self, driver, spec: dict) -> list[dict]:
+        if not self.blocks:
+            return [self._record(driver, [])]
+        blocks = []
+        for sel in self.blocks:
+            try:
+                blocks = driver.find_elements(_by(sel), sel)
+                if blocks: break
+            except Exception:
+                continue
+        limit = spec["limit"]
+        return [self._record(b, spec["attrs"]) for b in (blocks[:limit] if limit else blocks)]
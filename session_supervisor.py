@@ -0,0 +1,191 @@
+# session_supervisor.py
+# Browser session health monitoring + automatic recycling.
+#
+# SupervisedDriver wraps a WebDriver and is passed to the scrapers in its place. Every
+# driver.get() is timed; every `sample_every` navigations it samples the resident memory of the
+# browser's process tree (browser + renderers + GPU, via psutil), CDP Performance.getMetrics (JS heap)
+# and Memory.getDOMCounters (documents / nodes / listeners). Before a navigation, the session is
+# recycled when
+#   - navigations since the last recycle >= max_navigations, or
+#   - browser process memory (RSS) >= max_browser_mb, or
+#   - JS heap used >= max_heap_mb, or
+#   - median navigation latency has grown by latency_growth× over the session's first window.
+# Recycling = copy all cookies (Network.getAllCookies), quit(), build a new session, run the
+# bootstrap callback (locale / popups), restore cookies. Callers keep using the same object.
+#
+# Recycle events and memory samples are printed and, with log_path, appended as JSON Lines.
+#
+# The browser process is the one listening on the session's DevTools port (chromedriver's
+# goog:chromeOptions.debuggerAddress capability, or the CDP endpoint), so it must run on this host;
+# without psutil or for a remote browser there is no RSS sample and max_browser_mb never triggers.
+
+import json
+import statistics
+import time
+from datetime import datetime
+
+def browser_rss_mb(driver) -> float | None:
+    """Resident memory of the browser process tree behind driver, in MB; None when it cannot be measured."""
+    try:
+        import psutil  # optional: process memory sampling for --max_browser_mb
+        address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        port = int(address.rsplit(":", 1)[1])
+        pid = next(c.pid for c in psutil.net_connections("tcp")
+                   if c.status == psutil.CONN_LISTEN and c.laddr.port == port and c.pid)
+        browser = psutil.Process(pid)
+        rss = 0
+        for proc in [browser, *browser.children(recursive=True)]:
+            try:
+                rss += proc.memory_info().rss
+            except psutil.Error:  # a renderer that exited meanwhile
+                pass
+        return round(rss / 1e6, 1)
+    except Exception:
+        return None
+
+class SupervisedDriver:
+    def __init__(self, build, bootstrap=None, max_navigations=0, max_browser_mb=0.0, max_heap_mb=0.0,
+                 latency_growth=0.0, latency_window=10, sample_every=10, log_path=None):
+        self._build = build
+        self._bootstrap = bootstrap
+        self.max_navigations = max_navigations
+        self.max_browser_mb = max_browser_mb
+        self.max_heap_mb = max_heap_mb
+        self.latency_growth = latency_growth
+        self.latency_window = latency_window
+        self.sample_every = max(1, sample_every)
+        self.log_path = log_path
+        self.recycles = 0
+        self.total_navigations = 0
+        self.driver = None
+        self._start_session()
+
+    # everything not overridden goes to the live session
+    def __getattr__(self, name):
+        driver = self.__dict__.get("driver")
+        if driver is None:
+            raise AttributeError(name)
+        return getattr(driver, name)
+
+    # -------------------- session lifecycle --------------------
+    def _start_session(self, cookies=None):
+        self.driver = self._build()
+        self.navigations = 0
+        self.latencies: list[float] = []
+        self.last_heap_mb = 0.0
+        self.last_browser_mb = 0.0
+        try:
+            self.driver.execute_cdp_cmd("Performance.enable", {})
+        except Exception:
+            pass
+        if cookies:
+            self._restore_cookies(cookies)
+        if self._bootstrap:
+            self._bootstrap(self.driver)
+
+    def _export_cookies(self) -> list[dict]:
+        try:
+            return self.driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        except Exception:
+            try:
+                return self.driver.get_cookies()
+            except Exception:
+                return []
+
+    def _restore_cookies(self, cookies: list[dict]):
+        try:
+            keep = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+            self.driver.execute_cdp_cmd("Network.setCookies", {
+                "cookies": [{k: c[k] for k in keep if k in c} for c in cookies]
+            })
+        except Exception as e:
+            print(f"    ✗ Cookie restore failed (continuing with a fresh jar): {e}")
+
+    def recycle(self, reason: str):
+        cookies = self._export_cookies()
+        self._log("recycle", reason=reason, cookies=len(cookies))
+        print(f"↻ Recycling browser session ({reason}); carrying over {len(cookies)} cookies")
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.recycles += 1
+        self._start_session(cookies=cookies)
+
+    # -------------------- health checks --------------------
+    def sample(self) -> dict:
+        sample = {"navigations": self.navigations}
+        rss = browser_rss_mb(self.driver)
+        if rss is not None:
+            sample["browser_rss_mb"] = rss
+        try:
+            metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])
+            m = {x["name"]: x["value"] for x in metrics}
+            sample["js_heap_used_mb"] = round(m.get("JSHeapUsedSize", 0) / 1e6, 1)
+            sample["js_heap_total_mb"] = round(m.get("JSHeapTotalSize", 0) / 1e6, 1)
+        except Exception:
+            pass
+        try:
+            counters = self.driver.execute_cdp_cmd("Memory.getDOMCounters", {})
+            sample.update({"documents": counters.get("documents"), "nodes": counters.get("nodes"),
+                           "listeners": counters.get("jsEventListeners")})
+        except Exception:
+            pass
+        if self.latencies:
+            sample["nav_p50_s"] = round(statistics.median(self.latencies[-self.latency_window:]), 2)
+        self.last_heap_mb = sample.get("js_heap_used_mb", 0.0)
+        self.last_browser_mb = sample.get("browser_rss_mb", 0.0)
+        self._log("memory", **sample)
+        print(f"  · session health: rss={sample.get('browser_rss_mb', '?')}MB heap={sample.get('js_heap_used_mb', '?')}MB "
+              f"nodes={sample.get('nodes', '?')} nav={self.navigations} p50={sample.get('nav_p50_s', '?')}s")
+        return sample
+
+    def _recycle_reason(self) -> str | None:
+        if self.max_navigations and self.navigations >= self.max_navigations:
+            return f"{self.navigations} navigations"
+        if self.max_browser_mb and self.last_browser_mb >= self.max_browser_mb:
+            return f"browser memory {self.last_browser_mb:.0f}MB >= {self.max_browser_mb:.0f}MB"
+        if self.max_heap_mb and self.last_heap_mb >= self.max_heap_mb:
+            return f"JS heap {self.last_heap_mb:.0f}MB >= {self.max_heap_mb:.0f}MB"
+        w = self.latency_window
+        if self.latency_growth and len(self.latencies) >= 2 * w:
+            first = statistics.median(self.latencies[:w])
+            recent = statistics.median(self.latencies[-w:])
+            if first > 0 and recent / first >= self.latency_growth:
+                return f"navigation p50 {first:.1f}s -> {recent:.1f}s"
+        return None
+
+    # -------------------- navigation hook --------------------
+    def maybe_recycle(self) -> bool:
+        """Recycle now if a threshold is reached (get() does this first); True if the session was replaced."""
+        reason = self._recycle_reason()
+        if reason:
+            self.recycle(reason)
+        return bool(reason)
+
+    def get(self, url):
+        self.maybe_recycle()
+        t0 = time.perf_counter()
+        try:
+            return self.driver.get(url)
+        finally:
+            self.count_navigation(time.perf_counter() - t0)
+
+    def count_navigation(self, latency: float | None = None):
+        """
+        Count a page visit that did not go through get() (e.g. a page_prefetch tab switch), so
+        max_navigations still applies; latency None keeps it out of the latency_growth window.
+        """
+        if latency is not None:
+            self.latencies.append(latency)
+        self.navigations += 1
+        self.total_navigations += 1
+        if self.navigations % self.sample_every == 0:
+            self.sample()
+
+    def _log(self, event: str, **fields):
+        if not self.log_path:
+            return
+        rec = {"ts": datetime.now().isoformat(timespec="seconds"), "event": event, "session": self.recycles, **fields}
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
@@ -0,0 +1,157 @@
+# structured_data.py
+# Structured-data fast path: every JSON-LD block and Amazon page-state blob of a page in one
+# execute_script, mapped to our output columns. Callers use DOM selectors only for what is missing.
+#
+#   blob = read_structured_data(driver)          # {"ld": [...], "state": {key: obj}, "price_data": [...]}
+#   amazon_product_fields(blob)  -> {"title", "price", "overall_rating", "num_ratings", "availability", "image_url"}
+#   listing_rows(blob)           -> [{"Title", "Price", "URL", "Image_URL"}]   (schema.org ItemList, e.g. eBay SERP)
+#
+# Sources:
+#   <script type="application/ld+json">          schema.org Product / Offer / AggregateRating / ItemList
+#   <script type="a-state" data-a-state='{"key": ...}'>   Amazon page state, keyed by its a-state key
+#   .twister-plus-buying-options-price-data      Amazon buy-box price JSON ([{"displayPrice": "$19.99", ...}])
+# Values are formatted like the DOM text they replace ("4.5 out of 5 stars", "1,234 ratings", "$19.99"),
+# so normalize.py parses either source the same way.
+
+STRUCTURED_JS = r"""
+const out = {ld: [], state: {}, price_data: []};
+for (const s of document.querySelectorAll('script[type="application/ld+json"]')) {
+  let data; try { data = JSON.parse(s.textContent); } catch (e) { continue; }
+  for (const d of [].concat(data, (data && data['@graph']) || [])) if (d && typeof d === 'object') out.ld.push(d);
+}
+for (const s of document.querySelectorAll('script[type="a-state"]')) {
+  try {
+    const key = JSON.parse(s.getAttribute('data-a-state') || '{}').key;
+    if (key) out.state[key] = JSON.parse(s.textContent);
+  } catch (e) {}
+}
+for (const el of document.querySelectorAll('.twister-plus-buying-options-price-data')) {
+  try { out.price_data = out.price_data.concat(JSON.parse(el.textContent)); } catch (e) {}
+}
+return out;
+"""
+
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "INR": "₹", "KRW": "₩"}
+# Field names seen in Amazon a-state blobs, searched recursively when JSON-LD lacks a value
+STATE_KEYS = {"price": ("displayPrice", "priceToPay"), "overall_rating": ("averageStarRating", "averageOverallRating"),
+              "num_ratings": ("totalRatingCount", "totalReviewCount")}
+# Only blobs whose a-state key names the product's own buy box / price block / review summary are
+# searched (case-insensitive substrings); carousel, sponsored and "similar items" blobs carry the same
+# field names for other products.
+STATE_BLOBS = {"price": ("buybox", "buy-box", "coreprice", "apex", "twister", "turbo-checkout"),
+               "overall_rating": ("acr", "averagecustomerreviews", "cr-summary"),
+               "num_ratings": ("acr", "averagecustomerreviews", "cr-summary")}
+
+def read_structured_data(driver) -> dict:
+    """One round trip; an empty blob if the script fails (callers then use the DOM for everything)."""
+    try:
+        blob = driver.execute_script(STRUCTURED_JS)
+    except Exception:
+        blob = None
+    return blob if isinstance(blob, dict) else {"ld": [], "state": {}, "price_data": []}
+
+# -------------------- helpers --------------------
+def ld_items(blob: dict, type_name: str) -> list[dict]:
+    return [d for d in blob.get("ld") or [] if type_name in str(d.get("@type", ""))]
+
+def product_state(state: dict, field: str) -> list:
+    """The a-state blobs that may hold field for this product (see STATE_BLOBS), in page order."""
+    return [obj for key, obj in state.items() if any(frag in key.lower() for frag in STATE_BLOBS[field])]
+
+def find_value(obj, names: tuple, depth: int = 0):
+    """First non-empty scalar stored under any of names, searching dicts/lists depth-first."""
+    if depth > 8:
+        return None
+    if isinstance(obj, dict):
+        for n in names:
+            v = obj.get(n)
+            if v not in (None, "", [], {}) and not isinstance(v, (dict, list)):
+                return v
+        children = obj.values()
+    elif isinstance(obj, list):
+        children = obj
+    else:
+        return None
+    for child in children:
+        v = find_value(child, names, depth + 1)
+        if v is not None:
+            return v
+    return None
+
+def format_price(amount, currency: str = "") -> str:
+    if amount in (None, ""):
+        return ""
+    try:
+        amount = f"{float(amount):,.2f}"
+    except (TypeError, ValueError):
+        return str(amount)
+    symbol = CURRENCY_SYMBOLS.get((currency or "USD").upper())
+    return f"{symbol}{amount}" if symbol else f"{currency} {amount}"
+
+def format_rating(value) -> str:
+    try:
+        return f"{float(value):.1f} out of 5 stars"
+    except (TypeError, ValueError):
+        return ""
+
+def format_count(value) -> str:
+    try:
+        return f"{int(float(str(value).replace(',', ''))):,} ratings"
+    except (TypeError, ValueError):
+        return ""
+
+def first_offer(d: dict) -> dict:
+    offers = d.get("offers") or {}
+    if isinstance(offers, dict) and "offers" in offers:  # AggregateOffer
+        offers = offers["offers"] or offers
+    offer = offers[0] if isinstance(offers, list) and offers else offers
+    return offer if isinstance(offer, dict) else {}
+
+def image_of(d: dict) -> str:
+    img = d.get("image")
+    img = img[0] if isinstance(img, list) and img else img
+    if isinstance(img, dict):
+        img = img.get("url") or img.get("contentUrl")
+    return img if isinstance(img, str) else ""
+
+# -------------------- mappings --------------------
+def amazon_product_fields(blob: dict) -> dict:
+    """Product page fields from JSON-LD, then the buy-box price data, then product a-state blobs; '' when absent."""
+    out = {"title": "", "price": "", "overall_rating": "", "num_ratings": "", "availability": "", "image_url": ""}
+    for d in ld_items(blob, "Product"):
+        offer = first_offer(d)
+        agg = d.get("aggregateRating") or {}
+        out["title"] = out["title"] or str(d.get("name") or "").strip()
+        out["price"] = out["price"] or format_price(offer.get("price") or offer.get("lowPrice"),
+                                                    offer.get("priceCurrency", ""))
+        out["availability"] = out["availability"] or str(offer.get("availability") or "").rsplit("/", 1)[-1]
+        out["overall_rating"] = out["overall_rating"] or format_rating(agg.get("ratingValue"))
+        out["num_ratings"] = out["num_ratings"] or format_count(agg.get("ratingCount") or agg.get("reviewCount"))
+        out["image_url"] = out["image_url"] or image_of(d)
+    if not out["price"]:
+        for p in blob.get("price_data") or []:
+            if isinstance(p, dict) and p.get("displayPrice") and p.get("buyingOptionType", "NEW") == "NEW":
+                out["price"] = str(p["displayPrice"]).strip()
+                break
+    state = blob.get("state") or {}
+    for field, fmt in (("price", str), ("overall_rating", format_rating), ("num_ratings", format_count)):
+        if not out[field]:
+            v = find_value(product_state(state, field), STATE_KEYS[field])
+            out[field] = fmt(v).strip() if v is not None else ""
+    return out
+
+def listing_rows(blob: dict) -> list[dict]:
+    """Result rows from a schema.org ItemList (ListItem.item = Product with url/name/offers)."""
+    rows = []
+    for lst in ld_items(blob, "ItemList"):
+        for el in lst.get("itemListElement") or []:
+            item = el.get("item", el) if isinstance(el, dict) else {}
+            if not isinstance(item, dict):
+                continue
+            url, title = item.get("url") or el.get("url") or "", str(item.get("name") or "").strip()
+            if not (url and title):
+                continue
+            offer = first_offer(item)
+            rows.append({"Title": title, "Price": format_price(offer.get("price"), offer.get("priceCurrency", "")),
+                         "URL": url, "Image_URL": image_of(item)})
+    return rows
@@ -0,0 +1,31 @@
+from Selenium_Amazon import FIELD_STAGES
+from field_plan import FieldPlan
+
+ROW = {"Product_Number": 1, "Title": "Hub", "Price": "$19.99", "URL": "u", "ASIN": "B000000001",
+       "Overall_Rating": "4.4", "Number_of_Ratings": "1,234", "Review_1": "a", "Review_2": "b",
+       "All_Reviews_Concat": "a | b", "Domestic_Reviews_Count": 2, "Avg_Review_Rating": 4.5,
+       "Foreign_Review_1": "c", "Price_uk": "£18", "Price_de": "17 €", "Overall_Rating_uk": "4.3",
+       "Warranty_Text": ""}
+
+def test_no_fields_runs_every_stage_and_keeps_the_row():
+    plan = FieldPlan(FIELD_STAGES, None)
+    assert all(plan.needs(s) for s in FIELD_STAGES)
+    assert plan.project(ROW) is ROW and plan.describe() == "all stages"
+
+def test_columns_select_only_their_stages_in_request_order():
+    plan = FieldPlan(FIELD_STAGES, "Price, Title,Overall_Rating")
+    assert plan.needs("tile") and plan.needs("rating")
+    assert not plan.needs("link", "warranty", "reviews", "foreign_reviews", "marketplaces")
+    assert list(plan.project(ROW).items()) == [("Price", "$19.99"), ("Title", "Hub"), ("Overall_Rating", "4.4")]
+
+def test_patterns_match_columns_and_stage_column_patterns():
+    plan = FieldPlan(FIELD_STAGES, "Review_*,Price_??")
+    assert plan.needs("reviews") and plan.needs("marketplaces")
+    assert not plan.needs("foreign_reviews") and not plan.needs("tile")  # Review_* is not Foreign_Review_*
+    assert list(plan.project(ROW)) == ["Review_1", "Review_2", "Price_uk", "Price_de"]
+
+def test_stage_names_expand_to_every_column_of_the_stage():
+    plan = FieldPlan(FIELD_STAGES, ["rating", "marketplaces", "Bogus_Column"])
+    assert plan.unknown == ["Bogus_Column"]
+    assert plan.describe() == "rating, marketplaces"
+    assert list(plan.project(ROW)) == ["Overall_Rating", "Number_of_Ratings", "Price_uk", "Price_de", "Overall_Rating_uk"]
@@ -0,0 +1,60 @@
+import Selenium_Amazon as amz
+from benchmarks.bench_orchestration import AmazonFixtures, VirtualClock
+from fake_driver import FakeDriver
+from marketplace_fanout import fetch_marketplaces
+
+ASIN = AmazonFixtures.asin(1)
+FIELDS = {"url", "price", "overall_rating", "num_ratings", "availability", "reviews"}
+
+def read_page(driver, max_reviews):
+    if ".de/" in driver.current_url:
+        raise TimeoutError("page did not load")
+    return amz.read_marketplace_page(driver, max_reviews)
+
+class CDPStandIn(FakeDriver):
+    """A driver with new_driver(), so fetch_marketplaces takes the one-tab-driver-per-marketplace path."""
+
+    def __init__(self, pages, fail_url=""):
+        super().__init__(pages)
+        self.fail_url = fail_url
+        self.tabs = []
+
+    def new_driver(self, lightweight=False):
+        tab = CDPStandIn(self.pages, self.fail_url)
+        tab.closed = False
+        self.tabs.append(tab)
+        return tab
+
+    def get(self, url):
+        if url == self.fail_url:
+            raise ConnectionError("tab crashed")
+        super().get(url)
+
+    def close(self):
+        self.closed = True
+
+def check(results):
+    assert list(results) == ["uk", "de", "jp"]
+    assert results["de"] == {"url": f"https://www.amazon.de/dp/{ASIN}", "price": "", "overall_rating": "",
+                             "num_ratings": "", "availability": "", "reviews": [], "error": results["de"]["error"]}
+    for code in ("uk", "jp"):
+        assert FIELDS <= set(results[code]) and "error" not in results[code]
+        assert results[code]["price"] == "$19.99" and results[code]["url"].endswith(f"/dp/{ASIN}")
+
+def test_failed_marketplace_tab_gives_an_error_row_and_the_others_still_load():
+    driver = FakeDriver(AmazonFixtures(reviews_per_page=3))
+    driver.get(f"https://www.amazon.com/dp/{ASIN}")
+    origin = driver.current_window_handle
+    with VirtualClock():
+        results = fetch_marketplaces(driver, ASIN, ["uk", "de", "jp"], read_page, amz.wait_for_page_load,
+                                     max_reviews=2, max_parallel=2)
+    check(results)
+    assert results["de"]["error"] == "page did not load"
+    assert driver.current_window_handle == origin and driver.current_url.endswith(f"/dp/{ASIN}")
+
+def test_failed_marketplace_on_the_cdp_path():
+    driver = CDPStandIn(AmazonFixtures(reviews_per_page=3), fail_url=f"https://www.amazon.de/dp/{ASIN}")
+    results = fetch_marketplaces(driver, ASIN, ["uk", "de", "jp"], amz.read_marketplace_page, amz.wait_for_page_load)
+    check(results)
+    assert results["de"]["error"] == "tab crashed"
+    assert len(driver.tabs) == 3 and all(tab.closed for tab in driver.tabs)
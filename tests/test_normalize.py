@@ -0,0 +1,28 @@
+import pandas as pd
+
+from normalize import normalize_reviews, parse_review_date
+from review_index import parse_date
+
+def test_parse_review_date_month_and_day_first():
+    parsed = parse_review_date(pd.Series([
+        "Reviewed in the United States on March 3, 2024",
+        "Reviewed in the United Kingdom on 3 March 2024",
+        "Reviewed in Germany on 14 February 2023",
+        "not a date",
+    ]))
+    assert parsed["date"].dt.strftime("%Y-%m-%d").tolist()[:3] == ["2024-03-03", "2024-03-03", "2023-02-14"]
+    assert pd.isna(parsed["date"].iloc[3])
+    assert parsed["origin_country"].tolist()[:3] == ["United States", "United Kingdom", "Germany"]
+
+def test_normalize_reviews_day_first_row():
+    df = normalize_reviews(pd.DataFrame({
+        "Review_Rating": ["5.0 out of 5 stars"], "Review_Date": ["Reviewed in the United Kingdom on 3 March 2024"],
+        "Origin_Country": [""],
+    }))
+    assert df["Review_Date_Value"].iloc[0] == pd.Timestamp("2024-03-03")
+    assert df["Origin_Country"].iloc[0] == "United Kingdom"
+
+def test_review_index_parse_date_day_first():
+    assert parse_date("Reviewed in the United States on March 3, 2025") == "2025-03-03"
+    assert parse_date("Reviewed in the United Kingdom on 3 March 2025") == "2025-03-03"
+    assert parse_date("yesterday") is None
@@ -0,0 +1,50 @@
+from fake_driver import FakeDriver
+from page_prefetch import PrefetchingDriver
+from session_supervisor import SupervisedDriver
+
+URLS = [f"https://www.amazon.com/dp/B00000000{i}" for i in range(1, 6)]
+PAGES = {u: f"<html><head><title>{u[-10:]}</title></head><body></body></html>" for u in URLS}
+
+def crawl(driver, urls):
+    titles = []
+    for i, url in enumerate(urls):
+        driver.prefetch(urls[i + 1:])
+        driver.get(url)
+        titles.append(driver.title)
+    return titles
+
+def test_every_prefetched_page_is_a_hit_and_never_navigates_the_working_tab():
+    fake = FakeDriver(PAGES)
+    driver = PrefetchingDriver(fake, depth=2)
+    assert crawl(driver, URLS) == [u[-10:] for u in URLS]
+    assert fake.commands["get"] == 1  # only the first page; the rest were switched to
+    assert driver.finish_prefetch() == {"hits": 4, "ready_hits": 4, "misses": 0, "hit_rate": 1.0}
+    assert len(fake.window_handles) == 1
+
+def test_skipped_and_unexpected_pages_are_accounted_separately():
+    fake = FakeDriver(PAGES)
+    driver = PrefetchingDriver(fake, depth=2)
+    driver.prefetch(URLS[1:])              # 2 and 3 start loading
+    driver.get(URLS[2])                    # hit
+    driver.get(URLS[2])                    # revisit: a plain get, neither hit nor miss
+    driver.prefetch(URLS[3:])              # 4 (depth 2: 2 is still open)
+    driver.get("https://www.amazon.com/s?k=hub")  # never prefetched: not counted
+    stats = driver.finish_prefetch()       # 2 and 4 never used: closed, not counted
+    assert (stats["hits"], stats["misses"]) == (1, 0)
+    assert len(fake.window_handles) == 1 and fake.commands["get"] == 2
+
+def test_supervisor_recycles_between_hits_and_the_lost_tabs_are_misses():
+    sessions = []
+
+    def build():
+        sessions.append(FakeDriver(PAGES))
+        return sessions[-1]
+
+    supervisor = SupervisedDriver(build, max_navigations=3, sample_every=100)
+    driver = PrefetchingDriver(supervisor, depth=2)
+    assert crawl(driver, URLS) == [u[-10:] for u in URLS]
+    # 1 get + 2 hits reach max_navigations through count_navigation(); the next get() recycles
+    # first, so the tabs open for pages 4 and 5 go with the old session and both navigate
+    assert driver.finish_prefetch() == {"hits": 2, "ready_hits": 2, "misses": 2, "hit_rate": 0.5}
+    assert supervisor.recycles == 1 and supervisor.total_navigations == 5
+    assert sessions[0].commands["get"] == 1 and sessions[1].commands["get"] == 2
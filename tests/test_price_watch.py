@@ -0,0 +1,46 @@
+import sqlite3
+
+from fake_driver import FakeDriver
+from price_watch import STATE_SCHEMA, diff_and_store, normalize_observation, parse_item, run_watch
+
+ITEM = parse_item("B0C1234567")
+
+def obs(price="$19.99", availability="In Stock", rating="4.5 out of 5 stars", rating_count="1,234 ratings"):
+    return normalize_observation({"title": "USB C Hub", "price": price, "availability": availability,
+                                  "rating": rating, "rating_count": rating_count})
+
+def state(tmp_path):
+    conn = sqlite3.connect(tmp_path / "watch.db")
+    conn.executescript(STATE_SCHEMA)
+    return conn
+
+def test_first_check_is_new_then_only_changes_are_emitted(tmp_path):
+    conn = state(tmp_path)
+    first = diff_and_store(conn, ITEM, obs(), "2026-01-01T00:00:00")
+    assert [(c["Field"], c["New"]) for c in first] == [("new", "$19.99")]
+    assert diff_and_store(conn, ITEM, obs(), "2026-01-02T00:00:00") == []
+    changed = diff_and_store(conn, ITEM, obs(price="$17.49", rating_count="1,240 ratings"), "2026-01-03T00:00:00")
+    assert [(c["Field"], c["Old"], c["New"]) for c in changed] == [("price", "$19.99", "$17.49"),
+                                                                  ("rating_count", "1234", "1240")]
+    row = conn.execute("SELECT price_value, checked_at, changed_at FROM watch_state").fetchone()
+    assert row == (17.49, "2026-01-03T00:00:00", "2026-01-03T00:00:00")
+    assert conn.execute("SELECT COUNT(*) FROM watch_changes").fetchone()[0] == 3
+
+def test_price_compares_by_value_not_formatting(tmp_path):
+    conn = state(tmp_path)
+    diff_and_store(conn, ITEM, obs(price="$1,299.00"), "2026-01-01T00:00:00")
+    assert diff_and_store(conn, ITEM, obs(price="USD 1299"), "2026-01-02T00:00:00") == []
+    assert conn.execute("SELECT changed_at FROM watch_state").fetchone()[0] == "2026-01-01T00:00:00"
+
+def test_run_watch_skips_failed_checks_and_keeps_state(tmp_path):
+    pages = {"https://www.amazon.com/dp/B0C1234567": {"title": "USB C Hub", "price": "$19.99"},
+             "https://www.amazon.com/dp/B0D7654321": {"blocked": True}}
+    driver = FakeDriver(script_handlers=[(r"validateCaptcha", lambda d: pages.get(d.current_url, {}))])
+    items = [ITEM, parse_item("https://www.amazon.com/dp/B0D7654321"), parse_item("B0E0000000")]
+    db = str(tmp_path / "watch.db")
+    changes = run_watch(driver, items, db)
+    assert [(c["Item"], c["Field"]) for c in changes] == [("amazon:B0C1234567", "new")]
+    pages["https://www.amazon.com/dp/B0C1234567"]["price"] = "$18.99"
+    assert [(c["Field"], c["New"]) for c in run_watch(driver, items, db)] == [("price", "$18.99")]
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT item_key FROM watch_state").fetchall() == [("amazon:B0C1234567",)]
@@ -0,0 +1,46 @@
+import csv
+
+from product_match import load_listings, match_listings, title_features
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0]))
+        w.writeheader()
+        w.writerows(rows)
+    return path
+
+def listing(key, title, price=None):
+    return {"key": key, "title": title, "price": price, "currency": None, "url": "", "price_text": ""}
+
+def test_load_listings_with_missing_price(tmp_path):
+    amazon_csv = write_csv(tmp_path / "usb_hub_20250301_101500.csv", [
+        {"ASIN": "B0TEST0001", "Title": "Anker USB C Hub", "URL": "https://www.amazon.com/dp/B0TEST0001",
+         "Price": "Price not available"},
+        {"ASIN": "B0TEST0002", "Title": "Other hub", "URL": "https://www.amazon.com/dp/B0TEST0002", "Price": "$19.99"},
+    ])
+    ebay_csv = write_csv(tmp_path / "ebay_usb_hub_20250301_101500.csv", [
+        {"Title": "Anker USB C Hub", "URL": "https://www.ebay.com/itm/123456789012", "Price": ""},
+    ])
+    amazon, ebay = load_listings([amazon_csv, ebay_csv])
+    assert [(a["key"], a["price"], a["currency"]) for a in amazon] == \
+        [("B0TEST0001", None, None), ("B0TEST0002", 19.99, "USD")]
+    assert [(e["key"], e["price"]) for e in ebay] == [("123456789012", None)]
+
+def test_hyphenated_and_spaced_variants_share_tokens():
+    assert title_features("7-in-1 USB-C Hub")[0] == title_features("7 in 1 USB C Hub")[0] == {"7in1", "usb", "c", "hub"}
+    assert "sdssde61-1t00" in title_features("SanDisk SDSSDE61-1T00 SSD")[0]  # model numbers stay whole too
+
+def test_match_amazon_and_ebay_titles():
+    amazon = [
+        listing("B0AAAA0001", "Anker USB C Hub, 7-in-1 USB-C Adapter with 4K HDMI, 100W Power Delivery, A8346", 35.99),
+        listing("B0AAAA0002", "SanDisk 1TB Extreme Portable SSD - Up to 1050MB/s - USB-C, USB 3.2 Gen 2 - "
+                              "SDSSDE61-1T00-G25", 89.99),
+        listing("B0AAAA0003", "Amazon Basics Lightning to USB A Cable, MFi Certified iPhone Charger, 6 Foot", 8.49),
+    ]
+    ebay = [
+        listing("111", "Anker A8346 7 in 1 USB C Hub Adapter 4K HDMI 100W PD", 32.00),
+        listing("222", "SanDisk Extreme Portable SSD 1TB USB C 3.2 Gen 2 SDSSDE61-1T00-G25 NEW", 84.50),
+        listing("333", "Samsung 990 PRO 2TB PCIe 4.0 NVMe M.2 Internal SSD MZ-V9P2T0B/AM", 169.99),
+    ]
+    pairs = {(r["ASIN"], r["eBay_Item_ID"]) for r in match_listings(amazon, ebay, min_score=0.6)}
+    assert pairs == {("B0AAAA0001", "111"), ("B0AAAA0002", "222")}
@@ -0,0 +1,48 @@
+import pytest
+
+from rank_history import RankHistory
+
+DAYS = {"2025-03-01": [("A", "$10.00"), ("B", "$20.00"), ("C", "$30.00")],
+        "2025-03-02": [("B", "$20.00"), ("A", "$9.50"), ("E", "$5.00")],
+        "2025-03-03": [("A", "$10.00"), ("C", "$30.00"), ("D", "$40.00")]}
+
+@pytest.fixture
+def history(tmp_path):
+    h = RankHistory(str(tmp_path / "ranks.db"))
+    yield h
+    h.close()
+
+def snapshots(history):
+    return {day: [(r["id"], r["position"], r["price"]) for r in history.snapshot("usb hub", day=day)] for day in DAYS}
+
+def expected():
+    return {day: [(i, pos, float(p.strip("$"))) for pos, (i, p) in enumerate(items, 1)] for day, items in DAYS.items()}
+
+def test_in_order_snapshots_store_only_changes(history):
+    for day, items in DAYS.items():
+        history.record("amazon", "USB  Hub", items, day)
+    assert snapshots(history) == expected()
+    assert [p["position"] for p in history.rank_history("usb_hub", "C")] == [3, None, 2]
+    assert history.record("amazon", "usb hub", DAYS["2025-03-03"], "2025-03-04") == 0  # unchanged ranking
+    assert history.stats()["snapshots"] == 4
+
+def test_backfilled_middle_day_keeps_the_following_day_intact(history):
+    history.record("amazon", "usb hub", DAYS["2025-03-01"], "2025-03-01")
+    history.record("amazon", "usb hub", DAYS["2025-03-03"], "2025-03-03")
+    history.record("amazon", "usb hub", DAYS["2025-03-02"], "2025-03-02")  # backfill between the two
+    assert snapshots(history) == expected()
+    assert [(p["date"], p["position"], p["price"]) for p in history.rank_history("usb hub", "A")] == [
+        ("2025-03-01", 1, 10.0), ("2025-03-02", 2, 9.5), ("2025-03-03", 1, 10.0)]
+    assert [p["position"] for p in history.rank_history("usb hub", "E")] == [None, 3, None]
+    assert [p["position"] for p in history.rank_history("usb hub", "C")] == [3, None, 2]
+    assert history.price_history("A") == [{"date": "2025-03-01", "price": 10.0}, {"date": "2025-03-02", "price": 9.5},
+                                          {"date": "2025-03-03", "price": 10.0}]
+
+def test_same_day_rerun_replaces_the_snapshot(history):
+    history.record("amazon", "usb hub", DAYS["2025-03-01"], "2025-03-01")
+    history.record("amazon", "usb hub", DAYS["2025-03-02"], "2025-03-02")
+    history.record("amazon", "usb hub", [("A", "$10.00"), ("B", "$20.00"), ("C", "$30.00")], "2025-03-02")
+    assert [(r["id"], r["position"]) for r in history.snapshot("usb hub", day="2025-03-02")] == [
+        ("A", 1), ("B", 2), ("C", 3)]
+    assert [p["position"] for p in history.rank_history("usb hub", "E")] == [None, None]
+    assert history.stats()["stored_rows"] == 3  # day 2 is identical to day 1 again: no rows
@@ -0,0 +1,32 @@
+from review_dedup import ReviewDeduper
+
+TEXT = ("Solid build quality and the battery easily lasts a full day of use. "
+        "Setup took a few minutes and the manual is clear.")
+
+def rv(text=TEXT, date="Reviewed in the United States on March 3, 2025", review_id="", title="Great"):
+    return {"review_id": review_id, "review_title": title, "review_text": text, "review_date": date}
+
+def test_exact_duplicates_by_id_and_by_normalized_text_on_the_same_date():
+    seen = ReviewDeduper()
+    assert seen.add(rv(review_id="R1"))
+    assert not seen.add(rv(text="something else entirely", review_id="R1"))
+    # global rendering: other title, other country, "Read more", different case / punctuation
+    assert not seen.add(rv(text=TEXT.upper().replace(".", "!") + " Read more", title="",
+                           date="Reviewed in Canada on March 3, 2025"))
+    assert seen.add(rv(date="Reviewed in the United States on March 4, 2025"))  # same text, other day
+    assert seen.dropped == {"id": 1, "exact": 1, "near": 0}
+
+def test_near_duplicates_only_when_enabled():
+    edited = "This review is from: USB C Hub. " + TEXT.replace("a few minutes", "a few short minutes")
+    other = ("Stopped charging after two weeks and support never answered my emails, "
+             "returning it for a refund.")
+    assert ReviewDeduper().filter([rv(), rv(edited), rv(other)]) == [rv(), rv(edited), rv(other)]
+    seen = ReviewDeduper(near_duplicates=True)
+    assert seen.filter([rv(), rv(edited), rv(other)]) == [rv(), rv(other)]
+    assert seen.dropped["near"] == 1
+
+def test_short_texts_are_not_near_matched():
+    seen = ReviewDeduper(near_duplicates=True)
+    assert seen.filter([rv("Great product, works well"), rv("Great product, works very well")]) == [
+        rv("Great product, works well"), rv("Great product, works very well")]
+    assert seen.total_dropped == 0
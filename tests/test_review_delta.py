@@ -0,0 +1,42 @@
+import Selenium_Amazon as amz
+from benchmarks.bench_orchestration import AmazonFixtures, VirtualClock
+from fake_driver import FakeDriver
+from review_delta import KEEP, ReviewDeltaState
+
+ASIN = AmazonFixtures.asin(1)
+URL = f"https://www.amazon.com/product-reviews/{ASIN}/?reviewerType=all_reviews"
+
+def reviews(ids):
+    return [{"review_id": i, "review_title": f"t{i}", "review_text": "x"} for i in ids]
+
+def test_update_keeps_the_newest_keys_ahead_of_the_stored_ones(tmp_path):
+    state = ReviewDeltaState(str(tmp_path / "state.db"))
+    assert state.known_keys(ASIN) == set()
+    state.update(ASIN, reviews([f"R{i:03d}" for i in range(15, 0, -1)]))   # R015 .. R001, newest first
+    state.update(ASIN, reviews([f"R{i:03d}" for i in range(25, 14, -1)]))  # R025 .. R015, overlaps R015
+    known = state.known_keys(ASIN)
+    assert len(known) == KEEP == 20
+    assert known == {f"R{i:03d}" for i in range(25, 5, -1)}  # R025 .. R006; the oldest dropped
+    state.update(ASIN, [])  # nothing new: stored keys stay
+    assert state.known_keys(ASIN) == known
+    assert state.conn.execute("SELECT total_seen FROM review_state").fetchone()[0] == 26
+    state.close()
+
+def test_review_pages_stop_at_the_first_known_review():
+    fx = AmazonFixtures(reviews_per_page=10, review_pages=5)
+    known = {f"R{ASIN}{2:04d}{3:03d}", f"R{ASIN}{4:04d}{0:03d}"}  # 4th review on page 2, and an older one
+    driver = FakeDriver(fx)
+    with VirtualClock():
+        got = amz.scrape_full_reviews_from_reviews_page(driver, URL, max_pages=5, known_keys=known)
+    assert len(got) == 13
+    assert [rv.review_id for rv in got[-3:]] == [f"R{ASIN}{2:04d}{k:03d}" for k in range(3)]
+    assert "pageNumber=2" in driver.current_url  # page 3 never requested
+
+def test_first_run_reads_everything_and_next_run_nothing(tmp_path):
+    state = ReviewDeltaState(str(tmp_path / "state.db"))
+    driver = FakeDriver(AmazonFixtures(reviews_per_page=10, review_pages=3))
+    with VirtualClock():
+        first = amz.scrape_full_reviews_from_reviews_page(driver, URL, max_pages=5, known_keys=state.known_keys(ASIN))
+        state.update(ASIN, first)
+        again = amz.scrape_full_reviews_from_reviews_page(driver, URL, max_pages=5, known_keys=state.known_keys(ASIN))
+    assert len(first) == 30 and again == []
@@ -0,0 +1,28 @@
+import csv
+
+from review_index import ReviewIndex, expand
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0]))
+        w.writeheader()
+        w.writerows(rows)
+
+def test_product_and_reviews_tables_of_one_run(tmp_path):
+    text = "Gets hot and overheats after an hour"
+    write_csv(tmp_path / "usb_hub_20250301_101500.csv",
+              [{"ASIN": "B0TEST0001", "Title": "Hub", "All_Reviews_Concat": f"{text} ||| Works fine"}])
+    write_csv(tmp_path / "usb_hub_20250301_101500_reviews.csv",
+              [{"ASIN": "B0TEST0001", "Source": "domestic", "Review_Title": "Too hot", "Review_Text": text,
+                "Review_Rating": "1.0 out of 5 stars",
+                "Review_Date": "Reviewed in the United States on March 3, 2025", "Origin_Country": ""}])
+
+    index = ReviewIndex(str(tmp_path / "reviews.db"))
+    paths = expand([str(tmp_path / "*.csv")])
+    assert paths[0].name == "usb_hub_20250301_101500.csv"  # the text-only copy is read first
+    assert index.ingest(paths) == 2
+
+    hits = index.search("overheat*", max_rating=2)
+    assert [(h["rating"], h["review_date"], h["country"], h["title"]) for h in hits] == \
+        [(1.0, "2025-03-03", "United States", "Too hot")]
+    assert index.search("hot", query="usb hub")  # the filled-in title is searchable
@@ -0,0 +1,51 @@
+import json
+
+import pandas as pd
+import pytest
+
+from normalize import normalize_reviews
+from review_stream import Review, ReviewSink, review_row
+
+def rows():
+    reviews = [
+        Review("Good", "Works", "5.0 out of 5 stars", "Reviewed in the United States on March 3, 2025"),
+        Review("Meh", "Okay", "3.0 out of 5 stars", "Reviewed in the United States on March 4, 2025"),
+        Review("Bien", "Funciona", "4,0 de 5 estrellas", "Revisado en México el 5 de marzo de 2025", "Mexico"),
+        Review("No stars", "Text only", "", ""),  # a batch with no parseable rating or date
+        Review("Late", "Last one", "1.0 out of 5 stars", "Reviewed in Canada on April 1, 2025", "Canada"),
+    ]
+    return [review_row(rv, "B000000001", 1, "domestic" if i < 3 else "global") for i, rv in enumerate(reviews)]
+
+def test_parquet_batches_share_the_first_batch_schema(tmp_path):
+    pytest.importorskip("pyarrow")
+    flushed = []
+    sink = ReviewSink(tmp_path / "r.parquet", "parquet", normalize=normalize_reviews, batch_size=2,
+                      on_flush=flushed.append)
+    sink.extend(rows()[:3])
+    assert flushed == [2] and sink.rows == 2
+    sink.extend(rows()[3:])
+    assert sink.close() == tmp_path / "r.parquet"
+    assert flushed == [2, 2, 1]
+    df = pd.read_parquet(tmp_path / "r.parquet")
+    assert len(df) == 5 and list(df.columns) == list(normalize_reviews(pd.DataFrame(rows()[:2])).columns)
+    assert df["Review_Rating_Value"].tolist()[:3] == [5.0, 3.0, 4.0]
+    assert pd.isna(df["Review_Rating_Value"][3]) and df["Review_Rating_Value"][4] == 1.0
+    assert df["Origin_Country"].tolist()[2::2] == ["Mexico", "Canada"]
+
+def test_csv_writes_one_header_and_appends_batches(tmp_path):
+    sink = ReviewSink(tmp_path / "r.csv", "csv", batch_size=2)
+    sink.extend(rows())
+    sink.close()
+    lines = (tmp_path / "r.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[0].startswith("Product_Number,ASIN,Source,Review_Title") and len(lines) == 6
+    df = pd.read_csv(tmp_path / "r.csv", keep_default_na=False)
+    assert df["Review_Title"].tolist() == ["Good", "Meh", "Bien", "No stars", "Late"]
+
+def test_jsonl_and_empty_sink(tmp_path):
+    sink = ReviewSink(tmp_path / "r.jsonl", "jsonl", batch_size=10)
+    sink.extend(rows())
+    assert not (tmp_path / "r.jsonl").exists()  # still buffered
+    sink.close()
+    assert [json.loads(x)["Review_Text"] for x in open(tmp_path / "r.jsonl", encoding="utf-8")][-1] == "Last one"
+    assert ReviewSink(tmp_path / "none.csv").close() is None
+    assert not (tmp_path / "none.csv").exists()
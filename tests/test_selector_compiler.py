@@ -0,0 +1,54 @@
+import pytest
+
+from fake_driver import FakeDriver
+from selector_compiler import SelectorChains
+
+PAGE = """<html><body>
+<div class="review" id="R1"><a data-hook="review-title"><span>First</span></a>
+  <span data-hook="review-body"><span>Great hub, works with every laptop.</span></span></div>
+<div class="review" id="R2"><span class="alt-title">Second</span>
+  <span data-hook="review-body"><span>ok</span></span><div class="long-body">Fine after a firmware update.</div></div>
+<div class="review" id="R3"><span data-hook="review-body"></span></div>
+<div id="warranty"><h4>Warranty</h4><p>1 year</p></div>
+</body></html>"""
+
+REVIEWS = SelectorChains({"title": ['.//a[@data-hook="review-title"]/span', ".alt-title"],
+                          "text": ['.//span[@data-hook="review-body"]/span', "div.long-body"]},
+                         blocks=['//div[@data-hook="review"]', "div.review"],
+                         min_len={"text": 5}, attrs=["id"])
+
+def drivers():
+    js = FakeDriver({"https://x/": PAGE})
+    # a driver whose execute_script cannot run the resolver (returns None) takes the element walk
+    elements = FakeDriver({"https://x/": PAGE}, script_handlers=[(r"resolveChains", lambda d, spec: None)])
+    for d in (js, elements):
+        d.get("https://x/")
+        d.reset_counters()
+    return js, elements
+
+EXPECTED = [{"title": "First", "text": "Great hub, works with every laptop.", "@id": "R1"},
+            {"title": "Second", "text": "Fine after a firmware update.", "@id": "R2"},  # "ok" is below min_len
+            {"title": "", "text": "", "@id": "R3"}]
+
+def test_js_resolver_and_element_fallback_agree():
+    js, elements = drivers()
+    assert REVIEWS.resolve(js) == EXPECTED
+    assert REVIEWS.resolve(elements) == EXPECTED
+    assert js.round_trips == 1
+    assert elements.round_trips > 10 and elements.commands["execute_script"] == 1
+
+@pytest.mark.parametrize("which", [0, 1])
+def test_limit_attrs_and_document_records(which):
+    driver = drivers()[which]
+    assert REVIEWS.resolve(driver, limit=2, attrs=[]) == [{k: v for k, v in r.items() if k != "@id"}
+                                                         for r in EXPECTED[:2]]
+    warranty = SelectorChains({"heading": ["#warranty h4"], "text": ["#warranty .missing", "#warranty p"]})
+    assert warranty.resolve(driver) == [{"heading": "Warranty", "text": "1 year"}]
+    assert SelectorChains({"x": [".nothing"]}, blocks=[".none", "//nav"]).resolve(driver) == []
+
+def test_execute_script_error_falls_back_to_elements():
+    def boom(driver, spec):
+        raise RuntimeError("javascript error")
+    driver = FakeDriver({"https://x/": PAGE}, script_handlers=[(r"resolveChains", boom)])
+    driver.get("https://x/")
+    assert REVIEWS.resolve(driver) == EXPECTED
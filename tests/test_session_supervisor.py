@@ -0,0 +1,63 @@
+import socket
+import subprocess
+import sys
+
+import pytest
+
+import session_supervisor
+from fake_driver import FakeDriver
+from session_supervisor import SupervisedDriver, browser_rss_mb
+
+PAGES = {f"https://example.com/{i}": f"<html><body>{i}</body></html>" for i in range(6)}
+
+class DevToolsDriver(FakeDriver):
+    def __init__(self, port, **kwargs):
+        super().__init__(PAGES, **kwargs)
+        self.capabilities = {"browserName": "chrome", "goog:chromeOptions": {"debuggerAddress": f"127.0.0.1:{port}"}}
+
+def test_browser_rss_sums_the_process_listening_on_the_devtools_port():
+    pytest.importorskip("psutil")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    # stand-in "browser": listens on the port and keeps a child process alive
+    browser = subprocess.Popen([sys.executable, "-c",
+        "import socket, subprocess, sys, time\n"
+        f"s = socket.socket(); s.bind(('127.0.0.1', {port})); s.listen()\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        "print('ready', flush=True); time.sleep(60)"], stdout=subprocess.PIPE, text=True)
+    try:
+        assert browser.stdout.readline().strip() == "ready"
+        rss = browser_rss_mb(DevToolsDriver(port))
+        assert rss is not None and rss > 1
+        assert browser_rss_mb(FakeDriver(PAGES)) is None  # no debuggerAddress capability
+    finally:
+        import psutil
+        for proc in psutil.Process(browser.pid).children(recursive=True):
+            proc.kill()
+        browser.kill()
+        browser.wait()
+
+def test_recycles_when_browser_memory_exceeds_threshold(monkeypatch):
+    rss = iter([300.0, 900.0, 200.0])
+    monkeypatch.setattr(session_supervisor, "browser_rss_mb", lambda driver: next(rss))
+    built = []
+
+    def build():
+        built.append(FakeDriver(PAGES))
+        return built[-1]
+
+    driver = SupervisedDriver(build, max_browser_mb=800, sample_every=2)
+    for i in range(6):
+        driver.get(f"https://example.com/{i}")
+    # samples after navigations 2 (300MB) and 4 (900MB); the 5th get() recycles first and
+    # the new session's first sample (200MB) stays under the threshold
+    assert driver.recycles == 1 and len(built) == 2
+    assert driver.last_browser_mb == 200.0 and driver.total_navigations == 6
+
+def test_navigation_and_heap_limits_still_apply_without_psutil(monkeypatch):
+    monkeypatch.setattr(session_supervisor, "browser_rss_mb", lambda driver: None)
+    driver = SupervisedDriver(lambda: FakeDriver(PAGES), max_navigations=3, max_browser_mb=1)
+    for i in range(6):
+        driver.get(f"https://example.com/{i}")
+    assert driver.recycles == 1
@@ -0,0 +1,17 @@
+from structured_data import amazon_product_fields
+
+def blob(state):
+    return {"ld": [], "price_data": [], "state": state}
+
+def test_state_fields_come_from_product_blobs_only():
+    fields = amazon_product_fields(blob({
+        "sp-carousel-state": {"items": [{"displayPrice": "$5.00", "averageStarRating": 3.1, "totalRatingCount": 10}]},
+        "desktop-buybox-state": {"offer": {"priceToPay": "$19.99"}},
+        "acrPopover": {"averageStarRating": 4.6, "totalRatingCount": "1,234"},
+    }))
+    assert (fields["price"], fields["overall_rating"], fields["num_ratings"]) == \
+        ("$19.99", "4.6 out of 5 stars", "1,234 ratings")
+
+def test_other_products_blobs_are_ignored():
+    fields = amazon_product_fields(blob({"sims-carousel": {"displayPrice": "$5.00", "averageStarRating": 3.1}}))
+    assert fields["price"] == "" and fields["overall_rating"] == ""
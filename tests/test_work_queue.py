@@ -0,0 +1,76 @@
+import pytest
+
+from work_queue import WorkQueue, open_queue
+
+@pytest.fixture
+def queue(tmp_path):
+    return open_queue(f"sqlite:///{tmp_path / 'crawl.db'}", max_attempts=2, retry_backoff=0)
+
+def status(queue, task_id):
+    return queue.conn.execute("SELECT status FROM tasks WHERE id=?", (task_id,)).fetchone()[0]
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        WorkQueue()
+
+def test_enqueue_dedupe(queue):
+    assert queue.enqueue("serp", {"query": "usb hub"}, dedupe_key="d:serp:usb hub") is not None
+    assert queue.enqueue("serp", {"query": "usb hub"}, dedupe_key="d:serp:usb hub") is None
+
+def test_expired_lease_is_leased_again(queue):
+    task_id = queue.enqueue("serp", {"query": "q"})
+    first = queue.lease("w1", visibility_timeout=-1)  # already expired: the worker "died"
+    assert first["id"] == task_id and first["attempts"] == 1
+    second = queue.lease("w2", visibility_timeout=900)
+    assert second["id"] == task_id and second["attempts"] == 2
+    assert queue.lease("w3") is None  # w2's lease is live
+    assert not queue.complete(task_id, "w1")  # the expired holder can no longer finish it
+    assert queue.complete(task_id, "w2")
+
+def test_live_lease_is_not_handed_out(queue):
+    queue.enqueue("serp", {"query": "q"})
+    assert queue.lease("w1", visibility_timeout=900) is not None
+    assert queue.lease("w2") is None
+
+def test_failures_retry_then_dead_letter(queue):
+    task_id = queue.enqueue("product", {"n": 1})
+    assert queue.fail(queue.lease("w1")["id"], "w1", "timeout") == "pending"
+    task = queue.lease("w1")
+    assert task["id"] == task_id and task["attempts"] == 2
+    assert queue.fail(task_id, "w1", "timeout") == "dead"
+    assert status(queue, task_id) == "dead"
+    assert queue.lease("w1") is None
+    assert queue.progress()["product"] == {"dead": 1}
+
+def test_expired_lease_past_max_attempts_is_dead(queue):
+    task_id = queue.enqueue("serp", {"query": "q"})
+    queue.lease("w1", visibility_timeout=-1)
+    queue.lease("w2", visibility_timeout=-1)
+    assert queue.lease("w3") is None
+    assert status(queue, task_id) == "dead"
+
+def test_retry_waits_for_backoff(tmp_path):
+    queue = open_queue(str(tmp_path / "crawl.db"), max_attempts=3, retry_backoff=60)
+    task_id = queue.enqueue("serp", {"query": "q"})
+    queue.fail(queue.lease("w1")["id"], "w1", "blocked")
+    assert queue.lease("w1") is None
+    assert status(queue, task_id) == "pending"
+
+def test_complete_is_idempotent(queue):
+    task_id = queue.enqueue("product", {"n": 1})
+    queue.lease("w1")
+    queue.push_results(task_id, "amazon_product", [{"ASIN": "B0TEST0001"}], "w1")
+    assert queue.complete(task_id, "w1")
+    assert not queue.complete(task_id, "w1")
+    assert status(queue, task_id) == "done"
+    assert queue.lease("w1") is None
+    assert list(queue.results("amazon_product")) == [{"ASIN": "B0TEST0001"}]
+
+def test_retried_task_replaces_its_results(queue):
+    task_id = queue.enqueue("product", {"n": 1})
+    queue.lease("w1")
+    queue.push_results(task_id, "amazon_review", [{"r": 1}, {"r": 2}], "w1")
+    queue.fail(task_id, "w1", "crash")
+    queue.lease("w2")
+    queue.push_results(task_id, "amazon_review", [{"r": 1}], "w2")
+    assert list(queue.results("amazon_review")) == [{"r": 1}]
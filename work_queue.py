@@ -0,0 +1,201 @@
+# work_queue.py
+# Shared crawl work queue with leases, retries and visibility timeouts.
+#
+# Default backend is a single SQLite file (put it on storage every worker host can reach);
+# other backends register a URL scheme with register_backend() and implement the same methods.
+#
+#   q = open_queue("sqlite:///crawl.db")          # or just "crawl.db"
+#   q.enqueue("serp", {"site": "amazon", "query": "usb hub"}, dedupe_key="amazon:serp:usb hub")
+#   task = q.lease("host-a:1234", visibility_timeout=900)
+#   ...  q.push_results(task["id"], "product", rows);  q.complete(task["id"], "host-a:1234")
+#   or   q.fail(task["id"], "host-a:1234", "timeout")   → retried with backoff, dead after max_attempts
+#
+# A leased task whose worker dies becomes visible again once lease_until passes.
+
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+
+TASK_KINDS = ("serp", "product", "review_page")
+
+class WorkQueue(ABC):
+    """Backend interface. Tasks are plain dicts: id, kind, payload, attempts."""
+
+    @abstractmethod
+    def enqueue(self, kind: str, payload: dict, priority: int = 0, dedupe_key: str | None = None) -> int | None:
+        """New task id, or None when dedupe_key is already queued."""
+
+    @abstractmethod
+    def lease(self, worker: str, kinds=None, visibility_timeout: float = 900) -> dict | None:
+        """Next ready task (pending, or leased with an expired lease), leased to worker; None if nothing is ready."""
+
+    @abstractmethod
+    def extend(self, task_id: int, worker: str, visibility_timeout: float = 900) -> bool:
+        """Push back the lease of a task worker still holds."""
+
+    @abstractmethod
+    def complete(self, task_id: int, worker: str) -> bool:
+        """Mark worker's leased task done; False (and no change) if it is not leased by worker."""
+
+    @abstractmethod
+    def fail(self, task_id: int, worker: str, error: str) -> str:
+        """Record a failed attempt; the new status."""
+
+    @abstractmethod
+    def push_results(self, task_id: int, kind: str, rows: list[dict], worker: str | None = None):
+        """Store a task's result rows, replacing those of an earlier attempt."""
+
+    @abstractmethod
+    def results(self, kind: str | None = None):
+        """Result rows (of one kind), in insertion order."""
+
+    @abstractmethod
+    def progress(self) -> dict:
+        """{kind: {status: count}} plus "results": {kind: count}."""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind        TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    dedupe_key  TEXT UNIQUE,
+    priority    INTEGER NOT NULL DEFAULT 0,
+    status      TEXT NOT NULL DEFAULT 'pending',   -- pending | leased | done | dead
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL,
+    worker      TEXT,
+    last_error  TEXT,
+    updated_at  REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks(status, available_at, priority);
+CREATE TABLE IF NOT EXISTS results (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id  INTEGER NOT NULL,
+    kind     TEXT NOT NULL,
+    row      TEXT NOT NULL,
+    worker   TEXT,
+    created_at REAL
+);
+CREATE INDEX IF NOT EXISTS results_kind ON results(kind);
+"""
+
+class SQLiteWorkQueue(WorkQueue):
+    def __init__(self, path: str, max_attempts: int = 3, retry_backoff: float = 30.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)  # explicit transactions
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.executescript(SCHEMA)
+
+    def _tx(self):
+        self.conn.execute("BEGIN IMMEDIATE")  # take the write lock up front so leases never race
+
+    def enqueue(self, kind, payload, priority=0, dedupe_key=None):
+        cur = self.conn.execute(
+            "INSERT OR IGNORE INTO tasks(kind, payload, dedupe_key, priority, updated_at) VALUES (?,?,?,?,?)",
+            (kind, json.dumps(payload), dedupe_key, priority, time.time()))
+        return cur.lastrowid if cur.rowcount else None
+
+    def lease(self, worker, kinds=None, visibility_timeout=900):
+        now = time.time()
+        kinds = list(kinds or TASK_KINDS)
+        marks = ",".join("?" * len(kinds))
+        self._tx()
+        try:
+            # Expired leases that already used up their attempts are dead, not retried forever
+            self.conn.execute(
+                "UPDATE tasks SET status='dead', last_error=COALESCE(last_error,'lease expired'), updated_at=? "
+                "WHERE status='leased' AND lease_until < ? AND attempts >= ?", (now, now, self.max_attempts))
+            row = self.conn.execute(
+                f"SELECT id, kind, payload, attempts FROM tasks "
+                f"WHERE kind IN ({marks}) AND available_at <= ? "
+                f"AND (status='pending' OR (status='leased' AND lease_until < ?)) "
+                f"ORDER BY priority DESC, id LIMIT 1", (*kinds, now, now)).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE tasks SET status='leased', worker=?, lease_until=?, attempts=attempts+1, updated_at=? WHERE id=?",
+                (worker, now + visibility_timeout, now, row[0]))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return {"id": row[0], "kind": row[1], "payload": json.loads(row[2]), "attempts": row[3] + 1}
+
+    def extend(self, task_id, worker, visibility_timeout=900):
+        cur = self.conn.execute(
+            "UPDATE tasks SET lease_until=?, updated_at=? WHERE id=? AND worker=? AND status='leased'",
+            (time.time() + visibility_timeout, time.time(), task_id, worker))
+        return cur.rowcount == 1
+
+    def complete(self, task_id, worker):
+        cur = self.conn.execute(
+            "UPDATE tasks SET status='done', lease_until=NULL, updated_at=? WHERE id=? AND worker=? AND status='leased'",
+            (time.time(), task_id, worker))
+        return cur.rowcount == 1
+
+    def fail(self, task_id, worker, error):
+        """Return the new status: 'pending' (will retry after backoff) or 'dead'."""
+        row = self.conn.execute("SELECT attempts FROM tasks WHERE id=? AND worker=?", (task_id, worker)).fetchone()
+        if row is None:
+            return "unknown"
+        attempts = row[0]
+        status = "dead" if attempts >= self.max_attempts else "pending"
+        self.conn.execute(
+            "UPDATE tasks SET status=?, last_error=?, lease_until=NULL, available_at=?, updated_at=? WHERE id=?",
+            (status, str(error)[:2000], time.time() + self.retry_backoff * attempts, time.time(), task_id))
+        return status
+
+    def push_results(self, task_id, kind, rows, worker=None):
+        now = time.time()
+        self._tx()
+        try:
+            # Idempotent per task: a retried task replaces the rows of its earlier attempt
+            self.conn.execute("DELETE FROM results WHERE task_id=? AND kind=?", (task_id, kind))
+            self.conn.executemany(
+                "INSERT INTO results(task_id, kind, row, worker, created_at) VALUES (?,?,?,?,?)",
+                [(task_id, kind, json.dumps(r, ensure_ascii=False), worker, now) for r in rows])
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def results(self, kind=None):
+        sql, args = "SELECT row FROM results", ()
+        if kind:
+            sql, args = sql + " WHERE kind=?", (kind,)
+        for (row,) in self.conn.execute(sql + " ORDER BY id", args):
+            yield json.loads(row)
+
+    def progress(self):
+        out: dict = {}
+        now = time.time()
+        for kind, status, expired, n in self.conn.execute(
+                "SELECT kind, status, status='leased' AND lease_until < ?, COUNT(*) FROM tasks GROUP BY 1, 2, 3", (now,)):
+            key = "expired" if expired else status
+            out.setdefault(kind, {}).setdefault(key, 0)
+            out[kind][key] += n
+        out["results"] = dict(self.conn.execute("SELECT kind, COUNT(*) FROM results GROUP BY kind").fetchall())
+        return out
+
+# -------------------- backend registry --------------------
+QUEUE_BACKENDS = {"sqlite": SQLiteWorkQueue}
+
+def register_backend(scheme: str, cls):
+    QUEUE_BACKENDS[scheme] = cls
+
+def open_queue(url: str, **kwargs) -> WorkQueue:
+    """'sqlite:///path/to/crawl.db', 'sqlite:///:memory:' or a bare file path."""
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        return SQLiteWorkQueue(url, **kwargs)
+    if scheme not in QUEUE_BACKENDS:
+        raise ValueError(f"Unknown queue backend '{scheme}' (known: {', '.join(QUEUE_BACKENDS)})")
+    if scheme == "sqlite":
+        rest = rest[1:] if rest.startswith("/") else rest
+    return QUEUE_BACKENDS[scheme](rest, **kwargs)